@@ -1,5 +1,4 @@
 # %%
-import pandas as pd
 import numpy as np
 import random
 import uuid
@@ -8,18 +7,392 @@ import argparse
 import json
 import os
 import sys
-from faker import Faker
+import time
+import collections
+import contextlib
+import copy
+import functools
+import gzip
+import hashlib
+import importlib.util
+import io
+import platform
+import queue
+import socket
+import subprocess
+import tempfile
+import threading
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
 
-# Importações para conexão MySQL (importação condicional)
+# Medição do pico de memória no benchmark (indisponível no Windows)
 try:
-    import pymysql
-    from sqlalchemy import create_engine
-    MYSQL_AVAILABLE = True
+    import resource
 except ImportError:
-    MYSQL_AVAILABLE = False
+    resource = None
 
-def parse_args():
-    """Configura e processa os argumentos de linha de comando"""
+def importacao_adiada(nome):
+    """Registra o módulo sem executá-lo; a importação de fato acontece no primeiro acesso a um atributo
+    
+    pandas, pyarrow e as bibliotecas de banco de dados levam a maior parte do tempo de inicialização;
+    adiadas, --help, erros de validação e caminhos que não as usam não pagam por elas.
+    Devolve None se o módulo não estiver instalado.
+    """
+    if nome in sys.modules:
+        return sys.modules[nome]
+    spec = importlib.util.find_spec(nome)
+    if spec is None:
+        return None
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nome] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+pd = importacao_adiada("pandas")
+
+# Usado apenas pelo servidor de --serve
+asyncio = importacao_adiada("asyncio")
+
+# Importações para formatos colunares (importação condicional)
+pa = importacao_adiada("pyarrow")
+PYARROW_AVAILABLE = pa is not None
+
+# Importações para conexão MySQL (importação condicional)
+pymysql = importacao_adiada("pymysql")
+sqlalchemy = importacao_adiada("sqlalchemy")
+MYSQL_AVAILABLE = pymysql is not None and sqlalchemy is not None
+
+# Importações para conexão PostgreSQL (importação condicional; psycopg 3 ou psycopg2)
+psycopg = importacao_adiada("psycopg")
+psycopg2 = None if psycopg else importacao_adiada("psycopg2")
+POSTGRES_AVAILABLE = psycopg is not None or psycopg2 is not None
+
+# Compressão zstd dos sinks de texto (importação condicional)
+zstandard = importacao_adiada("zstandard")
+ZSTD_AVAILABLE = zstandard is not None
+
+# %%
+# Catálogos usados na geração dos dados
+
+# Administrative regions of Distrito Federal
+DF_REGIONS = [
+    "Brasília (Plano Piloto)", "Samambaia", "Taguatinga", "Águas Claras", "Guará",
+    "Ceilândia", "Gama", "Sobradinho", "Planaltina", "Santa Maria",
+    "Recanto das Emas", "Riacho Fundo", "São Sebastião", "Paranoá", "Núcleo Bandeirante",
+    "Lago Sul", "Lago Norte", "Brazlândia", "Candangolândia", "Cruzeiro",
+    "Itapoã", "Jardim Botânico", "SIA", "Sudoeste/Octogonal", "Varjão",
+    "Vicente Pires", "Fercal", "Estrutural", "Sobradinho II", "Park Way"
+]
+
+# Plate types
+TIPOS_PLACA = ["Padrão", "Comercial", "Temporária", "Oficial", "Diplomática", "Colecionador"]
+
+# Vehicle types with their corresponding makes and models
+# This structure ensures realistic combinations of vehicle types, makes and models
+TIPOS_VEICULO_DADOS = {
+    "Carro": {
+        "marcas": [
+            "Volkswagen", "Fiat", "Chevrolet", "Toyota", "Hyundai",
+            "Renault", "Honda", "Ford", "Nissan", "Citroën",
+            "Peugeot", "BMW", "Mercedes-Benz", "Audi", "Kia"
+        ],
+        "modelos": {
+            "Volkswagen": ["Gol", "Polo", "Virtus", "Jetta", "Nivus", "Fox", "Voyage", "Up"],
+            "Fiat": ["Argo", "Mobi", "Uno", "Cronos", "Siena", "Palio", "Grand Siena", "Linea"],
+            "Chevrolet": ["Onix", "Cruze", "Joy", "Cobalt", "Prisma", "Spin", "Malibu"],
+            "Toyota": ["Corolla", "Yaris", "Etios", "Prius", "Camry"],
+            "Hyundai": ["HB20", "i30", "Elantra", "Azera", "Sonata", "HB20S"],
+            "Renault": ["Kwid", "Sandero", "Logan", "Fluence", "Symbol", "Megane"],
+            "Honda": ["Civic", "City", "Fit", "Accord", "WR-V"],
+            "Ford": ["Ka", "Focus", "Fusion", "Fiesta"],
+            "Nissan": ["Versa", "Sentra", "March", "Leaf"],
+            "Citroën": ["C3", "C4", "C4 Lounge", "C4 Picasso"],
+            "Peugeot": ["208", "308", "408", "508"],
+            "BMW": ["Série 1", "Série 3", "Série 5", "Série 7", "320i", "118i"],
+            "Mercedes-Benz": ["Classe A", "Classe C", "Classe E", "Classe S"],
+            "Audi": ["A3", "A4", "A5", "A6", "A7"],
+            "Kia": ["Cerato", "Optima", "Rio", "Cadenza"]
+        }
+    },
+    "SUV": {
+        "marcas": [
+            "Jeep", "Toyota", "Hyundai", "Volkswagen", "Chevrolet",
+            "Ford", "Honda", "Nissan", "Mitsubishi", "Renault",
+            "BMW", "Mercedes-Benz", "Audi", "Kia", "Fiat"
+        ],
+        "modelos": {
+            "Jeep": ["Renegade", "Compass", "Commander", "Cherokee", "Wrangler"],
+            "Toyota": ["SW4", "RAV4", "Corolla Cross", "Hilux SW4", "Land Cruiser"],
+            "Hyundai": ["Creta", "Tucson", "Santa Fe", "ix35", "Kona"],
+            "Volkswagen": ["T-Cross", "Taos", "Tiguan", "Tiguan Allspace"],
+            "Chevrolet": ["Tracker", "Equinox", "Trailblazer", "Captiva"],
+            "Ford": ["EcoSport", "Territory", "Bronco", "Edge"],
+            "Honda": ["HR-V", "CR-V", "WR-V"],
+            "Nissan": ["Kicks", "X-Trail", "Murano"],
+            "Mitsubishi": ["ASX", "Outlander", "Eclipse Cross", "Pajero Sport"],
+            "Renault": ["Duster", "Captur", "Koleos"],
+            "BMW": ["X1", "X3", "X5", "X6", "X7"],
+            "Mercedes-Benz": ["GLA", "GLC", "GLE", "GLB", "GLS"],
+            "Audi": ["Q3", "Q5", "Q7", "Q8"],
+            "Kia": ["Sportage", "Sorento", "Stonic"],
+            "Fiat": ["Pulse", "Fastback", "Toro"]
+        }
+    },
+    "Caminhão": {
+        "marcas": [
+            "Mercedes-Benz", "Volkswagen", "Volvo", "Scania", "Iveco",
+            "Ford", "DAF", "MAN", "Hyundai"
+        ],
+        "modelos": {
+            "Mercedes-Benz": ["Actros", "Atego", "Axor", "Accelo"],
+            "Volkswagen": ["Constellation", "Delivery", "Worker", "Meteor"],
+            "Volvo": ["FH", "FM", "FMX", "VM"],
+            "Scania": ["R", "G", "P", "S"],
+            "Iveco": ["Daily", "Tector", "Stralis", "Hi-Way"],
+            "Ford": ["Cargo", "F-MAX"],
+            "DAF": ["XF", "CF", "LF"],
+            "MAN": ["TGX", "TGS", "TGL", "TGM"],
+            "Hyundai": ["HD78", "HD80", "Mighty"]
+        }
+    },
+    "Motocicleta": {
+        "marcas": [
+            "Honda", "Yamaha", "Suzuki", "Kawasaki", "Harley-Davidson",
+            "BMW", "Ducati", "Triumph", "KTM", "Royal Enfield"
+        ],
+        "modelos": {
+            "Honda": ["CG 160", "Biz", "CB 300", "CB 500", "XRE 300", "Pop 110", "Bros 160", "PCX"],
+            "Yamaha": ["Factor 150", "Fazer 250", "MT-03", "MT-07", "MT-09", "Lander", "Crosser", "NMAX"],
+            "Suzuki": ["GSX-S750", "V-Strom 650", "Intruder 125", "Hayabusa", "Burgman"],
+            "Kawasaki": ["Ninja 300", "Ninja 400", "Z400", "Versys 650", "Vulcan"],
+            "Harley-Davidson": ["Street 750", "Iron 883", "Sportster", "Fat Boy", "Road King"],
+            "BMW": ["G 310", "F 750 GS", "F 850 GS", "R 1250 GS", "S 1000 RR"],
+            "Ducati": ["Monster", "Panigale", "Scrambler", "Multistrada", "Diavel"],
+            "Triumph": ["Street Twin", "Bonneville", "Tiger", "Trident", "Speed Triple"],
+            "KTM": ["Duke 200", "Duke 390", "Adventure 390", "RC 390"],
+            "Royal Enfield": ["Himalayan", "Meteor", "Classic 350", "Interceptor 650"]
+        }
+    },
+    "Ônibus": {
+        "marcas": [
+            "Mercedes-Benz", "Volkswagen", "Volvo", "Scania", "Marcopolo",
+            "Comil", "Caio", "Neobus", "Busscar"
+        ],
+        "modelos": {
+            "Mercedes-Benz": ["O-500", "O-500 RS", "OF-1721", "OF-1519", "Citaro"],
+            "Volkswagen": ["Volksbus 15.190 OD", "Volksbus 17.230 OD", "Volksbus 18.280 OT", "Volksbus 9.160 OD"],
+            "Volvo": ["B270F", "B340R", "B380R", "B450R", "B8R"],
+            "Scania": ["K360", "K400", "K410", "K440", "F250"],
+            "Marcopolo": ["Paradiso", "Viaggio", "Audace", "Torino", "Senior"],
+            "Comil": ["Campione", "Versatile", "Invictus", "Svelto"],
+            "Caio": ["Apache", "Millennium", "Solar", "Foz"],
+            "Neobus": ["New Road", "Mega", "Thunder", "Spectrum"],
+            "Busscar": ["Urbanuss", "Vissta", "El Buss", "Jum Buss"]
+        }
+    },
+    "Van": {
+        "marcas": [
+            "Mercedes-Benz", "Fiat", "Renault", "Iveco", "Peugeot",
+            "Citroën", "Volkswagen", "Ford", "Hyundai"
+        ],
+        "modelos": {
+            "Mercedes-Benz": ["Sprinter", "Vito", "Vito Tourer", "V-Class"],
+            "Fiat": ["Ducato", "Fiorino", "Doblò", "Scudo"],
+            "Renault": ["Master", "Trafic", "Kangoo"],
+            "Iveco": ["Daily", "Daily Minibus", "Daily City"],
+            "Peugeot": ["Expert", "Boxer", "Partner"],
+            "Citroën": ["Jumper", "Jumpy", "Berlingo"],
+            "Volkswagen": ["Kombi", "Transporter", "Crafter", "Delivery"],
+            "Ford": ["Transit", "Transit Custom"],
+            "Hyundai": ["HR", "H100", "Starex"]
+        }
+    }
+}
+
+# Vehicle colors
+CORES_VEICULO = ["Preto", "Branco", "Prata", "Cinza", "Vermelho", "Azul", "Verde", "Amarelo", "Marrom", "Laranja"]
+
+# Camera IDs (using Distrito Federal highway and avenue designations)
+IDS_CAMERA = [
+    "EPIA-001", "EPNB-001", "EPTG-001", "EPCT-001", "EPNA-001",
+    "EPCL-001", "EPPR-001", "EPAR-001", "W3-001", "L2-001",
+    "L4-001", "ESPM-001", "EPIG-001", "EPDB-001", "DF-001",
+    "DF-002", "DF-003", "DF-004", "DF-005", "DF-085",
+    "DF-095", "DF-075", "DF-079", "DF-150", "DF-140",
+    "BR-020", "BR-040", "BR-060", "BR-070", "BR-251"
+]
+
+# Weather conditions (relevant to Distrito Federal)
+CONDICOES_CLIMA = ["Ensolarado", "Nublado", "Chuvoso", "Parcialmente Nublado", "Limpo", "Tempestuoso", "Ventoso"]
+
+# Visibility conditions
+CONDICOES_VISIBILIDADE = ["Dia", "Noite", "Pôr do Sol", "Amanhecer", "Baixa Visibilidade"]
+
+# Road conditions
+CONDICOES_ESTRADA = ["Seca", "Molhada", "Alagada", "Em Obras", "Com Buracos", "Boa Condição"]
+
+# Traffic conditions
+CONDICOES_TRAFEGO = ["Leve", "Moderado", "Intenso", "Congestionado", "Parado"]
+
+# Direction of travel (using Distrito Federal common directions)
+DIRECOES = ["Plano Norte", "Plano Sul", "Asa Leste", "Asa Oeste", "Lago Norte", "Lago Sul", "Sentido Cidades Satélites", "Sentido Área Central"]
+
+# Popular locations in Distrito Federal
+LOCAIS = [
+    "Congresso Nacional", "Esplanada dos Ministérios", "Ponte JK",
+    "Rodoviária do Plano Piloto", "Estádio Mané Garrincha",
+    "Praça dos Três Poderes", "Catedral Metropolitana",
+    "Parque da Cidade", "Memorial JK", "Torre de TV",
+    "Universidade de Brasília", "Aeroporto Internacional",
+    "Setor Comercial Sul", "Setor Bancário Sul", "Setor Hoteleiro Norte",
+    "Setor de Embaixadas Sul", "Shopping Conjunto Nacional",
+    "ParkShopping", "Taguatinga Shopping", "Pátio Brasil",
+    "Gilberto Salomão", "Lago Paranoá", "Pontão do Lago Sul"
+]
+
+# Limites de velocidade por tipo de local (km/h)
+LIMITES_VELOCIDADE = {
+    "Congresso Nacional": 40,
+    "Esplanada dos Ministérios": 60,
+    "Ponte JK": 60,
+    "Rodoviária do Plano Piloto": 40,
+    "Estádio Mané Garrincha": 40,
+    "Praça dos Três Poderes": 40,
+    "Catedral Metropolitana": 40,
+    "Parque da Cidade": 30,
+    "Memorial JK": 40,
+    "Torre de TV": 40,
+    "Universidade de Brasília": 40,
+    "Aeroporto Internacional": 60,
+    "Setor Comercial Sul": 40,
+    "Setor Bancário Sul": 40,
+    "Setor Hoteleiro Norte": 40,
+    "Setor de Embaixadas Sul": 60,
+    "Shopping Conjunto Nacional": 40,
+    "ParkShopping": 60,
+    "Taguatinga Shopping": 60,
+    "Pátio Brasil": 40,
+    "Gilberto Salomão": 60,
+    "Lago Paranoá": 60,
+    "Pontão do Lago Sul": 40
+}
+
+# Lista de possíveis infrações baseadas na legislação brasileira de trânsito
+INFRACOES = {
+    # Infrações de velocidade
+    "excesso_velocidade_leve": "Excesso de velocidade até 20% acima do limite",
+    "excesso_velocidade_media": "Excesso de velocidade entre 20% e 50% acima do limite",
+    "excesso_velocidade_grave": "Excesso de velocidade mais de 50% acima do limite",
+
+    # Infrações de conduta
+    "sem_licenciamento": "Veículo sem licenciamento atualizado",
+    "veiculo_irregular": "Veículo em condições irregulares",
+    "estacionamento_proibido": "Estacionamento em local proibido",
+    "parada_proibida": "Parada em local proibido",
+    "transitar_calcada": "Transitar na calçada ou passeio",
+
+    # Infrações de equipamentos
+    "equipamento_obrigatorio": "Falta de equipamento obrigatório",
+    "farol_apagado": "Conduzir sem farol aceso em rodovia",
+
+    # Infrações específicas
+    "transito_faixa_exclusiva": "Transitar em faixa exclusiva",
+    "avanco_sinal": "Avanço de sinal vermelho",
+    "contramao": "Trafegar na contramão",
+    "uso_celular": "Dirigir utilizando celular",
+
+    # Infrações de condições climáticas e via
+    "velocidade_incompativel": "Velocidade incompatível com condições da via",
+
+    # Sem infração
+    "sem_infracao": "Sem infração detectada"
+}
+
+# Tabela declarativa usada pelo motor vetorizado de infrações (determinar_infracoes)
+
+# Fatores aplicados ao limite de velocidade conforme as condições da via e do clima
+FATORES_LIMITE_ESTRADA = {"Molhada": 0.8, "Alagada": 0.8, "Em Obras": 0.7, "Com Buracos": 0.7}
+FATORES_LIMITE_CLIMA = {"Chuvoso": 0.9, "Tempestuoso": 0.9}
+
+# Faixas de excesso de velocidade: percentual máximo acima do limite ajustado -> infração
+FAIXAS_EXCESSO_VELOCIDADE = [
+    (20, "excesso_velocidade_leve"),
+    (50, "excesso_velocidade_media"),
+    (float("inf"), "excesso_velocidade_grave"),
+]
+
+# Regras candidatas, avaliadas em ordem. Campos opcionais de cada regra:
+# - probabilidade: chance de ocorrência (multiplicada por idade/escala_idade se houver escala_idade)
+# - idade_minima: idade do veículo acima da qual a regra se aplica
+# - tipos_excluidos: tipos de veículo aos quais a regra não se aplica
+# - condicao_estrada/condicao_clima + fracao_limite: condições adversas em que a velocidade
+#   acima de fracao_limite * limite é considerada incompatível
+REGRAS_INFRACAO = [
+    {"infracao": "sem_licenciamento", "probabilidade": 0.03, "idade_minima": 10, "escala_idade": 10},
+    {"infracao": "equipamento_obrigatorio", "probabilidade": 0.04, "idade_minima": 8, "escala_idade": 8},
+    {"infracao": "avanco_sinal", "probabilidade": 0.05},
+    {"infracao": "contramao", "probabilidade": 0.02},
+    {"infracao": "uso_celular", "probabilidade": 0.07},
+    {"infracao": "transito_faixa_exclusiva", "probabilidade": 0.04, "tipos_excluidos": ["Ônibus"]},
+    {"infracao": "farol_apagado", "probabilidade": 0.06},
+    {
+        "infracao": "velocidade_incompativel",
+        "condicao_estrada": ["Molhada", "Alagada", "Em Obras"],
+        "condicao_clima": ["Chuvoso", "Tempestuoso", "Baixa Visibilidade"],
+        "fracao_limite": 0.7,
+    },
+]
+
+# Dias da semana na ordem de datetime.weekday() (segunda-feira = 0)
+DIAS_SEMANA = ["Segunda-feira", "Terça-feira", "Quarta-feira", "Quinta-feira", "Sexta-feira", "Sábado", "Domingo"]
+
+# Vocabulário fixo de cada coluna categórica, na ordem usada para codificá-la
+VOCABULARIOS = {
+    "regiao_administrativa": DF_REGIONS,
+    "tipo_placa": TIPOS_PLACA,
+    "tipo_veiculo": list(TIPOS_VEICULO_DADOS),
+    "marca_veiculo": list(dict.fromkeys(
+        marca for dados in TIPOS_VEICULO_DADOS.values() for marca in dados["marcas"])),
+    "modelo_veiculo": list(dict.fromkeys(
+        modelo for dados in TIPOS_VEICULO_DADOS.values()
+        for modelos in dados["modelos"].values() for modelo in modelos)),
+    "local": LOCAIS,
+    "cor_veiculo": CORES_VEICULO,
+    "id_camera": IDS_CAMERA,
+    "condicao_clima": CONDICOES_CLIMA,
+    "visibilidade": CONDICOES_VISIBILIDADE,
+    "condicao_estrada": CONDICOES_ESTRADA,
+    "condicao_trafego": CONDICOES_TRAFEGO,
+    "direcao_deslocamento": DIRECOES,
+    "infracao": list(INFRACOES.values()),
+    "dia_semana": DIAS_SEMANA,
+}
+
+# Colunas geradas, na ordem padrão da saída
+COLUNAS = ["id_registro", "numero_placa", "regiao_administrativa", "tipo_placa", "tipo_veiculo", "marca_veiculo",
+           "modelo_veiculo", "local", "cor_veiculo", "ano_veiculo", "data_hora", "latitude", "longitude", "id_camera",
+           "caminho_imagem", "confianca_ocr", "condicao_clima", "temperatura", "visibilidade", "condicao_estrada",
+           "condicao_trafego", "velocidade", "direcao_deslocamento", "infracao", "limite_velocidade",
+           "dia_semana", "hora_dia", "semana", "mes", "ano"]
+
+# Colunas usadas no cálculo de cada coluna; com --columns, as dependências também são calculadas
+DEPENDENCIAS_COLUNAS = {
+    "marca_veiculo": ["tipo_veiculo"],
+    "modelo_veiculo": ["tipo_veiculo", "marca_veiculo"],
+    "limite_velocidade": ["local"],
+    "infracao": ["velocidade", "limite_velocidade", "condicao_estrada", "condicao_clima", "tipo_veiculo", "ano_veiculo"],
+    "dia_semana": ["data_hora"],
+    "hora_dia": ["data_hora"],
+    "semana": ["data_hora"],
+    "mes": ["data_hora"],
+    "ano": ["data_hora"],
+}
+
+# %%
+def criar_parser():
+    """Cria o parser dos argumentos de linha de comando (também usado nas requisições de --serve)"""
     parser = argparse.ArgumentParser(
         description='Gerador de dados de placas de veículos para o Distrito Federal',
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -38,10 +411,95 @@ def parse_args():
                         help='Número de registros a serem gerados')
     parser.add_argument('--output', type=str, default="dados_placas_df.csv",
                         help='Nome do arquivo de saída')
+    parser.add_argument('--format', type=str, default='csv', choices=FORMATOS_SAIDA,
+                        help='Formato do arquivo de saída')
+    parser.add_argument('--compression', type=str, choices=CODECS_COMPRESSAO,
+                        help='Codec de compressão dos formatos colunares (padrão: snappy no parquet, lz4 no feather, nenhum no arrow-ipc)')
+    parser.add_argument('--compress', type=str, default=None, choices=CODECS_TEXTO,
+                        help='Comprimir os sinks csv, jsonl e stdout em blocos paralelos, à medida que os lotes são gravados')
+    parser.add_argument('--row-group-size', type=int, default=None,
+                        help='Número máximo de registros por row group (parquet) ou record batch (feather/arrow-ipc); por padrão, um por lote gravado')
+    parser.add_argument('--engine', type=str, default='python', choices=['python', 'numpy'],
+                        help='Motor de geração: python (registro a registro) ou numpy (vetorizado)')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='Gerar e gravar os dados em lotes deste tamanho, com memória constante (requer --engine numpy)')
+    parser.add_argument('--start-index', type=int, default=0, metavar='N',
+                        help='No motor numpy, gerar os registros N a N+num_records-1, idênticos aos de uma execução a partir de 0')
+    parser.add_argument('--range', type=intervalo_registros, default=None, metavar='INICIO:FIM',
+                        help='Gerar apenas os registros INICIO a FIM-1 (o mesmo que --start-index INICIO --num-records FIM-INICIO)')
+    parser.add_argument('--counter-rng', action='store_true',
+                        help='No motor numpy, calcular cada campo do registro i como função pura de (seed, i, coluna), '
+                             'sem gerar blocos inteiros: acesso direto a qualquer registro e divisão trivial entre máquinas')
+    parser.add_argument('--checkpoint', type=str, default=None, metavar='ARQUIVO',
+                        help='Registrar neste arquivo JSON o progresso da geração em lotes, após cada lote gravado em todos os destinos')
+    parser.add_argument('--resume', type=str, default=None, metavar='ARQUIVO',
+                        help='Continuar a execução registrada neste checkpoint a partir do último lote gravado')
+    parser.add_argument('--columns', type=str, default=None, metavar='COL1,COL2,...',
+                        help='Gerar apenas estas colunas, nesta ordem (e calcular só elas e suas dependências); '
+                             'os valores são os mesmos de uma execução com todas as colunas')
+    parser.add_argument('--uuid-legacy', action='store_true',
+                        help='No motor numpy, gerar id_registro com a sequência de UUIDs do motor python (mais lento)')
+    parser.add_argument('--uuid-binary', action='store_true',
+                        help='No motor numpy, gravar id_registro como 16 bytes brutos (formatos colunares e MySQL)')
+    parser.add_argument('--unique-plates', action='store_true',
+                        help='No motor numpy, gerar placas sem repetição (amostragem sem reposição do espaço de placas)')
+    parser.add_argument('--fleet-size', type=int, default=None, metavar='K',
+                        help='No motor numpy, gerar os registros como avistamentos de uma frota de K veículos, cada um com '
+                             'placa, tipo de placa, tipo, marca, modelo, cor e ano fixos')
+    parser.add_argument('--pesos', type=str, default=None,
+                        help='Pesos das colunas categóricas, como JSON {coluna: {valor: peso}} ou caminho de um arquivo JSON '
+                             '(valores sem peso informado têm peso 1)')
+    parser.add_argument('--spatiotemporal', action='store_true',
+                        help='No motor numpy, ancorar as coordenadas, o local e o limite de velocidade na câmera sorteada, '
+                             'sortear as horas por uma curva de tráfego e derivar visibilidade e trânsito da hora')
+    parser.add_argument('--event-order', action='store_true',
+                        help='No motor numpy, gerar os registros já em ordem crescente de data_hora, sem ordenação global')
+    parser.add_argument('--rate', type=float, default=None, metavar='EVENTOS_POR_SEGUNDO',
+                        help='Entregar os registros aos destinos neste ritmo (eventos por segundo)')
+    parser.add_argument('--replay-speed', type=float, default=None, metavar='N',
+                        help='Entregar os registros no ritmo do tempo dos eventos, N vezes mais rápido (1 = tempo real; requer --event-order)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Número de processos para gerar os blocos em paralelo (requer --engine numpy)')
+    parser.add_argument('--sink', type=str, action='append', metavar='TIPO[:DESTINO]',
+                        help='Destino dos dados, repetível para gravar em vários em paralelo: csv:ARQ, parquet:ARQ, feather:ARQ, '
+                             'arrow-ipc:ARQ, jsonl:ARQ, stdout[:csv|jsonl], tcp:HOST:PORTA, sqlite:ARQ, postgres:DSN ou mysql '
+                             '(substitui --format/--output)')
+    parser.add_argument('--sink-queue-size', type=int, default=4,
+                        help='Número máximo de lotes aguardando em cada sink antes de a geração esperar')
+    parser.add_argument('--encode-threads', type=int, default=None, metavar='N',
+                        help='Threads que codificam cada lote nos sinks CSV e comprimem os sinks de texto com --compress '
+                             '(padrão: número de núcleos)')
+    parser.add_argument('--table', type=str, default='dados_placas',
+                        help='Nome da tabela nos sinks sqlite e postgres')
+    parser.add_argument('--table-if-exists', type=str, default='replace', choices=['fail', 'replace', 'append'],
+                        help='O que fazer se a tabela já existir nos sinks sqlite e postgres')
+    parser.add_argument('--serve', type=str, default=None, metavar='[HOST:]PORTA',
+                        help='Iniciar um servidor HTTP que gera os dados sob demanda (GET/POST /generate), mantendo '
+                             'catálogos e tabelas carregados entre as requisições')
+    parser.add_argument('--serve-max-records', type=int, default=1000000, metavar='N',
+                        help='Número máximo de registros de uma requisição ao servidor (padrão: 1000000)')
+    parser.add_argument('--benchmark', type=str, nargs='?', const=','.join(str(n) for n in TAMANHOS_BENCHMARK),
+                        metavar='TAMANHOS',
+                        help='Medir vazão, pico de memória e tempo por etapa para uma lista de números de registros '
+                             '(padrão: 1000,100000,1000000,10000000), gravando no formato de --format, e sair')
+    parser.add_argument('--benchmark-output', type=str,
+                        help='Salvar também o resultado de --benchmark neste arquivo JSON')
+    parser.add_argument('--benchmark-workers', type=str,
+                        help='Medir a vazão para uma lista de números de processos (ex.: 1,2,4,8) e sair')
+    parser.add_argument('--benchmark-startup', type=float, nargs='?', const=0.0, metavar='LIMITE_S',
+                        help='Medir o tempo de inicialização (python -X importtime) e sair com erro se algum módulo de '
+                             'importação adiada for carregado por --help ou se a mediana passar de LIMITE_S segundos')
     
     # Configurações de intervalo de datas
     parser.add_argument('--dias-passados', type=int, default=30,
                         help='Número de dias no passado para a geração de timestamps')
+    parser.add_argument('--reference-date', type=str, default=None, metavar='AAAA-MM-DD[THH:MM:SS]',
+                        help='Instante ao qual os timestamps e a idade dos veículos são relativos (padrão: o instante da '
+                             'execução); com ele, a mesma configuração gera sempre os mesmos dados e pode usar o cache')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Não ler nem gravar o cache de dados gerados (usado apenas com --reference-date)')
+    parser.add_argument('--cache-size', type=int, default=2048, metavar='MB',
+                        help='Tamanho máximo do cache de dados gerados; as entradas usadas há mais tempo são removidas')
     
     # Configurações de coordenadas
     parser.add_argument('--lat-min', type=float, default=-16.0,
@@ -76,10 +534,12 @@ def parse_args():
                         help='Mostrar amostra dos dados gerados')
     parser.add_argument('--show-stats', action='store_true',
                         help='Mostrar estatísticas dos dados gerados')
+    parser.add_argument('--show-memory', action='store_true',
+                        help='Mostrar o uso de memória dos dados gerados (bytes por registro e por coluna)')
     
     # Parâmetros de locale
     parser.add_argument('--locale', type=str, default='pt_BR',
-                        help='Configuração regional para a faker')
+                        help='Configuração regional (mantida por compatibilidade com configurações antigas; nenhuma coluna depende dela)')
     
     # Configurações de banco de dados MySQL
     if MYSQL_AVAILABLE:
@@ -101,12 +561,55 @@ def parse_args():
         group_mysql.add_argument('--mysql-if-exists', type=str, default='replace',
                             choices=['fail', 'replace', 'append'],
                             help='Ação caso a tabela já exista: falhar, substituir ou anexar')
+        group_mysql.add_argument('--mysql-method', type=str, default='insert',
+                            choices=['insert', 'load-data', 'to_sql'],
+                            help='Forma de carga: INSERTs de várias linhas, LOAD DATA LOCAL INFILE ou pandas.to_sql')
+        group_mysql.add_argument('--mysql-connections', type=int, default=1,
+                            help='Número de conexões paralelas usadas na carga (insert e load-data)')
     
-    args = parser.parse_args()
+    return parser
+
+def intervalo_registros(texto):
+    """Converte INICIO:FIM (fim exclusivo) de --range em (inicio, fim)"""
+    inicio, separador, fim = texto.partition(':')
+    if not separador or not inicio.isdigit() or not fim.isdigit() or int(inicio) >= int(fim):
+        raise argparse.ArgumentTypeError(f"intervalo inválido: {texto} (use INICIO:FIM, com 0 <= INICIO < FIM)")
+    return int(inicio), int(fim)
+
+def aplicar_intervalo(args):
+    """Converte --range INICIO:FIM em --start-index e --num-records"""
+    if args.range:
+        args.start_index, fim = args.range
+        args.num_records = fim - args.start_index
+
+def lista_colunas(valor):
+    """Converte --columns (texto separado por vírgulas ou lista do arquivo de configuração) em lista de colunas"""
+    if not valor:
+        return None
+    colunas = valor.split(',') if isinstance(valor, str) else valor
+    return [coluna.strip() for coluna in colunas if coluna.strip()]
+
+def colunas_necessarias(colunas):
+    """Colunas pedidas mais as suas dependências (DEPENDENCIAS_COLUNAS); todas, se nenhuma foi pedida"""
+    if not colunas:
+        return set(COLUNAS)
+    necessarias = set()
+    pendentes = list(colunas)
+    while pendentes:
+        coluna = pendentes.pop()
+        if coluna not in necessarias:
+            necessarias.add(coluna)
+            pendentes.extend(DEPENDENCIAS_COLUNAS.get(coluna, []))
+    return necessarias
+
+def parse_args():
+    """Configura e processa os argumentos de linha de comando"""
+    args = criar_parser().parse_args()
     
     # Se um arquivo de configuração for especificado, carregá-lo
     if args.config:
         args = load_config(args.config, args)
+    aplicar_intervalo(args)
     
     # Se foi solicitado salvar as configurações atuais
     if args.save_config:
@@ -165,7 +668,7 @@ def save_config(args, output_file):
     except Exception as e:
         print(f"Erro ao salvar configurações: {e}")
 
-def save_to_mysql(df, args):
+def save_to_mysql(df, args, if_exists=None):
     """Salva o DataFrame em um banco de dados MySQL"""
     if not MYSQL_AVAILABLE:
         print("ERRO: Bibliotecas para MySQL não estão instaladas.")
@@ -183,13 +686,13 @@ def save_to_mysql(df, args):
         conn_str = f"mysql+pymysql://{args.mysql_user}:{password}@{args.mysql_host}:{args.mysql_port}/{args.mysql_db}"
         
         # Criar engine do SQLAlchemy
-        engine = create_engine(conn_str)
+        engine = sqlalchemy.create_engine(conn_str)
         
         # Salvar o DataFrame na tabela
         df.to_sql(
             name=args.mysql_table,
             con=engine,
-            if_exists=args.mysql_if_exists,
+            if_exists=if_exists or args.mysql_if_exists,
             index=False,
             chunksize=1000
         )
@@ -201,19 +704,258 @@ def save_to_mysql(df, args):
         print(f"Erro ao salvar dados no MySQL: {e}")
         return False
 
+# %%
+# Carga em massa no MySQL: tabela tipada, LOAD DATA LOCAL INFILE ou INSERTs de várias linhas,
+# índices criados só depois da carga e conexões paralelas
+
+# Tipos SQL das colunas que não pertencem a um vocabulário fixo (estes viram VARCHAR do maior valor)
+TIPOS_SQL_COLUNAS = {
+    "id_registro": "CHAR(36)",
+    "numero_placa": "CHAR(7)",
+    "ano_veiculo": "SMALLINT",
+    "data_hora": "DATETIME",
+    "latitude": "DECIMAL(9,6)",
+    "longitude": "DECIMAL(9,6)",
+    "caminho_imagem": "VARCHAR(64)",
+    "confianca_ocr": "DECIMAL(3,2)",
+    "temperatura": "DECIMAL(5,1)",
+    "velocidade": "SMALLINT",
+    "limite_velocidade": "SMALLINT",
+    "hora_dia": "TINYINT",
+    "semana": "TINYINT",
+    "mes": "TINYINT",
+    "ano": "SMALLINT",
+}
+
+# Índices criados após a carga (nome -> colunas); PRIMARY vira a chave primária
+INDICES_SQL = {
+    "PRIMARY": ["id_registro"],
+    "idx_numero_placa": ["numero_placa"],
+    "idx_data_hora": ["data_hora"],
+    "idx_id_camera": ["id_camera", "data_hora"],
+}
+
+def tipo_sql_coluna(nome, serie):
+    """Tipo SQL de uma coluna gerada, a partir do esquema do gerador"""
+    if nome == "id_registro" and len(serie) and isinstance(serie.iloc[0], bytes):
+        return "BINARY(16)"
+    if nome in TIPOS_SQL_COLUNAS:
+        return TIPOS_SQL_COLUNAS[nome]
+    if nome in VOCABULARIOS:
+        return f"VARCHAR({max(len(valor) for valor in VOCABULARIOS[nome])})"
+    return "TEXT"
+
+# Tipos MySQL que têm outro nome no PostgreSQL
+TIPOS_SQL_POSTGRES = {"TINYINT": "SMALLINT", "DATETIME": "TIMESTAMP", "BINARY(16)": "BYTEA"}
+
+def citar_sql(nome, dialeto='mysql'):
+    """Cita um identificador SQL no dialeto informado"""
+    return f'"{nome}"' if dialeto == 'postgres' else f"`{nome}`"
+
+def sql_criar_tabela(df, tabela, dialeto='mysql'):
+    """Monta o CREATE TABLE tipado para as colunas do DataFrame, sem índices (dialetos mysql, sqlite e postgres)"""
+    definicoes = []
+    for nome in df.columns:
+        tipo = tipo_sql_coluna(nome, df[nome])
+        if dialeto == 'postgres':
+            tipo = TIPOS_SQL_POSTGRES.get(tipo, tipo)
+        definicoes.append(f"{citar_sql(nome, dialeto)} {tipo} NOT NULL")
+    colunas = ",\n    ".join(definicoes)
+    sufixo = " ENGINE=InnoDB DEFAULT CHARSET=utf8mb4" if dialeto == 'mysql' else ""
+    return f"CREATE TABLE {citar_sql(tabela, dialeto)} (\n    {colunas}\n){sufixo}"
+
+def sql_criar_indices(colunas, tabela):
+    """Monta um único ALTER TABLE que cria todos os índices aplicáveis às colunas geradas"""
+    clausulas = []
+    for nome, colunas_indice in INDICES_SQL.items():
+        if not all(coluna in colunas for coluna in colunas_indice):
+            continue
+        lista = ", ".join(f"`{coluna}`" for coluna in colunas_indice)
+        clausulas.append(f"ADD PRIMARY KEY ({lista})" if nome == "PRIMARY" else f"ADD INDEX `{nome}` ({lista})")
+    if not clausulas:
+        return None
+    return f"ALTER TABLE `{tabela}` " + ", ".join(clausulas)
+
+def sql_indices_individuais(colunas, tabela, dialeto='sqlite'):
+    """Monta um comando por índice, para bancos sem ALTER TABLE com várias cláusulas (SQLite, PostgreSQL)"""
+    comandos = []
+    for nome, colunas_indice in INDICES_SQL.items():
+        if not all(coluna in colunas for coluna in colunas_indice):
+            continue
+        nome_indice = f"pk_{tabela}" if nome == "PRIMARY" else f"{nome}_{tabela}"
+        lista = ", ".join(citar_sql(coluna, dialeto) for coluna in colunas_indice)
+        unico = "UNIQUE " if nome == "PRIMARY" else ""
+        comandos.append(f"CREATE {unico}INDEX IF NOT EXISTS {citar_sql(nome_indice, dialeto)} ON {citar_sql(tabela, dialeto)} ({lista})")
+    return comandos
+
+def valores_sql(df):
+    """Converte o DataFrame em uma lista de tuplas com tipos Python aceitos pelo pymysql"""
+    colunas = []
+    for nome in df.columns:
+        serie = df[nome]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            colunas.append(serie.dt.strftime("%Y-%m-%d %H:%M:%S").tolist())
+        elif serie.dtype == np.float32:
+            # Evita que o valor float32 chegue ao servidor como 0.7300000190734863
+            colunas.append(np.round(serie.to_numpy(np.float64), 6).tolist())
+        else:
+            colunas.append(serie.tolist())
+    return list(zip(*colunas))
+
+class EscritorMySQL:
+    """Carrega os lotes em uma tabela MySQL tipada usando --mysql-connections conexões em paralelo
+    
+    Cada lote é dividido em fatias, uma por conexão, carregadas com LOAD DATA LOCAL INFILE
+    (--mysql-method load-data) ou com INSERTs de várias linhas (--mysql-method insert).
+    Quando a tabela é criada pelo script, os índices só são criados em fechar(), após a carga.
+    """
+    
+    def __init__(self, args):
+        self.args = args
+        self.tabela = args.mysql_table
+        self.password = args.mysql_password
+        if self.password is None:
+            import getpass
+            self.password = getpass.getpass(f"Digite a senha para o usuário MySQL '{args.mysql_user}': ")
+        self.executor = ThreadPoolExecutor(max_workers=args.mysql_connections)
+        self.local = threading.local()
+        self.conexoes = []
+        self.trava = threading.Lock()
+        self.colunas = None
+        self.criar_indices = False
+    
+    def conexao(self):
+        """Conexão da thread atual, aberta na primeira utilização"""
+        if not hasattr(self.local, "conexao"):
+            self.local.conexao = pymysql.connect(
+                host=self.args.mysql_host, port=self.args.mysql_port, user=self.args.mysql_user,
+                password=self.password, database=self.args.mysql_db, charset="utf8mb4",
+                local_infile=self.args.mysql_method == "load-data", autocommit=False
+            )
+            with self.trava:
+                self.conexoes.append(self.local.conexao)
+        return self.local.conexao
+    
+    def preparar(self, df):
+        """Cria, substitui ou reaproveita a tabela conforme --mysql-if-exists"""
+        conexao = self.conexao()
+        with conexao.cursor() as cursor:
+            # Comparação exata: em SHOW TABLES LIKE, "_" e "%" do nome seriam curingas
+            existe = cursor.execute("SELECT 1 FROM information_schema.tables "
+                                    "WHERE table_schema = DATABASE() AND table_name = %s", (self.tabela,)) > 0
+            if existe and self.args.mysql_if_exists == "fail":
+                raise ValueError(f"A tabela '{self.tabela}' já existe")
+            if existe and self.args.mysql_if_exists == "replace":
+                cursor.execute(f"DROP TABLE `{self.tabela}`")
+            if not existe or self.args.mysql_if_exists == "replace":
+                cursor.execute(sql_criar_tabela(df, self.tabela))
+                self.criar_indices = True
+        conexao.commit()
+        self.colunas = list(df.columns)
+    
+    def carregar_fatia(self, fatia):
+        """Carrega uma fatia do lote pela conexão da thread atual"""
+        if len(fatia) == 0:
+            return
+        conexao = self.conexao()
+        lista_colunas = ", ".join(f"`{coluna}`" for coluna in self.colunas)
+        with conexao.cursor() as cursor:
+            if self.args.mysql_method == "load-data":
+                self.carregar_arquivo(cursor, fatia)
+            else:
+                marcadores = ", ".join(["%s"] * len(self.colunas))
+                # O pymysql agrupa as tuplas em INSERTs de várias linhas (até max_allowed_packet)
+                cursor.executemany(
+                    f"INSERT INTO `{self.tabela}` ({lista_colunas}) VALUES ({marcadores})",
+                    valores_sql(fatia)
+                )
+        conexao.commit()
+    
+    def carregar_arquivo(self, cursor, fatia):
+        """Grava a fatia em um CSV temporário e o envia com LOAD DATA LOCAL INFILE"""
+        colunas = [f"`{coluna}`" for coluna in self.colunas]
+        ajustes = ""
+        if len(fatia) and "id_registro" in fatia and isinstance(fatia["id_registro"].iloc[0], bytes):
+            # UUIDs binários trafegam em hexadecimal e são convertidos pelo servidor
+            fatia = fatia.assign(id_registro=[valor.hex() for valor in fatia["id_registro"]])
+            colunas[self.colunas.index("id_registro")] = "@id_registro"
+            ajustes = " SET `id_registro` = UNHEX(@id_registro)"
+        
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8", delete=False) as arquivo:
+            fatia.to_csv(arquivo, header=False, index=False, date_format="%Y-%m-%d %H:%M:%S")
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE `{self.tabela}` CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                f"({', '.join(colunas)}){ajustes}",
+                (arquivo.name,)
+            )
+        finally:
+            os.remove(arquivo.name)
+    
+    def escrever(self, df):
+        if self.colunas is None:
+            self.preparar(df)
+        limites = np.linspace(0, len(df), self.args.mysql_connections + 1).astype(int)
+        fatias = [df.iloc[inicio:fim] for inicio, fim in zip(limites[:-1], limites[1:])]
+        list(self.executor.map(self.carregar_fatia, fatias))
+    
+    def fechar(self):
+        self.executor.shutdown()
+        if self.criar_indices and self.colunas is not None:
+            sql_indices = sql_criar_indices(self.colunas, self.tabela)
+            if sql_indices:
+                conexao = self.conexao()
+                with conexao.cursor() as cursor:
+                    cursor.execute(sql_indices)
+                conexao.commit()
+        for conexao in self.conexoes:
+            conexao.close()
+        if self.colunas is not None:
+            print(f"Dados salvos com sucesso na tabela '{self.tabela}' no banco de dados MySQL '{self.args.mysql_db}'")
+
+class EscritorToSQL:
+    """Adapta save_to_mysql (pandas.to_sql) à interface dos escritores, anexando a partir do segundo lote"""
+    
+    def __init__(self, args):
+        self.args = args
+        self.primeiro = True
+    
+    def escrever(self, df):
+        save_to_mysql(df, self.args, if_exists=self.args.mysql_if_exists if self.primeiro else 'append')
+        self.primeiro = False
+    
+    def fechar(self):
+        pass
+
+# %%
+# Tempo acumulado por etapa da geração, usado pelo benchmark (--benchmark)
+
+TEMPOS_ETAPAS = collections.defaultdict(float)
+
+@contextlib.contextmanager
+def etapa(nome):
+    """Soma ao TEMPOS_ETAPAS[nome] o tempo de parede do bloco `with`"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        TEMPOS_ETAPAS[nome] += time.perf_counter() - inicio
+
+# %%
+LETRAS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+DIGITOS = '0123456789'
+
 def generate_license_plate():
     """Gera um número de placa brasileira aleatório"""
-    formats = [
+    # Sorteia o formato com a mesma chamada de random.choice usada pelas versões anteriores
+    mercosul = random.choice((False, True))
+    letras = ''.join(random.choices(LETRAS, k=3))
+    if not mercosul:
         # Traditional Brazilian format: 3 letters + 4 numbers (e.g., ABC1234)
-        lambda: ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3)) + ''.join(random.choices('0123456789', k=4)),
-        
-        # Mercosur format: 3 letters + 1 number + 1 letter + 2 numbers (e.g., ABC1D23)
-        lambda: ''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3)) + 
-                random.choice('0123456789') + 
-                random.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') + 
-                ''.join(random.choices('0123456789', k=2)),
-    ]
-    return random.choice(formats)()
+        return letras + ''.join(random.choices(DIGITOS, k=4))
+    # Mercosur format: 3 letters + 1 number + 1 letter + 2 numbers (e.g., ABC1D23)
+    return letras + random.choice(DIGITOS) + random.choice(LETRAS) + ''.join(random.choices(DIGITOS, k=2))
 
 # Função para gerar UUIDs determinísticos baseados em seed
 def generate_deterministic_uuid(seed, index):
@@ -228,39 +970,12 @@ def generate_deterministic_uuid(seed, index):
     random_bytes[8] = (random_bytes[8] & 0x3F) | 0x80  # variante DCE 1.1
     return str(uuid.UUID(bytes=bytes(random_bytes)))
 
-def determinar_infracao(velocidade, limite_velocidade, condicao_estrada, condicao_clima, tipo_veiculo, ano_veiculo):
+def determinar_infracao(velocidade, limite_velocidade, condicao_estrada, condicao_clima, tipo_veiculo, ano_veiculo,
+                        ano_referencia=None):
     """Determina se houve alguma infração de trânsito com base nos dados do veículo e condições"""
     
     # Lista de possíveis infrações baseadas na legislação brasileira de trânsito
-    infracoes = {
-        # Infrações de velocidade
-        "excesso_velocidade_leve": "Excesso de velocidade até 20% acima do limite",
-        "excesso_velocidade_media": "Excesso de velocidade entre 20% e 50% acima do limite",
-        "excesso_velocidade_grave": "Excesso de velocidade mais de 50% acima do limite",
-        
-        # Infrações de conduta
-        "sem_licenciamento": "Veículo sem licenciamento atualizado",
-        "veiculo_irregular": "Veículo em condições irregulares",
-        "estacionamento_proibido": "Estacionamento em local proibido",
-        "parada_proibida": "Parada em local proibido",
-        "transitar_calcada": "Transitar na calçada ou passeio",
-        
-        # Infrações de equipamentos
-        "equipamento_obrigatorio": "Falta de equipamento obrigatório",
-        "farol_apagado": "Conduzir sem farol aceso em rodovia",
-        
-        # Infrações específicas
-        "transito_faixa_exclusiva": "Transitar em faixa exclusiva",
-        "avanco_sinal": "Avanço de sinal vermelho",
-        "contramao": "Trafegar na contramão",
-        "uso_celular": "Dirigir utilizando celular", 
-        
-        # Infrações de condições climáticas e via
-        "velocidade_incompativel": "Velocidade incompatível com condições da via",
-        
-        # Sem infração
-        "sem_infracao": "Sem infração detectada"
-    }
+    infracoes = INFRACOES
     
     # Probabilidades de infrações específicas
     prob_sem_licenciamento = 0.03  # 3% de chance para veículos mais antigos 
@@ -298,7 +1013,9 @@ def determinar_infracao(velocidade, limite_velocidade, condicao_estrada, condica
             possiveis_infracoes.append(infracoes["excesso_velocidade_grave"])
     
     # Veículos mais antigos têm maior probabilidade de estar sem licenciamento
-    idade_veiculo = datetime.datetime.now().year - ano_veiculo
+    if ano_referencia is None:
+        ano_referencia = datetime.datetime.now().year
+    idade_veiculo = ano_referencia - ano_veiculo
     if idade_veiculo > 10 and random.random() < prob_sem_licenciamento * (idade_veiculo / 10):
         possiveis_infracoes.append(infracoes["sem_licenciamento"])
     
@@ -334,211 +1051,26 @@ def determinar_infracao(velocidade, limite_velocidade, condicao_estrada, condica
     # Retorna uma das infrações detectadas (se houver mais de uma)
     return random.choice(possiveis_infracoes)
 
+def sortear_lista(pesos, coluna, n):
+    """Sorteia n valores da coluna com o módulo random, ponderados pelos pesos da coluna se houver"""
+    valores = VOCABULARIOS[coluna]
+    if coluna not in pesos:
+        return [random.choice(valores) for _ in range(n)]
+    return random.choices(valores, weights=[pesos[coluna].get(valor, 1.0) for valor in valores], k=n)
+
+def escolher_valor(valores, pesos_coluna=None):
+    """Escolhe um valor da lista com o módulo random, ponderado por pesos_coluna ({valor: peso}) se houver"""
+    if not pesos_coluna:
+        return random.choice(valores)
+    return random.choices(valores, weights=[pesos_coluna.get(valor, 1.0) for valor in valores])[0]
+
 def generate_plate_data(args):
     """Gera um conjunto completo de registros de placas de veículos para o Distrito Federal, Brasil"""
     
-    # Administrative regions of Distrito Federal
-    df_regions = [
-        "Brasília (Plano Piloto)", "Samambaia", "Taguatinga", "Águas Claras", "Guará", 
-        "Ceilândia", "Gama", "Sobradinho", "Planaltina", "Santa Maria", 
-        "Recanto das Emas", "Riacho Fundo", "São Sebastião", "Paranoá", "Núcleo Bandeirante", 
-        "Lago Sul", "Lago Norte", "Brazlândia", "Candangolândia", "Cruzeiro", 
-        "Itapoã", "Jardim Botânico", "SIA", "Sudoeste/Octogonal", "Varjão", 
-        "Vicente Pires", "Fercal", "Estrutural", "Sobradinho II", "Park Way"
-    ]
-    
-    # Plate types
-    tipos_placa = ["Padrão", "Comercial", "Temporária", "Oficial", "Diplomática", "Colecionador"]
-    
-    # Vehicle types with their corresponding makes and models
-    # This structure ensures realistic combinations of vehicle types, makes and models
-    tipos_veiculo_dados = {
-        "Carro": {
-            "marcas": [
-                "Volkswagen", "Fiat", "Chevrolet", "Toyota", "Hyundai", 
-                "Renault", "Honda", "Ford", "Nissan", "Citroën", 
-                "Peugeot", "BMW", "Mercedes-Benz", "Audi", "Kia"
-            ],
-            "modelos": {
-                "Volkswagen": ["Gol", "Polo", "Virtus", "Jetta", "Nivus", "Fox", "Voyage", "Up"],
-                "Fiat": ["Argo", "Mobi", "Uno", "Cronos", "Siena", "Palio", "Grand Siena", "Linea"],
-                "Chevrolet": ["Onix", "Cruze", "Joy", "Cobalt", "Prisma", "Spin", "Malibu"],
-                "Toyota": ["Corolla", "Yaris", "Etios", "Prius", "Camry"],
-                "Hyundai": ["HB20", "i30", "Elantra", "Azera", "Sonata", "HB20S"],
-                "Renault": ["Kwid", "Sandero", "Logan", "Fluence", "Symbol", "Megane"],
-                "Honda": ["Civic", "City", "Fit", "Accord", "WR-V"],
-                "Ford": ["Ka", "Focus", "Fusion", "Fiesta"],
-                "Nissan": ["Versa", "Sentra", "March", "Leaf"],
-                "Citroën": ["C3", "C4", "C4 Lounge", "C4 Picasso"],
-                "Peugeot": ["208", "308", "408", "508"],
-                "BMW": ["Série 1", "Série 3", "Série 5", "Série 7", "320i", "118i"],
-                "Mercedes-Benz": ["Classe A", "Classe C", "Classe E", "Classe S"],
-                "Audi": ["A3", "A4", "A5", "A6", "A7"],
-                "Kia": ["Cerato", "Optima", "Rio", "Cadenza"]
-            }
-        },
-        "SUV": {
-            "marcas": [
-                "Jeep", "Toyota", "Hyundai", "Volkswagen", "Chevrolet", 
-                "Ford", "Honda", "Nissan", "Mitsubishi", "Renault",
-                "BMW", "Mercedes-Benz", "Audi", "Kia", "Fiat"
-            ],
-            "modelos": {
-                "Jeep": ["Renegade", "Compass", "Commander", "Cherokee", "Wrangler"],
-                "Toyota": ["SW4", "RAV4", "Corolla Cross", "Hilux SW4", "Land Cruiser"],
-                "Hyundai": ["Creta", "Tucson", "Santa Fe", "ix35", "Kona"],
-                "Volkswagen": ["T-Cross", "Taos", "Tiguan", "Tiguan Allspace"],
-                "Chevrolet": ["Tracker", "Equinox", "Trailblazer", "Captiva"],
-                "Ford": ["EcoSport", "Territory", "Bronco", "Edge"],
-                "Honda": ["HR-V", "CR-V", "WR-V"],
-                "Nissan": ["Kicks", "X-Trail", "Murano"],
-                "Mitsubishi": ["ASX", "Outlander", "Eclipse Cross", "Pajero Sport"],
-                "Renault": ["Duster", "Captur", "Koleos"],
-                "BMW": ["X1", "X3", "X5", "X6", "X7"],
-                "Mercedes-Benz": ["GLA", "GLC", "GLE", "GLB", "GLS"],
-                "Audi": ["Q3", "Q5", "Q7", "Q8"],
-                "Kia": ["Sportage", "Sorento", "Stonic"],
-                "Fiat": ["Pulse", "Fastback", "Toro"]
-            }
-        },
-        "Caminhão": {
-            "marcas": [
-                "Mercedes-Benz", "Volkswagen", "Volvo", "Scania", "Iveco", 
-                "Ford", "DAF", "MAN", "Hyundai"
-            ],
-            "modelos": {
-                "Mercedes-Benz": ["Actros", "Atego", "Axor", "Accelo"],
-                "Volkswagen": ["Constellation", "Delivery", "Worker", "Meteor"],
-                "Volvo": ["FH", "FM", "FMX", "VM"],
-                "Scania": ["R", "G", "P", "S"],
-                "Iveco": ["Daily", "Tector", "Stralis", "Hi-Way"],
-                "Ford": ["Cargo", "F-MAX"],
-                "DAF": ["XF", "CF", "LF"],
-                "MAN": ["TGX", "TGS", "TGL", "TGM"],
-                "Hyundai": ["HD78", "HD80", "Mighty"]
-            }
-        },
-        "Motocicleta": {
-            "marcas": [
-                "Honda", "Yamaha", "Suzuki", "Kawasaki", "Harley-Davidson",
-                "BMW", "Ducati", "Triumph", "KTM", "Royal Enfield"
-            ],
-            "modelos": {
-                "Honda": ["CG 160", "Biz", "CB 300", "CB 500", "XRE 300", "Pop 110", "Bros 160", "PCX"],
-                "Yamaha": ["Factor 150", "Fazer 250", "MT-03", "MT-07", "MT-09", "Lander", "Crosser", "NMAX"],
-                "Suzuki": ["GSX-S750", "V-Strom 650", "Intruder 125", "Hayabusa", "Burgman"],
-                "Kawasaki": ["Ninja 300", "Ninja 400", "Z400", "Versys 650", "Vulcan"],
-                "Harley-Davidson": ["Street 750", "Iron 883", "Sportster", "Fat Boy", "Road King"],
-                "BMW": ["G 310", "F 750 GS", "F 850 GS", "R 1250 GS", "S 1000 RR"],
-                "Ducati": ["Monster", "Panigale", "Scrambler", "Multistrada", "Diavel"],
-                "Triumph": ["Street Twin", "Bonneville", "Tiger", "Trident", "Speed Triple"],
-                "KTM": ["Duke 200", "Duke 390", "Adventure 390", "RC 390"],
-                "Royal Enfield": ["Himalayan", "Meteor", "Classic 350", "Interceptor 650"]
-            }
-        },
-        "Ônibus": {
-            "marcas": [
-                "Mercedes-Benz", "Volkswagen", "Volvo", "Scania", "Marcopolo",
-                "Comil", "Caio", "Neobus", "Busscar"
-            ],
-            "modelos": {
-                "Mercedes-Benz": ["O-500", "O-500 RS", "OF-1721", "OF-1519", "Citaro"],
-                "Volkswagen": ["Volksbus 15.190 OD", "Volksbus 17.230 OD", "Volksbus 18.280 OT", "Volksbus 9.160 OD"],
-                "Volvo": ["B270F", "B340R", "B380R", "B450R", "B8R"],
-                "Scania": ["K360", "K400", "K410", "K440", "F250"],
-                "Marcopolo": ["Paradiso", "Viaggio", "Audace", "Torino", "Senior"],
-                "Comil": ["Campione", "Versatile", "Invictus", "Svelto"],
-                "Caio": ["Apache", "Millennium", "Solar", "Foz"],
-                "Neobus": ["New Road", "Mega", "Thunder", "Spectrum"],
-                "Busscar": ["Urbanuss", "Vissta", "El Buss", "Jum Buss"]
-            }
-        },
-        "Van": {
-            "marcas": [
-                "Mercedes-Benz", "Fiat", "Renault", "Iveco", "Peugeot",
-                "Citroën", "Volkswagen", "Ford", "Hyundai"
-            ],
-            "modelos": {
-                "Mercedes-Benz": ["Sprinter", "Vito", "Vito Tourer", "V-Class"],
-                "Fiat": ["Ducato", "Fiorino", "Doblò", "Scudo"],
-                "Renault": ["Master", "Trafic", "Kangoo"],
-                "Iveco": ["Daily", "Daily Minibus", "Daily City"],
-                "Peugeot": ["Expert", "Boxer", "Partner"],
-                "Citroën": ["Jumper", "Jumpy", "Berlingo"],
-                "Volkswagen": ["Kombi", "Transporter", "Crafter", "Delivery"],
-                "Ford": ["Transit", "Transit Custom"],
-                "Hyundai": ["HR", "H100", "Starex"]
-            }
-        }
-    }
+    pesos = args.pesos or {}
     
-    # Vehicle colors
-    cores_veiculo = ["Preto", "Branco", "Prata", "Cinza", "Vermelho", "Azul", "Verde", "Amarelo", "Marrom", "Laranja"]
-    
-    # Camera IDs (using Distrito Federal highway and avenue designations)
-    ids_camera = [
-        "EPIA-001", "EPNB-001", "EPTG-001", "EPCT-001", "EPNA-001", 
-        "EPCL-001", "EPPR-001", "EPAR-001", "W3-001", "L2-001", 
-        "L4-001", "ESPM-001", "EPIG-001", "EPDB-001", "DF-001", 
-        "DF-002", "DF-003", "DF-004", "DF-005", "DF-085", 
-        "DF-095", "DF-075", "DF-079", "DF-150", "DF-140", 
-        "BR-020", "BR-040", "BR-060", "BR-070", "BR-251"
-    ]
-    
-    # Weather conditions (relevant to Distrito Federal)
-    condicoes_clima = ["Ensolarado", "Nublado", "Chuvoso", "Parcialmente Nublado", "Limpo", "Tempestuoso", "Ventoso"]
-    
-    # Visibility conditions
-    condicoes_visibilidade = ["Dia", "Noite", "Pôr do Sol", "Amanhecer", "Baixa Visibilidade"]
-    
-    # Road conditions
-    condicoes_estrada = ["Seca", "Molhada", "Alagada", "Em Obras", "Com Buracos", "Boa Condição"]
-    
-    # Traffic conditions
-    condicoes_trafego = ["Leve", "Moderado", "Intenso", "Congestionado", "Parado"]
-    
-    # Direction of travel (using Distrito Federal common directions)
-    direcoes = ["Plano Norte", "Plano Sul", "Asa Leste", "Asa Oeste", "Lago Norte", "Lago Sul", "Sentido Cidades Satélites", "Sentido Área Central"]
-    
-    # Popular locations in Distrito Federal
-    locais = [
-        "Congresso Nacional", "Esplanada dos Ministérios", "Ponte JK", 
-        "Rodoviária do Plano Piloto", "Estádio Mané Garrincha", 
-        "Praça dos Três Poderes", "Catedral Metropolitana", 
-        "Parque da Cidade", "Memorial JK", "Torre de TV", 
-        "Universidade de Brasília", "Aeroporto Internacional", 
-        "Setor Comercial Sul", "Setor Bancário Sul", "Setor Hoteleiro Norte",
-        "Setor de Embaixadas Sul", "Shopping Conjunto Nacional", 
-        "ParkShopping", "Taguatinga Shopping", "Pátio Brasil",
-        "Gilberto Salomão", "Lago Paranoá", "Pontão do Lago Sul"
-    ]
-    
-    # Limites de velocidade por tipo de local (km/h)
-    limites_velocidade = {
-        "Congresso Nacional": 40,
-        "Esplanada dos Ministérios": 60,
-        "Ponte JK": 60,
-        "Rodoviária do Plano Piloto": 40,
-        "Estádio Mané Garrincha": 40,
-        "Praça dos Três Poderes": 40,
-        "Catedral Metropolitana": 40,
-        "Parque da Cidade": 30,
-        "Memorial JK": 40,
-        "Torre de TV": 40,
-        "Universidade de Brasília": 40,
-        "Aeroporto Internacional": 60,
-        "Setor Comercial Sul": 40,
-        "Setor Bancário Sul": 40,
-        "Setor Hoteleiro Norte": 40,
-        "Setor de Embaixadas Sul": 60,
-        "Shopping Conjunto Nacional": 40,
-        "ParkShopping": 60,
-        "Taguatinga Shopping": 60,
-        "Pátio Brasil": 40,
-        "Gilberto Salomão": 60,
-        "Lago Paranoá": 60,
-        "Pontão do Lago Sul": 40
-    }
+    # Com --columns, todos os sorteios são feitos, mas as colunas fora de colunas_necessarias não são montadas
+    necessarias = colunas_necessarias(args.columns)
     
     # Criar listas vazias para armazenar os dados dos veículos
     tipos_veiculos = []
@@ -546,146 +1078,2561 @@ def generate_plate_data(args):
     modelos_veiculos = []
     
     # Gerar combinações realistas de tipo, marca e modelo
-    for _ in range(args.num_records):
-        # Escolher um tipo de veículo aleatório
-        tipo_veiculo = random.choice(list(tipos_veiculo_dados.keys()))
-        tipos_veiculos.append(tipo_veiculo)
+    with etapa("veiculos"):
+        lista_tipos = list(TIPOS_VEICULO_DADOS.keys())
+        for _ in range(args.num_records):
+            # Escolher um tipo de veículo aleatório
+            tipo_veiculo = escolher_valor(lista_tipos, pesos.get("tipo_veiculo"))
+            tipos_veiculos.append(tipo_veiculo)
+            
+            # Escolher uma marca compatível com o tipo de veículo
+            marca_veiculo = escolher_valor(TIPOS_VEICULO_DADOS[tipo_veiculo]["marcas"], pesos.get("marca_veiculo"))
+            marcas_veiculos.append(marca_veiculo)
+            
+            # Escolher um modelo compatível com a marca e tipo de veículo
+            modelo_veiculo = escolher_valor(TIPOS_VEICULO_DADOS[tipo_veiculo]["modelos"][marca_veiculo],
+                                            pesos.get("modelo_veiculo"))
+            modelos_veiculos.append(modelo_veiculo)
+    
+    # Generate data (as colunas são sorteadas nesta ordem; alterá-la muda os dados gerados)
+    data = {}
+    if "id_registro" in necessarias:
+        with etapa("id_registro"):
+            # Usar UUIDs determinísticos para garantir reprodutibilidade completa
+            data["id_registro"] = [generate_deterministic_uuid(args.seed, i) for i in range(args.num_records)]
+    with etapa("numero_placa"):
+        data["numero_placa"] = [generate_license_plate() for _ in range(args.num_records)]
+    with etapa("categorias"):
+        data["regiao_administrativa"] = sortear_lista(pesos, "regiao_administrativa", args.num_records)
+        data["tipo_placa"] = sortear_lista(pesos, "tipo_placa", args.num_records)
         
-        # Escolher uma marca compatível com o tipo de veículo
-        marca_veiculo = random.choice(tipos_veiculo_dados[tipo_veiculo]["marcas"])
-        marcas_veiculos.append(marca_veiculo)
+        # Vehicle attributes with realistic combinations
+        data["tipo_veiculo"] = tipos_veiculos
+        data["marca_veiculo"] = marcas_veiculos
+        data["modelo_veiculo"] = modelos_veiculos
         
-        # Escolher um modelo compatível com a marca e tipo de veículo
-        modelo_veiculo = random.choice(tipos_veiculo_dados[tipo_veiculo]["modelos"][marca_veiculo])
-        modelos_veiculos.append(modelo_veiculo)
-    
-    # Generate data
-    data = {
-        # Usar UUIDs determinísticos para garantir reprodutibilidade completa
-        "id_registro": [generate_deterministic_uuid(args.seed, i) for i in range(args.num_records)],
-        "numero_placa": [generate_license_plate() for _ in range(args.num_records)],
-        "regiao_administrativa": [random.choice(df_regions) for _ in range(args.num_records)],
-        "tipo_placa": [random.choice(tipos_placa) for _ in range(args.num_records)],
+        # Add location information
+        locais_gerados = sortear_lista(pesos, "local", args.num_records)
+        data["local"] = locais_gerados
         
-        # Vehicle attributes with realistic combinations
-        "tipo_veiculo": tipos_veiculos,
-        "marca_veiculo": marcas_veiculos,
-        "modelo_veiculo": modelos_veiculos,
-    }
+        data["cor_veiculo"] = sortear_lista(pesos, "cor_veiculo", args.num_records)
+    with etapa("numericos"):
+        data["ano_veiculo"] = [random.randint(args.ano_min, args.ano_max) for _ in range(args.num_records)]
+    
+    # Generate timestamps over the last N days (segundos antes do instante de referência, sem passar por texto)
+    agora = instante_referencia(args)
+    with etapa("timestamps"):
+        deslocamentos = [
+            random.randint(0, args.dias_passados) * 86400
+            + random.randint(0, 23) * 3600
+            + random.randint(0, 59) * 60
+            + random.randint(0, 59)
+            for _ in range(args.num_records)
+        ]
+        data["data_hora"] = agora - np.array(deslocamentos, dtype="timedelta64[s]")
+    
+    # Generate realistic latitude and longitude for Distrito Federal
+    with etapa("numericos"):
+        data["latitude"] = [round(random.uniform(args.lat_min, args.lat_max), 6) for _ in range(args.num_records)]
+        data["longitude"] = [round(random.uniform(args.long_min, args.long_max), 6) for _ in range(args.num_records)]
+    with etapa("categorias"):
+        data["id_camera"] = sortear_lista(pesos, "id_camera", args.num_records)
+    if "caminho_imagem" in necessarias:
+        with etapa("caminho_imagem"):
+            data["caminho_imagem"] = [f"/imagens/captura_{i:04d}.jpg" for i in range(args.num_records)]
+    with etapa("numericos"):
+        data["confianca_ocr"] = [round(random.uniform(0.70, 1.0), 2) for _ in range(args.num_records)]
+    
+    # Environmental data (adjusted for Distrito Federal's climate)
+    with etapa("categorias"):
+        data["condicao_clima"] = sortear_lista(pesos, "condicao_clima", args.num_records)
+    with etapa("numericos"):
+        # Distrito Federal has a specific climate with dry and wet seasons
+        data["temperatura"] = [round(random.uniform(args.temp_min, args.temp_max), 1) for _ in range(args.num_records)] # Celsius, specific to DF
+    with etapa("categorias"):
+        data["visibilidade"] = sortear_lista(pesos, "visibilidade", args.num_records)
+        data["condicao_estrada"] = sortear_lista(pesos, "condicao_estrada", args.num_records)
+        data["condicao_trafego"] = sortear_lista(pesos, "condicao_trafego", args.num_records)
+    
+    # Additional fields
+    with etapa("numericos"):
+        data["velocidade"] = [random.randint(args.velocidade_min, args.velocidade_max) for _ in range(args.num_records)] # km/h
+    with etapa("categorias"):
+        data["direcao_deslocamento"] = sortear_lista(pesos, "direcao_deslocamento", args.num_records)
+    
+    # Gerar dados de infração (último sorteio; fora de --columns, pode ser omitido sem alterar as demais colunas)
+    with etapa("infracao"):
+        if "infracao" in necessarias:
+            infracoes = []
+            for i in range(args.num_records):
+                local = locais_gerados[i]
+                limite_velocidade = LIMITES_VELOCIDADE.get(local, 60)  # Padrão 60 km/h se não especificado
+                
+                infracao = determinar_infracao(
+                    data["velocidade"][i], 
+                    limite_velocidade, 
+                    data["condicao_estrada"][i], 
+                    data["condicao_clima"][i],
+                    data["tipo_veiculo"][i],
+                    data["ano_veiculo"][i],
+                    ano_referencia=agora.astype(object).year
+                )
+                infracoes.append(infracao)
+            
+            # Adicionar a coluna de infrações ao dicionário de dados
+            data["infracao"] = infracoes
+        data["limite_velocidade"] = [LIMITES_VELOCIDADE.get(local, 60) for local in locais_gerados]
     
-    # Add location information
-    locais_gerados = [random.choice(locais) for _ in range(args.num_records)]
-    data["local"] = locais_gerados
+    # Convert to DataFrame
+    with etapa("dataframe"):
+        df = pd.DataFrame({coluna: valores for coluna, valores in data.items() if coluna in necessarias})
+    
+    # Add derived fields
+    with etapa("campos_derivados"):
+        adicionar_campos_derivados(df, necessarias)
     
-    # Continue with remaining fields
-    data.update({
-        "cor_veiculo": [random.choice(cores_veiculo) for _ in range(args.num_records)],
-        "ano_veiculo": [random.randint(args.ano_min, args.ano_max) for _ in range(args.num_records)],
+    return df[args.columns] if args.columns else df
+
+def civil_de_dias(dias):
+    """Converte dias desde 1970-01-01 em (ano, mês, dia) do calendário gregoriano, só com aritmética inteira
+    
+    Algoritmo de Howard Hinnant (days_from_civil invertido), em eras de 400 anos começando em março.
+    """
+    z = dias + 719468
+    era = z // 146097
+    dia_era = z - era * 146097
+    ano_era = (dia_era - dia_era // 1460 + dia_era // 36524 - dia_era // 146096) // 365
+    dia_ano = dia_era - (365 * ano_era + ano_era // 4 - ano_era // 100)
+    mes_marco = (5 * dia_ano + 2) // 153
+    dia = dia_ano - (153 * mes_marco + 2) // 5 + 1
+    mes = np.where(mes_marco < 10, mes_marco + 3, mes_marco - 9)
+    ano = ano_era + era * 400 + (mes <= 2)
+    return ano, mes, dia
+
+def dias_de_civil(ano, mes, dia):
+    """Dias desde 1970-01-01 de uma data gregoriana (inverso de civil_de_dias)"""
+    ano = ano - (mes <= 2)
+    era = ano // 400
+    ano_era = ano - era * 400
+    dia_ano = (153 * (mes + np.where(mes > 2, -3, 9)) + 2) // 5 + dia - 1
+    dia_era = ano_era * 365 + ano_era // 4 - ano_era // 100 + dia_ano
+    return era * 146097 + dia_era - 719468
+
+def adicionar_campos_derivados(df, colunas=None):
+    """Adiciona os campos de calendário de data_hora com aritmética sobre os segundos desde 1970
+    
+    data_hora continua datetime64; apenas os sinks de texto o formatam. A semana ISO é a da quinta-feira
+    da mesma semana, que também define o ano ISO. Com colunas, adiciona só os campos presentes nelas.
+    """
+    campos = [campo for campo in ("dia_semana", "hora_dia", "semana", "mes", "ano") if colunas is None or campo in colunas]
+    if not campos:
+        return
+    segundos = df["data_hora"].to_numpy().astype("datetime64[s]").astype(np.int64)
+    dias = segundos // 86400
+    hora = (segundos - dias * 86400) // 3600
+    
+    # Os registros cobrem poucos dias distintos: o calendário é calculado uma vez por dia e indexado
+    primeiro = dias.min() if len(dias) else 0
+    indice = dias - primeiro
+    dia = np.arange(primeiro, primeiro + (indice.max() + 1 if len(dias) else 0), dtype=np.int64)
+    dia_semana = (dia + 3) % 7  # 1970-01-01 foi uma quinta-feira; segunda-feira = 0
+    ano, mes, _ = civil_de_dias(dia)
+    quinta = dia - dia_semana + 3
+    ano_iso, _, _ = civil_de_dias(quinta)
+    semana = (quinta - dias_de_civil(ano_iso, 1, 1)) // 7 + 1
+    
+    valores = {
+        "dia_semana": lambda: pd.Categorical.from_codes(dia_semana.astype(np.int8)[indice], DIAS_SEMANA),
+        "hora_dia": lambda: hora.astype(np.int8),
+        "semana": lambda: semana.astype(np.int8)[indice],
+        "mes": lambda: mes.astype(np.int8)[indice],
+        "ano": lambda: ano.astype(np.int16)[indice],
+    }
+    for campo in campos:
+        df[campo] = valores[campo]()
+
+# %%
+# Motor de geração vetorizado (numpy.random.Generator)
+
+LETRAS_PLACA = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)
+DIGITOS_PLACA = np.frombuffer(b"0123456789", dtype=np.uint8)
+
+def sortear_codigos(rng, coluna, n, tabelas=None):
+    """Sorteia n códigos do vocabulário da coluna, com a tabela alias da coluna se ela tiver pesos (--pesos)"""
+    if not tabelas or coluna not in tabelas:
+        return rng.integers(0, len(VOCABULARIOS[coluna]), size=n)
+    return sortear_alias(rng, *tabelas[coluna], n)
+
+def sortear_alias(rng, probabilidade, alias, n):
+    """Sorteia n índices com a tabela alias (probabilidade, alias), usando um único uniforme por índice"""
+    posicao = rng.random(n) * len(probabilidade)
+    k = np.minimum(posicao.astype(np.int64), len(probabilidade) - 1)
+    # A parte fracionária serve de segundo uniforme, então o sorteio ponderado custa o mesmo que o uniforme
+    return np.where(posicao - k < probabilidade[k], k, alias[k])
+
+def sortear_categoria(rng, coluna, n, tabelas=None):
+    """Sorteia n valores do vocabulário da coluna como um pd.Categorical (códigos int8/int16)"""
+    return pd.Categorical.from_codes(sortear_codigos(rng, coluna, n, tabelas), VOCABULARIOS[coluna])
+
+# Constantes do finalizador SplitMix64, usado como hash de contador (seed, índice) -> 64 bits
+MASCARA_64 = (1 << 64) - 1
+INCREMENTO_SPLITMIX = 0x9E3779B97F4A7C15
+
+def misturar_64(x):
+    """Finalizador do SplitMix64: bijeção de uint64 com boa difusão de bits (vetorizado)"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+# Primeiro fluxo de --counter-rng, separado dos fluxos dos UUIDs (1 e 2) e das placas únicas (16 em diante)
+FLUXO_CONTADOR = 0x434F4E54
+
+def chave_contador(seed, fluxo):
+    """Deriva a chave de 64 bits de um fluxo do hash de contador a partir da seed"""
+    chave = np.array([(seed * INCREMENTO_SPLITMIX + fluxo) & MASCARA_64], dtype=np.uint64)
+    return misturar_64(chave)[0]
+
+class GeradorContador:
+    """Substituto do gerador do bloco (--counter-rng) em que cada valor é uma função pura do índice do registro
+    
+    Cada chamada (uma por coluna ou parte de coluna, sempre na mesma ordem) usa um fluxo próprio, e o valor
+    do registro i nesse fluxo é o SplitMix64 de contador chave + i * incremento. Assim o registro i não
+    depende dos demais nem do bloco em que é gerado. Oferece apenas os métodos usados na geração.
+    """
+    
+    def __init__(self, seed, inicio, n):
+        self.seed = seed
+        self.n = n
+        self.indices = np.arange(inicio, inicio + n, dtype=np.uint64)
+        self.fluxo = 0
+    
+    def bits(self):
+        """64 bits por registro do próximo fluxo"""
+        chave = chave_contador(self.seed, FLUXO_CONTADOR + self.fluxo)
+        self.fluxo += 1
+        return misturar_64(self.indices * np.uint64(INCREMENTO_SPLITMIX) + chave)
+    
+    def random(self, size=None):
+        return (self.bits() >> np.uint64(11)) * (1.0 / (1 << 53))
+    
+    def uniform(self, low=0.0, high=1.0, size=None):
+        return low + (high - low) * self.random()
+    
+    def integers(self, low, high=None, size=None):
+        if high is None:
+            low, high = 0, low
+        amplitude = np.asarray(high, dtype=np.int64) - low
+        return low + np.minimum((self.random() * amplitude).astype(np.int64), amplitude - 1)
+    
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        # Box-Muller com os dois uniformes tirados dos mesmos 64 bits e do seu hash
+        x = self.bits()
+        u1 = (x >> np.uint64(11)) * (1.0 / (1 << 53))
+        u2 = (misturar_64(x) >> np.uint64(11)) * (1.0 / (1 << 53))
+        return loc + scale * np.sqrt(-2.0 * np.log1p(-u1)) * np.cos(2.0 * np.pi * u2)
+
+HEX_UUID = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+# Posição de cada dígito hexadecimal no texto canônico do UUID (8-4-4-4-12)
+POSICOES_HEX_UUID = np.array([p for p in range(36) if p not in (8, 13, 18, 23)])
+
+def gerar_uuids_deterministicos(seed, inicio, n, binario=False):
+    """Gera n UUIDs versão 4 para os índices inicio..inicio+n-1 de uma só vez
+    
+    Cada UUID é uma função pura de (seed, índice): os 128 bits vêm de dois hashes SplitMix64
+    do índice, com os bits de versão e variante ajustados sobre a matriz de bytes.
+    Com binario=True, retorna os 16 bytes de cada UUID sem formatação (ex.: BINARY(16)).
+    """
+    indices = np.arange(inicio, inicio + n, dtype=np.uint64)
+    palavras = np.empty((n, 2), dtype=">u8")
+    palavras[:, 0] = misturar_64(indices + chave_contador(seed, 1))
+    palavras[:, 1] = misturar_64(indices + chave_contador(seed, 2))
+    
+    octetos = palavras.view(np.uint8).reshape(n, 16)
+    octetos[:, 6] = (octetos[:, 6] & 0x0F) | 0x40  # versão 4
+    octetos[:, 8] = (octetos[:, 8] & 0x3F) | 0x80  # variante DCE 1.1
+    if binario:
+        return octetos.view("V16").ravel().tolist()
+    
+    texto = np.full((n, 36), ord("-"), dtype=np.uint8)
+    texto[:, POSICOES_HEX_UUID[0::2]] = HEX_UUID[octetos >> 4]
+    texto[:, POSICOES_HEX_UUID[1::2]] = HEX_UUID[octetos & 0x0F]
+    return texto.view("S36").ravel().astype(str)
+
+# Espaço de códigos das placas: [0, PLACAS_TRADICIONAIS) são ABC1234 e o restante, ABC1D23
+PLACAS_TRADICIONAIS = 26**3 * 10**4
+PLACAS_MERCOSUL = 26**3 * 10 * 26 * 10**2
+TOTAL_PLACAS = PLACAS_TRADICIONAIS + PLACAS_MERCOSUL
+
+def decodificar_placas(codigos):
+    """Converte códigos inteiros do espaço de placas nas placas em texto, todas de uma vez"""
+    codigos = np.asarray(codigos, dtype=np.int64)
+    mercosul = codigos >= PLACAS_TRADICIONAIS
+    resto = np.where(mercosul, codigos - PLACAS_TRADICIONAIS, codigos)
+    
+    # Os 4 caracteres finais: 4 dígitos (ABC1234) ou dígito, letra e 2 dígitos (ABC1D23)
+    sufixo = np.where(mercosul, resto % 26000, resto % 10000)
+    letras = np.where(mercosul, resto // 26000, resto // 10000)
+    
+    placas = np.empty((codigos.size, 7), dtype=np.uint8)
+    placas[:, 0] = LETRAS_PLACA[letras // 676]
+    placas[:, 1] = LETRAS_PLACA[letras // 26 % 26]
+    placas[:, 2] = LETRAS_PLACA[letras % 26]
+    placas[:, 3] = DIGITOS_PLACA[np.where(mercosul, sufixo // 2600, sufixo // 1000)]
+    placas[:, 4] = np.where(mercosul, LETRAS_PLACA[sufixo // 100 % 26], DIGITOS_PLACA[sufixo // 100 % 10])
+    placas[:, 5] = DIGITOS_PLACA[sufixo // 10 % 10]
+    placas[:, 6] = DIGITOS_PLACA[sufixo % 10]
+    return placas.view("S7").ravel().astype(str)
+
+def sortear_codigos_placas(rng, n):
+    """Sorteia n códigos do espaço de placas, metade em cada formato"""
+    mercosul = rng.integers(0, 2, size=n)
+    indices = rng.integers(0, np.where(mercosul == 1, PLACAS_MERCOSUL, PLACAS_TRADICIONAIS))
+    return indices + mercosul * PLACAS_TRADICIONAIS
+
+def gerar_placas_numpy(rng, n):
+    """Gera n placas, metade em cada formato, sorteando códigos inteiros do espaço de placas"""
+    return decodificar_placas(sortear_codigos_placas(rng, n))
+
+# Rede de Feistel de 30 bits (2^30 >= TOTAL_PLACAS) usada para permutar o espaço de placas
+BITS_MEIA_FEISTEL = 15
+MASCARA_MEIA_FEISTEL = (1 << BITS_MEIA_FEISTEL) - 1
+RODADAS_FEISTEL = 4
+
+def permutar_placas(seed, indices):
+    """Permutação pseudoaleatória de [0, TOTAL_PLACAS) definida pela seed (Feistel com cycle-walking)
+    
+    Índices distintos sempre levam a códigos distintos, então as placas dos registros 0..N-1 são
+    uma amostra sem reposição, calculada para cada índice sem depender dos demais.
+    """
+    chaves = [chave_contador(seed, 16 + rodada) for rodada in range(RODADAS_FEISTEL)]
+    
+    def feistel(x):
+        esquerda = x >> np.uint64(BITS_MEIA_FEISTEL)
+        direita = x & np.uint64(MASCARA_MEIA_FEISTEL)
+        for chave in chaves:
+            mistura = misturar_64(direita + chave) & np.uint64(MASCARA_MEIA_FEISTEL)
+            esquerda, direita = direita, esquerda ^ mistura
+        return (esquerda << np.uint64(BITS_MEIA_FEISTEL)) | direita
+    
+    codigos = feistel(np.asarray(indices, dtype=np.uint64))
+    # Cycle-walking: reaplica a permutação aos códigos que caíram fora do espaço de placas
+    fora = np.flatnonzero(codigos >= TOTAL_PLACAS)
+    while fora.size:
+        codigos[fora] = feistel(codigos[fora])
+        fora = fora[codigos[fora] >= TOTAL_PLACAS]
+    return codigos.astype(np.int64)
+
+def gerar_placas_bloco(args, rng, inicio, n, decodificar=True, linhas=slice(None)):
+    """Gera a coluna numero_placa das linhas `linhas` de um bloco, sem repetições com --unique-plates
+    
+    Sem decodificar (coluna fora de --columns), apenas consome os sorteios, para não alterar as demais colunas.
+    """
+    if args.unique_plates:
+        return decodificar_placas(permutar_placas(args.seed, np.arange(inicio, inicio + n)[linhas])) if decodificar else None
+    codigos = sortear_codigos_placas(rng, n)
+    return decodificar_placas(codigos[linhas]) if decodificar else None
+
+# Versão do formato do catálogo compilado; alterar invalida os arquivos em cache
+VERSAO_CATALOGO = 1
+
+DIRETORIO_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "gen-plates")
+
+def tabela_alias(pesos):
+    """Tabela do método alias (Vose) para sortear índices com os pesos dados em tempo O(1)
+    
+    Retorna (probabilidade, alias): sorteado o índice k uniforme, fica-se com k se um segundo
+    uniforme for menor que probabilidade[k] e, caso contrário, com alias[k].
+    """
+    pesos = np.asarray(pesos, dtype=np.float64)
+    if not pesos.sum() > 0:
+        raise ValueError("a soma dos pesos de cada grupo de valores deve ser positiva")
+    escala = pesos * (len(pesos) / pesos.sum())
+    probabilidade = np.ones(len(pesos))
+    alias = np.arange(len(pesos))
+    pequenos = [i for i, valor in enumerate(escala) if valor < 1.0]
+    grandes = [i for i, valor in enumerate(escala) if valor >= 1.0]
+    while pequenos and grandes:
+        menor, maior = pequenos.pop(), grandes.pop()
+        probabilidade[menor] = escala[menor]
+        alias[menor] = maior
+        escala[maior] -= 1.0 - escala[menor]
+        (pequenos if escala[maior] < 1.0 else grandes).append(maior)
+    return probabilidade, alias
+
+def compilar_nivel(segmentos, pesos):
+    """Tabelas alias de um nível do catálogo, com os itens de cada segmento contíguos na tabela plana"""
+    segmentos = np.asarray(segmentos, dtype=np.int64)
+    tamanho = np.bincount(segmentos)
+    inicio = np.concatenate([[0], np.cumsum(tamanho)[:-1]])
+    probabilidade = np.empty(len(segmentos))
+    alias = np.empty(len(segmentos), dtype=np.int64)
+    pesos = np.asarray(pesos, dtype=np.float64)
+    for s in range(len(tamanho)):
+        fatia = slice(inicio[s], inicio[s] + tamanho[s])
+        probabilidade[fatia], alias_local = tabela_alias(pesos[fatia])
+        alias[fatia] = inicio[s] + alias_local
+    return {"inicio": inicio, "tamanho": tamanho, "probabilidade": probabilidade, "alias": alias}
+
+def sortear_nivel(catalogo, nivel, segmentos, u):
+    """Sorteia, para cada linha, um item do seu segmento no nível compilado, usando um único uniforme u"""
+    tamanho = catalogo[f"{nivel}_tamanho"][segmentos]
+    posicao = u * tamanho
+    local = np.minimum(posicao.astype(np.int64), tamanho - 1)
+    k = catalogo[f"{nivel}_inicio"][segmentos] + local
+    # A parte fracionária de u * tamanho é um segundo uniforme, independente do índice sorteado
+    return np.where(posicao - local < catalogo[f"{nivel}_probabilidade"][k], k, catalogo[f"{nivel}_alias"][k])
+
+def compilar_catalogo_veiculos(catalogo, pesos=None):
+    """Compila o catálogo aninhado tipo -> marca -> modelo em tabelas planas para sorteio vetorizado
+    
+    As marcas de cada tipo e os modelos de cada par (tipo, marca) ficam contíguos em tabelas planas,
+    com início e tamanho de cada segmento e uma tabela alias por segmento. `pesos` pode definir pesos
+    por nome em cada nível, ex.: {"tipo_veiculo": {"Carro": 6, "Motocicleta": 2}, "marca_veiculo": {"Fiat": 3}};
+    o peso padrão é 1.
+    """
+    pesos = pesos or {}
+    pesos_tipos = pesos.get("tipo_veiculo", {})
+    pesos_marcas = pesos.get("marca_veiculo", {})
+    pesos_modelos = pesos.get("modelo_veiculo", {})
+    codigo_marca = {marca: codigo for codigo, marca in enumerate(VOCABULARIOS["marca_veiculo"])}
+    codigo_modelo = {modelo: codigo for codigo, modelo in enumerate(VOCABULARIOS["modelo_veiculo"])}
+    
+    tipos, marcas, modelos = [], [], []
+    for t, (tipo, dados_tipo) in enumerate(catalogo.items()):
+        tipos.append((0, pesos_tipos.get(tipo, 1.0)))
+        for marca in dados_tipo["marcas"]:
+            par = len(marcas)
+            marcas.append((t, codigo_marca[marca], pesos_marcas.get(marca, 1.0)))
+            modelos.extend((par, codigo_modelo[modelo], pesos_modelos.get(modelo, 1.0))
+                           for modelo in dados_tipo["modelos"][marca])
+    
+    segmento_marcas, codigos_marcas, peso_marcas = zip(*marcas)
+    segmento_modelos, codigos_modelos, peso_modelos = zip(*modelos)
+    compilado = {"codigos_marcas": np.array(codigos_marcas, dtype=np.int16),
+                 "codigos_modelos": np.array(codigos_modelos, dtype=np.int16)}
+    for nivel, segmentos, pesos_nivel in [("tipos", *zip(*tipos)),
+                                          ("marcas", segmento_marcas, peso_marcas),
+                                          ("modelos", segmento_modelos, peso_modelos)]:
+        for nome, tabela in compilar_nivel(segmentos, pesos_nivel).items():
+            compilado[f"{nivel}_{nome}"] = tabela
+    return compilado
+
+def chave_catalogo(catalogo, pesos):
+    """Hash do catálogo, dos vocabulários e dos pesos, usado como nome do arquivo em cache"""
+    conteudo = json.dumps([VERSAO_CATALOGO, catalogo, VOCABULARIOS["marca_veiculo"],
+                           VOCABULARIOS["modelo_veiculo"], pesos or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:16]
+
+@functools.lru_cache(maxsize=8)
+def carregar_catalogo_veiculos(pesos_json=None):
+    """Catálogo de veículos compilado, lido do cache em disco (.npz) ou compilado e salvo nele
+    
+    Os pesos são recebidos como JSON para que a chamada possa ser memorizada por processo.
+    """
+    pesos = json.loads(pesos_json) if pesos_json else None
+    caminho = os.path.join(DIRETORIO_CACHE, f"catalogo_veiculos_{chave_catalogo(TIPOS_VEICULO_DADOS, pesos)}.npz")
+    try:
+        with np.load(caminho) as arquivo:
+            return {nome: arquivo[nome] for nome in arquivo.files}
+    except (OSError, ValueError):
+        pass
+    
+    compilado = compilar_catalogo_veiculos(TIPOS_VEICULO_DADOS, pesos)
+    try:
+        # Grava em um arquivo temporário e renomeia, pois vários processos podem compilar ao mesmo tempo
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=DIRETORIO_CACHE, suffix=".npz", delete=False) as temporario:
+            np.savez(temporario, **compilado)
+        os.replace(temporario.name, caminho)
+    except OSError:
+        pass  # sem cache em disco (ex.: diretório somente leitura), o catálogo é compilado a cada execução
+    return compilado
+
+# Colunas sorteadas diretamente do vocabulário e colunas do catálogo de veículos, que aceitam --pesos
+COLUNAS_SORTEADAS = ["regiao_administrativa", "tipo_placa", "local", "cor_veiculo", "id_camera", "condicao_clima",
+                     "visibilidade", "condicao_estrada", "condicao_trafego", "direcao_deslocamento"]
+COLUNAS_VEICULO = ["tipo_veiculo", "marca_veiculo", "modelo_veiculo"]
+COLUNAS_COM_PESO = COLUNAS_SORTEADAS + COLUNAS_VEICULO
+
+def carregar_pesos(valor):
+    """Lê --pesos: um objeto já carregado do arquivo de configuração, um texto JSON ou o caminho de um arquivo JSON"""
+    if not valor:
+        return {}
+    if isinstance(valor, dict):
+        return valor
+    if os.path.exists(valor):
+        with open(valor, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return json.loads(valor)
+
+def validar_pesos(pesos):
+    """Retorna uma mensagem de erro se os pesos forem inválidos, ou None"""
+    if not isinstance(pesos, dict):
+        return "--pesos deve ser um objeto JSON no formato {coluna: {valor: peso}}."
+    for coluna, pesos_coluna in pesos.items():
+        if coluna not in COLUNAS_COM_PESO:
+            return f"A coluna {coluna} não aceita pesos (opções: {', '.join(COLUNAS_COM_PESO)})."
+        if not isinstance(pesos_coluna, dict):
+            return f"Os pesos de {coluna} devem ser um objeto JSON no formato {{valor: peso}}."
+        desconhecidos = [valor for valor in pesos_coluna if valor not in VOCABULARIOS[coluna]]
+        if desconhecidos:
+            return f"Valores desconhecidos em {coluna}: {', '.join(desconhecidos)}."
+        if any(isinstance(peso, bool) or not isinstance(peso, (int, float)) or peso < 0
+               for peso in pesos_coluna.values()):
+            return f"Os pesos de {coluna} devem ser números não negativos."
+    return None
+
+def chave_pesos(pesos, colunas):
+    """JSON canônico dos pesos das colunas indicadas, ou None se nenhuma tiver pesos"""
+    selecionados = {coluna: pesos[coluna] for coluna in colunas if coluna in (pesos or {})}
+    return json.dumps(selecionados, sort_keys=True, ensure_ascii=False) if selecionados else None
+
+@functools.lru_cache(maxsize=8)
+def tabelas_alias_colunas(pesos_json):
+    """Tabelas alias das colunas sorteadas que têm pesos; valores sem peso informado têm peso 1"""
+    if not pesos_json:
+        return {}
+    pesos = json.loads(pesos_json)
+    return {coluna: tabela_alias([pesos[coluna].get(valor, 1.0) for valor in VOCABULARIOS[coluna]])
+            for coluna in pesos}
+
+def tabelas_pesos(args):
+    """Tabelas alias das colunas sorteadas e catálogo de veículos compilado com os pesos de --pesos"""
+    return (tabelas_alias_colunas(chave_pesos(args.pesos, COLUNAS_SORTEADAS)),
+            carregar_catalogo_veiculos(chave_pesos(args.pesos, COLUNAS_VEICULO)))
+
+def gerar_veiculos_numpy(rng, n, catalogo=None):
+    """Gera tipo, marca e modelo compatíveis entre si com três consultas às tabelas do catálogo compilado"""
+    if catalogo is None:
+        catalogo = carregar_catalogo_veiculos()
+    idx_tipo = sortear_nivel(catalogo, "tipos", np.zeros(n, dtype=np.int64), rng.random(n))
+    idx_marca = sortear_nivel(catalogo, "marcas", idx_tipo, rng.random(n))
+    idx_modelo = sortear_nivel(catalogo, "modelos", idx_marca, rng.random(n))
+    
+    return (pd.Categorical.from_codes(idx_tipo, VOCABULARIOS["tipo_veiculo"]),
+            pd.Categorical.from_codes(catalogo["codigos_marcas"][idx_marca], VOCABULARIOS["marca_veiculo"]),
+            pd.Categorical.from_codes(catalogo["codigos_modelos"][idx_modelo], VOCABULARIOS["modelo_veiculo"]))
+
+# Entropia extra que separa o gerador da frota dos geradores dos blocos
+FLUXO_FROTA = 0x46524F5441
+
+# Colunas fixas de cada veículo da frota (--fleet-size)
+COLUNAS_FROTA = ["numero_placa", "tipo_placa", "tipo_veiculo", "marca_veiculo", "modelo_veiculo",
+                 "cor_veiculo", "ano_veiculo"]
+
+@functools.lru_cache(maxsize=4)
+def gerar_frota(seed, tamanho, ano_min, ano_max, pesos_json=None):
+    """Gera os atributos fixos dos veículos da frota (códigos das colunas categóricas), um por placa única"""
+    rng = np.random.default_rng(np.random.SeedSequence([seed, FLUXO_FROTA]))
+    pesos = json.loads(pesos_json) if pesos_json else {}
+    tabelas = tabelas_alias_colunas(chave_pesos(pesos, COLUNAS_SORTEADAS))
+    tipos, marcas, modelos = gerar_veiculos_numpy(rng, tamanho, carregar_catalogo_veiculos(chave_pesos(pesos, COLUNAS_VEICULO)))
+    return {
+        "numero_placa": decodificar_placas(permutar_placas(seed, np.arange(tamanho))),
+        "tipo_placa": sortear_codigos(rng, "tipo_placa", tamanho, tabelas),
+        "tipo_veiculo": tipos.codes,
+        "marca_veiculo": marcas.codes,
+        "modelo_veiculo": modelos.codes,
+        "cor_veiculo": sortear_codigos(rng, "cor_veiculo", tamanho, tabelas),
+        "ano_veiculo": rng.integers(ano_min, ano_max + 1, size=tamanho).astype(np.int16),
+    }
+
+def avistamentos_frota(args, rng, n):
+    """Sorteia o veículo da frota de cada um dos n registros e retorna as colunas fixas correspondentes"""
+    frota = gerar_frota(args.seed, args.fleet_size, args.ano_min, args.ano_max, chave_pesos(args.pesos, COLUNAS_COM_PESO))
+    idx_veiculo = rng.integers(0, args.fleet_size, size=n)
+    colunas = {}
+    for coluna in COLUNAS_FROTA:
+        valores = frota[coluna][idx_veiculo]
+        if coluna in VOCABULARIOS:
+            valores = pd.Categorical.from_codes(valores, VOCABULARIOS[coluna])
+        colunas[coluna] = valores
+    return colunas
+
+CODIGOS_INFRACAO = {chave: codigo for codigo, chave in enumerate(INFRACOES)}
+
+def pertence(valores, lista):
+    """Máscara dos valores contidos na lista, comparando códigos quando a coluna é categórica"""
+    if isinstance(valores, pd.Categorical):
+        return np.isin(valores.codes, valores.categories.get_indexer(lista))
+    return np.isin(valores, lista)
+
+def mapear_fatores(valores, fatores):
+    """Converte uma coluna de condições no vetor de fatores de ajuste do limite (1.0 quando não há ajuste)"""
+    resultado = np.ones(len(valores))
+    for condicao, fator in fatores.items():
+        resultado[pertence(valores, [condicao])] = fator
+    return resultado
+
+def determinar_infracoes(rng, velocidade, limite_velocidade, condicao_estrada, condicao_clima,
+                         tipo_veiculo, ano_veiculo, ano_referencia=None, linhas=slice(None), n_bloco=None):
+    """Versão em lote de determinar_infracao: avalia colunas inteiras e retorna os códigos das infrações
+    
+    Os códigos indexam VOCABULARIOS["infracao"]. As regras vêm de FAIXAS_EXCESSO_VELOCIDADE e
+    REGRAS_INFRACAO, de modo que novas regras custam uma operação vetorizada e não um laço por registro.
+    Com n_bloco, as colunas são as linhas `linhas` de um bloco de n_bloco registros: os sorteios cobrem o
+    bloco inteiro, como se todas as linhas fossem avaliadas.
+    """
+    velocidade = np.asarray(velocidade, dtype=np.float64)
+    limite = np.asarray(limite_velocidade, dtype=np.float64)
+    n = velocidade.size
+    n_bloco = n if n_bloco is None else n_bloco
+    if ano_referencia is None:
+        ano_referencia = datetime.datetime.now().year
+    idade = ano_referencia - np.asarray(ano_veiculo)
+    
+    # Limite ajustado pelas condições da via e do clima
+    limite_ajustado = (limite
+                       * mapear_fatores(condicao_estrada, FATORES_LIMITE_ESTRADA)
+                       * mapear_fatores(condicao_clima, FATORES_LIMITE_CLIMA))
+    
+    # A primeira coluna de candidatas é o excesso de velocidade, cuja faixa varia por registro
+    candidatas = np.zeros((n, len(REGRAS_INFRACAO) + 1), dtype=bool)
+    candidatas[:, 0] = velocidade > limite_ajustado
+    percentual_excesso = (velocidade - limite_ajustado) / limite_ajustado * 100
+    faixas = np.searchsorted([limite for limite, _ in FAIXAS_EXCESSO_VELOCIDADE], percentual_excesso)
+    codigos_faixas = np.array([CODIGOS_INFRACAO[chave] for _, chave in FAIXAS_EXCESSO_VELOCIDADE])
+    codigo_excesso = codigos_faixas[np.minimum(faixas, len(codigos_faixas) - 1)]
+    
+    for j, regra in enumerate(REGRAS_INFRACAO, start=1):
+        aplica = np.ones(n, dtype=bool)
+        if "idade_minima" in regra:
+            aplica &= idade > regra["idade_minima"]
+        if "tipos_excluidos" in regra:
+            aplica &= ~pertence(tipo_veiculo, regra["tipos_excluidos"])
+        if "fracao_limite" in regra:
+            adversa = (pertence(condicao_estrada, regra.get("condicao_estrada", []))
+                       | pertence(condicao_clima, regra.get("condicao_clima", [])))
+            aplica &= adversa & (velocidade > regra["fracao_limite"] * limite)
+        if "probabilidade" in regra:
+            probabilidade = regra["probabilidade"]
+            if "escala_idade" in regra:
+                probabilidade = probabilidade * (idade / regra["escala_idade"])
+            aplica &= rng.random(n_bloco)[linhas] < probabilidade
+        candidatas[:, j] = aplica
+    
+    # Sorteia uma das candidatas de cada registro: a posição sorteada é localizada pela soma acumulada
+    total = candidatas.sum(axis=1)
+    sorteio = (rng.random(n_bloco)[linhas] * total).astype(np.int64)
+    escolhida = np.argmax(candidatas & (np.cumsum(candidatas, axis=1) > sorteio[:, None]), axis=1)
+    
+    codigos_regras = np.array([0] + [CODIGOS_INFRACAO[regra["infracao"]] for regra in REGRAS_INFRACAO])
+    codigos = np.where(escolhida == 0, codigo_excesso, codigos_regras[escolhida])
+    codigos[total == 0] = CODIGOS_INFRACAO["sem_infracao"]
+    return codigos.astype(np.int8)
+
+# Modelo espaço-temporal (--spatiotemporal): câmeras em posições fixas e tráfego variando com a hora
+
+# Registro das câmeras: coordenadas aproximadas, local de referência e limite de velocidade da via (km/h)
+REGISTRO_CAMERAS = {
+    "EPIA-001": (-15.7801, -47.9412, "Setor Hoteleiro Norte", 80),
+    "EPNB-001": (-15.8702, -47.9705, "ParkShopping", 80),
+    "EPTG-001": (-15.8297, -48.0034, "Taguatinga Shopping", 80),
+    "EPCT-001": (-15.7352, -47.8321, "Lago Paranoá", 80),
+    "EPNA-001": (-15.7998, -47.8425, "Ponte JK", 60),
+    "EPCL-001": (-15.8012, -48.0806, "Taguatinga Shopping", 80),
+    "EPPR-001": (-15.7723, -47.8004, "Lago Paranoá", 60),
+    "EPAR-001": (-15.8479, -47.9186, "Aeroporto Internacional", 60),
+    "W3-001": (-15.8041, -47.8903, "Setor Comercial Sul", 60),
+    "L2-001": (-15.7918, -47.8769, "Universidade de Brasília", 60),
+    "L4-001": (-15.7803, -47.8622, "Universidade de Brasília", 60),
+    "ESPM-001": (-15.8187, -47.9512, "Parque da Cidade", 60),
+    "EPIG-001": (-15.7905, -47.9207, "Parque da Cidade", 60),
+    "EPDB-001": (-15.8493, -47.8521, "Pontão do Lago Sul", 60),
+    "DF-001": (-15.6518, -47.8003, "Lago Paranoá", 80),
+    "DF-002": (-15.7935, -47.8826, "Rodoviária do Plano Piloto", 80),
+    "DF-003": (-15.7421, -47.9008, "Setor Hoteleiro Norte", 80),
+    "DF-004": (-15.7906, -47.8317, "Ponte JK", 60),
+    "DF-005": (-15.7318, -47.7602, "Lago Paranoá", 80),
+    "DF-085": (-15.8316, -48.0107, "Taguatinga Shopping", 80),
+    "DF-095": (-15.7803, -48.0296, "Taguatinga Shopping", 80),
+    "DF-075": (-15.8815, -47.9903, "ParkShopping", 80),
+    "DF-079": (-15.8104, -48.0317, "Taguatinga Shopping", 80),
+    "DF-150": (-15.6207, -47.8012, "Lago Paranoá", 80),
+    "DF-140": (-15.9512, -47.8006, "Pontão do Lago Sul", 80),
+    "BR-020": (-15.6213, -47.6705, "Lago Paranoá", 80),
+    "BR-040": (-15.9708, -48.0003, "ParkShopping", 80),
+    "BR-060": (-15.8806, -48.0612, "Taguatinga Shopping", 80),
+    "BR-070": (-15.8103, -48.1207, "Taguatinga Shopping", 80),
+    "BR-251": (-15.8517, -47.6504, "Pontão do Lago Sul", 80),
+}
+
+# Desvio padrão (graus, cerca de 200 m) das coordenadas de cada registro em torno da câmera
+DESVIO_COORDENADAS_CAMERA = 0.002
+
+# Tabelas das câmeras na ordem do vocabulário de id_camera, consultadas com os códigos sorteados
+CAMERAS_LATITUDE = np.array([REGISTRO_CAMERAS[camera][0] for camera in IDS_CAMERA])
+CAMERAS_LONGITUDE = np.array([REGISTRO_CAMERAS[camera][1] for camera in IDS_CAMERA])
+CAMERAS_LOCAL = np.array([LOCAIS.index(REGISTRO_CAMERAS[camera][2]) for camera in IDS_CAMERA], dtype=np.int16)
+CAMERAS_LIMITE = np.array([REGISTRO_CAMERAS[camera][3] for camera in IDS_CAMERA], dtype=np.int16)
+
+# Intensidade relativa do tráfego em cada hora do dia (0h a 23h), com picos às 8h e às 18h
+INTENSIDADE_TRAFEGO_HORA = np.array([
+    0.10, 0.06, 0.04, 0.04, 0.06, 0.20, 0.50, 0.85, 1.00, 0.80, 0.65, 0.70,
+    0.75, 0.70, 0.65, 0.70, 0.85, 0.95, 1.00, 0.75, 0.50, 0.40, 0.30, 0.20,
+])
+ALIAS_HORAS = tabela_alias(INTENSIDADE_TRAFEGO_HORA)
+
+# Pesos de condicao_trafego em cada hora: centrados em "Leve" com tráfego fraco e em "Congestionado" no pico
+TRAFEGO_POR_HORA = {
+    f"trafego_{nome}": tabela for nome, tabela in compilar_nivel(
+        np.repeat(np.arange(24), len(CONDICOES_TRAFEGO)),
+        np.exp(-(np.tile(np.arange(len(CONDICOES_TRAFEGO)), 24)
+                 - 3 * np.repeat(INTENSIDADE_TRAFEGO_HORA, len(CONDICOES_TRAFEGO))) ** 2 / 1.2)).items()
+}
+
+# Visibilidade pela hora do dia em Brasília; chuva forte reduz a visibilidade
+VISIBILIDADE_POR_HORA = np.array([CONDICOES_VISIBILIDADE.index(
+    "Noite" if hora < 5 or hora >= 19 else "Amanhecer" if hora < 7 else "Pôr do Sol" if hora >= 17 else "Dia")
+    for hora in range(24)], dtype=np.int8)
+
+def gerar_espaco_tempo(args, rng, n, agora, tabelas, data_hora=None):
+    """Sorteia câmera e horário de cada registro e deriva deles local, limite, coordenadas e tráfego
+    
+    Todas as colunas saem de consultas às tabelas das câmeras e das horas com os códigos sorteados.
+    Se data_hora for informada (--event-order), a hora é tirada dela em vez de sorteada.
+    """
+    camera = sortear_codigos(rng, "id_camera", n, tabelas)
+    
+    if data_hora is None:
+        # Dia, hora (pela curva de intensidade) e segundo dentro da hora; instantes no futuro voltam um dia
+        dias = rng.integers(0, args.dias_passados + 1, size=n)
+        hora = sortear_alias(rng, *ALIAS_HORAS, n)
+        segundos = rng.integers(0, 3600, size=n)
+        meia_noite = agora.astype("datetime64[D]").astype("datetime64[s]")
+        data_hora = meia_noite + ((hora * 3600 + segundos) - dias * 86400).astype("timedelta64[s]")
+        data_hora = np.where(data_hora > agora, data_hora - np.timedelta64(1, "D"), data_hora)
+    else:
+        hora = data_hora.astype(np.int64) // 3600 % 24
+    
+    latitude = CAMERAS_LATITUDE[camera] + rng.normal(0, DESVIO_COORDENADAS_CAMERA, size=n)
+    longitude = CAMERAS_LONGITUDE[camera] + rng.normal(0, DESVIO_COORDENADAS_CAMERA, size=n)
+    trafego = sortear_nivel(TRAFEGO_POR_HORA, "trafego", hora, rng.random(n)) - hora * len(CONDICOES_TRAFEGO)
+    return {
+        "id_camera": pd.Categorical.from_codes(camera, VOCABULARIOS["id_camera"]),
+        "local": CAMERAS_LOCAL[camera],
+        "limite_velocidade": CAMERAS_LIMITE[camera],
+        "data_hora": data_hora,
+        "hora": hora,
+        "latitude": np.round(np.clip(latitude, args.lat_min, args.lat_max), 6),
+        "longitude": np.round(np.clip(longitude, args.long_min, args.long_max), 6),
+        "condicao_trafego": pd.Categorical.from_codes(trafego, VOCABULARIOS["condicao_trafego"]),
+    }
+
+def visibilidade_espaco_tempo(hora, condicao_clima):
+    """Visibilidade pela hora do dia, trocada por "Baixa Visibilidade" em tempestades e chuva noturna"""
+    codigos = VISIBILIDADE_POR_HORA[hora]
+    baixa = pertence(condicao_clima, ["Tempestuoso"]) | (
+        pertence(condicao_clima, ["Chuvoso"]) & (codigos == CONDICOES_VISIBILIDADE.index("Noite")))
+    codigos = np.where(baixa, CONDICOES_VISIBILIDADE.index("Baixa Visibilidade"), codigos)
+    return pd.Categorical.from_codes(codigos, VOCABULARIOS["visibilidade"])
+
+# Entropia extra que separa o gerador das contagens por segundo (--event-order) dos geradores dos blocos
+FLUXO_EVENTOS = 0x4556454E544F
+
+@functools.lru_cache(maxsize=2)
+def contagens_acumuladas_eventos(seed, num_registros, segundos, primeiro_segundo, curva_horaria):
+    """Número acumulado de registros até cada segundo do período, sorteado de uma só vez (multinomial)
+    
+    Com curva_horaria, cada segundo tem probabilidade proporcional à intensidade de tráfego da sua hora.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence([seed, FLUXO_EVENTOS]))
+    if curva_horaria:
+        hora = (primeiro_segundo + np.arange(segundos)) // 3600 % 24
+        probabilidades = INTENSIDADE_TRAFEGO_HORA[hora]
+        probabilidades = probabilidades / probabilidades.sum()
+    else:
+        probabilidades = np.full(segundos, 1.0 / segundos)
+    return np.cumsum(rng.multinomial(num_registros, probabilidades))
+
+def instantes_ordenados(args, agora, inicio, n):
+    """data_hora dos registros inicio..inicio+n-1 em ordem de evento (--event-order)
+    
+    As contagens por segundo são sorteadas uma vez para todo o período; o registro i cai no segundo
+    em que a contagem acumulada passa de i. Assim os instantes já saem ordenados, sem ordenação global,
+    e cada bloco calcula os seus de forma independente.
+    """
+    segundos = (args.dias_passados + 1) * 86400
+    primeiro = agora - np.timedelta64(segundos - 1, "s")
+    acumulado = contagens_acumuladas_eventos(args.seed, args.start_index + args.num_records, segundos,
+                                             int(primeiro.astype(np.int64)), args.spatiotemporal)
+    segundo = np.minimum(np.searchsorted(acumulado, np.arange(inicio, inicio + n), side="right"), segundos - 1)
+    return primeiro + segundo.astype("timedelta64[s]")
+
+# Os registros são gerados em blocos de tamanho fixo, cada um com seu próprio gerador derivado
+# de (seed, bloco). Assim o valor do registro i não depende do tamanho dos lotes de saída.
+TAMANHO_BLOCO = 65536
+
+def rng_bloco(seed, bloco):
+    """Gerador do bloco, equivalente ao filho de índice `bloco` de SeedSequence(seed).spawn()"""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(bloco,)))
+
+def instante_referencia(args=None):
+    """Instante a partir do qual os timestamps são gerados para o passado: --reference-date ou o instante atual"""
+    if args is not None and args.reference_date:
+        return np.datetime64(args.reference_date, "s")
+    return np.datetime64(datetime.datetime.now().replace(microsecond=0), "s")
+
+def limites_bloco(args, bloco):
+    """Primeiro registro e tamanho do bloco de índice `bloco`
+    
+    Os blocos são alinhados a 0 e completos, pois o gerador de cada um depende do bloco. Com --counter-rng,
+    cada registro independe do bloco, então os blocos começam em --start-index e param no último registro.
+    """
+    if not args.counter_rng:
+        return bloco * TAMANHO_BLOCO, TAMANHO_BLOCO
+    inicio = args.start_index + bloco * TAMANHO_BLOCO
+    return inicio, min(TAMANHO_BLOCO, args.start_index + args.num_records - inicio)
+
+def linhas_bloco(args, bloco):
+    """Fatia do bloco `bloco` com os registros de --start-index a --start-index + --num-records - 1"""
+    inicio, n = limites_bloco(args, bloco)
+    return slice(min(max(args.start_index - inicio, 0), n), max(min(args.start_index + args.num_records - inicio, n), 0))
+
+def gerar_bloco_numpy(args, bloco, agora):
+    """Gera as linhas pedidas do bloco de índice `bloco` (veja limites_bloco e linhas_bloco)
+    
+    Os sorteios são feitos para o bloco inteiro, para que os valores não dependam das linhas pedidas,
+    mas só as linhas pedidas são montadas: o primeiro e o último bloco de uma geração pequena ou com
+    --start-index custam pouco mais que os sorteios.
+    """
+    inicio, n = limites_bloco(args, bloco)
+    linhas = linhas_bloco(args, bloco)
+    rng = GeradorContador(args.seed, inicio, n) if args.counter_rng else rng_bloco(args.seed, bloco)
+    
+    # Com --columns, todos os sorteios são feitos (para que os valores não mudem), mas as colunas
+    # fora de colunas_necessarias não são montadas
+    necessarias = colunas_necessarias(args.columns)
+    
+    # Na frota (--fleet-size), placa, tipo de placa, veículo, cor e ano vêm do veículo sorteado
+    tabelas, catalogo = tabelas_pesos(args)
+    with etapa("veiculos"):
+        if args.fleet_size:
+            frota = avistamentos_frota(args, rng, n)
+            tipos_veiculos, marcas_veiculos, modelos_veiculos = (
+                frota["tipo_veiculo"], frota["marca_veiculo"], frota["modelo_veiculo"])
+        else:
+            frota = None
+            tipos_veiculos, marcas_veiculos, modelos_veiculos = gerar_veiculos_numpy(rng, n, catalogo)
+    
+    # No modelo espaço-temporal (--spatiotemporal), câmera e horário determinam local, limite,
+    # coordenadas, visibilidade e tráfego
+    # Com --event-order, data_hora sai das contagens por segundo, já em ordem de evento
+    with etapa("timestamps"):
+        ordenados = (instantes_ordenados(args, agora, inicio, n)
+                     if args.event_order and (args.spatiotemporal or "data_hora" in necessarias) else None)
+    
+    if args.spatiotemporal:
+        with etapa("espaco_tempo"):
+            espaco_tempo = gerar_espaco_tempo(args, rng, n, agora, tabelas, ordenados)
+            idx_local = espaco_tempo["local"]
+            limite_velocidade = espaco_tempo["limite_velocidade"][linhas]
+    else:
+        espaco_tempo = None
+        # O local é sorteado como índice para que o limite de velocidade saia da mesma posição
+        with etapa("categorias"):
+            idx_local = sortear_codigos(rng, "local", n, tabelas)
+            limites = np.array([LIMITES_VELOCIDADE.get(local, 60) for local in LOCAIS], dtype=np.int16)
+            limite_velocidade = limites[idx_local[linhas]]
         
-        # Generate timestamps over the last N days
-        "data_hora": [
-            (datetime.datetime.now() - datetime.timedelta(
-                days=random.randint(0, args.dias_passados),
-                hours=random.randint(0, 23),
-                minutes=random.randint(0, 59),
-                seconds=random.randint(0, 59)
-            )).strftime("%Y-%m-%d %H:%M:%S") 
-            for _ in range(args.num_records)
-        ],
-    })
+        # Deslocamento de cada timestamp em segundos a partir de um único instante de referência
+        with etapa("timestamps"):
+            if not args.event_order:
+                deslocamentos = (rng.integers(0, args.dias_passados + 1, size=n) * 86400
+                                 + rng.integers(0, 24, size=n) * 3600
+                                 + rng.integers(0, 60, size=n) * 60
+                                 + rng.integers(0, 60, size=n))
+    
+    # As colunas são sorteadas nesta ordem; alterá-la muda os dados gerados
+    # Cada sorteio cobre o bloco inteiro e só as linhas pedidas seguem para a montagem das colunas
+    indices = np.arange(inicio + linhas.start, inicio + linhas.stop)
+    data = {}
+    if "id_registro" in necessarias:
+        with etapa("id_registro"):
+            data["id_registro"] = gerar_ids_registro(args, inicio + linhas.start, len(indices))
+    with etapa("numero_placa"):
+        data["numero_placa"] = (frota["numero_placa"][linhas] if frota
+                                else gerar_placas_bloco(args, rng, inicio, n, "numero_placa" in necessarias, linhas))
+    with etapa("categorias"):
+        data["regiao_administrativa"] = sortear_categoria(rng, "regiao_administrativa", n, tabelas)[linhas]
+        data["tipo_placa"] = (frota["tipo_placa"] if frota else sortear_categoria(rng, "tipo_placa", n, tabelas))[linhas]
+        data["tipo_veiculo"] = tipos_veiculos[linhas]
+        data["marca_veiculo"] = marcas_veiculos[linhas]
+        data["modelo_veiculo"] = modelos_veiculos[linhas]
+        data["local"] = pd.Categorical.from_codes(idx_local[linhas], VOCABULARIOS["local"])
+        data["cor_veiculo"] = (frota["cor_veiculo"] if frota else sortear_categoria(rng, "cor_veiculo", n, tabelas))[linhas]
+    with etapa("numericos"):
+        data["ano_veiculo"] = (frota["ano_veiculo"] if frota
+                               else rng.integers(args.ano_min, args.ano_max + 1, size=n).astype(np.int16))[linhas]
+    if espaco_tempo:
+        for coluna in ["data_hora", "latitude", "longitude", "id_camera"]:
+            data[coluna] = espaco_tempo[coluna][linhas]
+    else:
+        if "data_hora" in necessarias:
+            with etapa("timestamps"):
+                data["data_hora"] = (agora - deslocamentos[linhas].astype("timedelta64[s]") if ordenados is None
+                                     else ordenados[linhas])
+        with etapa("numericos"):
+            data["latitude"] = np.round(rng.uniform(args.lat_min, args.lat_max, size=n)[linhas], 6)
+            data["longitude"] = np.round(rng.uniform(args.long_min, args.long_max, size=n)[linhas], 6)
+        with etapa("categorias"):
+            data["id_camera"] = sortear_categoria(rng, "id_camera", n, tabelas)[linhas]
+    if "caminho_imagem" in necessarias:
+        with etapa("caminho_imagem"):
+            data["caminho_imagem"] = np.char.add(np.char.add("/imagens/captura_", np.char.zfill(indices.astype(str), 4)), ".jpg")
+    with etapa("numericos"):
+        data["confianca_ocr"] = np.round(rng.uniform(0.70, 1.0, size=n)[linhas], 2).astype(np.float32)
+    with etapa("categorias"):
+        data["condicao_clima"] = sortear_categoria(rng, "condicao_clima", n, tabelas)[linhas]
+    with etapa("numericos"):
+        data["temperatura"] = np.round(rng.uniform(args.temp_min, args.temp_max, size=n)[linhas], 1).astype(np.float32)
+    with etapa("categorias"):
+        if espaco_tempo:
+            data["visibilidade"] = visibilidade_espaco_tempo(espaco_tempo["hora"][linhas], data["condicao_clima"])
+        else:
+            data["visibilidade"] = sortear_categoria(rng, "visibilidade", n, tabelas)[linhas]
+        data["condicao_estrada"] = sortear_categoria(rng, "condicao_estrada", n, tabelas)[linhas]
+        data["condicao_trafego"] = (espaco_tempo["condicao_trafego"] if espaco_tempo
+                                    else sortear_categoria(rng, "condicao_trafego", n, tabelas))[linhas]
+    with etapa("numericos"):
+        data["velocidade"] = rng.integers(args.velocidade_min, args.velocidade_max + 1, size=n).astype(np.int16)[linhas]
+    with etapa("categorias"):
+        data["direcao_deslocamento"] = sortear_categoria(rng, "direcao_deslocamento", n, tabelas)[linhas]
+    
+    # A infração é o último sorteio do bloco; fora de --columns, pode ser omitida sem alterar as demais colunas
+    if "infracao" in necessarias:
+        with etapa("infracao"):
+            codigos_infracao = determinar_infracoes(
+                rng, data["velocidade"], limite_velocidade, data["condicao_estrada"],
+                data["condicao_clima"], data["tipo_veiculo"], data["ano_veiculo"],
+                ano_referencia=agora.astype(object).year, linhas=linhas, n_bloco=n
+            )
+            data["infracao"] = pd.Categorical.from_codes(codigos_infracao, VOCABULARIOS["infracao"])
+    data["limite_velocidade"] = limite_velocidade
+    
+    with etapa("dataframe"):
+        df = pd.DataFrame({coluna: valores for coluna, valores in data.items() if coluna in necessarias})
+    with etapa("campos_derivados"):
+        adicionar_campos_derivados(df, necessarias)
+    
+    return df[args.columns] if args.columns else df
+
+def gerar_ids_registro(args, inicio, n):
+    """Gera a coluna id_registro conforme --uuid-legacy e --uuid-binary"""
+    if args.uuid_legacy:
+        ids = [generate_deterministic_uuid(args.seed, i) for i in range(inicio, inicio + n)]
+        return [uuid.UUID(valor).bytes for valor in ids] if args.uuid_binary else ids
+    return gerar_uuids_deterministicos(args.seed, inicio, n, binario=args.uuid_binary)
+
+def relatorio_memoria(df):
+    """Calcula o uso de memória do DataFrame (total, por registro e por coluna)"""
+    por_coluna = df.memory_usage(index=False, deep=True)
+    total = int(por_coluna.sum())
+    return {
+        "registros": len(df),
+        "bytes_total": total,
+        "bytes_por_registro": round(total / max(len(df), 1), 1),
+        "bytes_por_coluna": {coluna: int(valor) for coluna, valor in por_coluna.items()},
+    }
+
+def iter_blocos_numpy(args, blocos, agora):
+    """Gera os blocos indicados, em ordem, distribuindo-os entre --workers processos
+    
+    Cada bloco depende apenas de (seed, bloco), então o resultado não depende do número de processos.
+    No máximo 2 blocos por processo ficam pendentes, limitando a memória quando o consumo é mais lento.
+    """
+    if args.workers <= 1:
+        for bloco in blocos:
+            yield bloco, gerar_bloco_numpy(args, bloco, agora)
+        return
+    
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        pendentes = collections.deque()
+        for bloco in blocos:
+            pendentes.append((bloco, executor.submit(gerar_bloco_numpy, args, bloco, agora)))
+            if len(pendentes) >= 2 * args.workers:
+                bloco_pronto, futuro = pendentes.popleft()
+                yield bloco_pronto, futuro.result()
+        while pendentes:
+            bloco_pronto, futuro = pendentes.popleft()
+            yield bloco_pronto, futuro.result()
+
+def iter_plate_batches(args, chunk_size, agora=None):
+    """Gera os registros em lotes de chunk_size linhas, mantendo em memória apenas os blocos em uso
+    
+    O resultado concatenado é idêntico ao de generate_plate_data_numpy para a mesma seed,
+    qualquer que seja o chunk_size ou o número de processos. Os registros vão de --start-index
+    a --start-index + --num-records - 1.
+    """
+    if agora is None:
+        agora = instante_referencia(args)
+    
+    # Com --start-index, apenas os blocos a partir do primeiro registro pedido são gerados;
+    # com --counter-rng, os blocos começam exatamente nele (veja limites_bloco)
+    inicio = args.start_index
+    fim = inicio + args.num_records
+    origem = inicio if args.counter_rng else 0
+    if fim == inicio:
+        # Sem registros, um único lote vazio com o esquema completo, para que os sinks gravem cabeçalho e esquema
+        esquema = argparse.Namespace(**vars(args))
+        esquema.num_records = 1
+        yield gerar_bloco_numpy(esquema, (inicio - origem) // TAMANHO_BLOCO, agora).iloc[:0]
+        return
+    blocos = iter_blocos_numpy(args, range((inicio - origem) // TAMANHO_BLOCO, -(-(fim - origem) // TAMANHO_BLOCO)), agora)
+    bloco_atual, df_bloco = None, None
+    for inicio_lote in range(inicio, fim, chunk_size):
+        fim_lote = min(inicio_lote + chunk_size, fim)
+        partes = []
+        posicao = inicio_lote
+        while posicao < fim_lote:
+            bloco = (posicao - origem) // TAMANHO_BLOCO
+            while bloco_atual != bloco:
+                bloco_atual, df_bloco = next(blocos)
+            # O bloco traz apenas as linhas a partir do primeiro registro pedido (veja linhas_bloco)
+            base = max(origem + bloco * TAMANHO_BLOCO, inicio)
+            fim_parte = min(fim_lote, origem + (bloco + 1) * TAMANHO_BLOCO)
+            partes.append(df_bloco.iloc[posicao - base:fim_parte - base])
+            posicao = fim_parte
+        with etapa("lotes"):
+            lote = pd.concat(partes, ignore_index=True)
+        yield lote
+
+def generate_plate_data_numpy(args):
+    """Gera os mesmos campos de generate_plate_data com operações vetorizadas do NumPy"""
+    return pd.concat(iter_plate_batches(args, TAMANHO_BLOCO), ignore_index=True)
+
+def benchmark_workers(args, lista_workers):
+    """Mede a vazão da geração para cada número de processos e o ganho em relação à primeira medição"""
+    agora = instante_referencia(args)
+    resultados = []
+    for workers in lista_workers:
+        args.workers = workers
+        inicio = time.perf_counter()
+        for _ in iter_plate_batches(args, TAMANHO_BLOCO, agora):
+            pass
+        duracao = time.perf_counter() - inicio
+        resultados.append({
+            "workers": workers,
+            "segundos": round(duracao, 3),
+            "registros_por_segundo": round(args.num_records / duracao),
+        })
+    
+    base = resultados[0]["segundos"]
+    for resultado in resultados:
+        resultado["speedup"] = round(base / resultado["segundos"], 2)
+        resultado["eficiencia_por_core"] = round(resultado["speedup"] / resultado["workers"], 2)
+    return resultados
+
+# Tamanhos usados por --benchmark quando nenhuma lista é informada
+TAMANHOS_BENCHMARK = [1000, 100000, 1000000, 10000000]
+
+def pico_memoria_bytes():
+    """Pico de memória residente (RSS) do processo atual em bytes, ou None se indisponível"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == 'darwin' else pico * 1024  # kB no Linux, bytes no macOS
+
+def medir_execucao(args, num_registros):
+    """Gera e grava num_registros no formato de --format em um diretório temporário, medindo cada etapa"""
+    args = argparse.Namespace(**vars(args))
+    args.num_records = num_registros
+    np.random.seed(args.seed)
+    random.seed(args.seed)
+    TEMPOS_ETAPAS.clear()
+    # pandas e pyarrow têm importação adiada; carregados aqui, a importação não é cronometrada em uma etapa
+    pd.__version__
+    if args.format in SINKS_ARROW:
+        pa.__version__
+    rss_inicial = pico_memoria_bytes()
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, f"benchmark.{args.format}")
+        escritor = criar_sink(f"{args.format}:{caminho}", args)
+        saida = getattr(getattr(escritor, 'arquivo', None), 'buffer', None)
+        inicio = time.perf_counter()
+        if args.engine == 'numpy':
+            lotes = iter_plate_batches(args, args.chunk_size or TAMANHO_BLOCO)
+        else:
+            lotes = [generate_plate_data(args)]
+        for lote in lotes:
+            with etapa("escrita"):
+                escritor.escrever(lote)
+        with etapa("escrita"):
+            escritor.fechar()
+        duracao = time.perf_counter() - inicio
+        bytes_saida = os.path.getsize(caminho)
+    
+    etapas = dict(sorted(TEMPOS_ETAPAS.items(), key=lambda item: -item[1]))
+    etapas["outros"] = max(duracao - sum(etapas.values()), 0.0)
+    pico = pico_memoria_bytes()
+    resultado = {
+        "registros": num_registros,
+        "segundos": round(duracao, 3),
+        "registros_por_segundo": round(num_registros / duracao),
+        "pico_rss_mb": None if pico is None else round(pico / 2**20, 1),
+        "rss_inicial_mb": None if rss_inicial is None else round(rss_inicial / 2**20, 1),
+        "bytes_saida": bytes_saida,
+        "etapas_segundos": {nome: round(segundos, 4) for nome, segundos in etapas.items()},
+    }
+    if isinstance(saida, SaidaComprimida):
+        # A compressão roda em paralelo à geração: a vazão por thread usa o tempo de CPU das threads
+        resultado["compressao"] = {
+            "codec": saida.codec,
+            "threads": saida.threads,
+            "bytes_texto": saida.bytes_entrada,
+            "razao": round(saida.bytes_entrada / max(bytes_saida, 1), 2),
+            "mb_texto_por_segundo": round(saida.bytes_entrada / 2**20 / duracao, 1),
+            "mb_por_segundo_por_thread": round(saida.bytes_entrada / 2**20 / max(saida.segundos_compressao, 1e-9), 1),
+        }
+    return resultado
+
+def benchmark(args, tamanhos):
+    """Mede vazão, pico de memória e tempo por etapa para cada tamanho, em um processo novo por medição
+    
+    Cada medição roda em um processo próprio para que o pico de RSS de uma não contamine a seguinte.
+    Com --workers > 1, os tempos por etapa da geração ficam nos processos auxiliares e não são somados.
+    """
+    execucoes = []
+    for num_registros in tamanhos:
+        print(f"Medindo {num_registros} registros...", file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            execucoes.append(executor.submit(medir_execucao, args, num_registros).result())
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "motor": args.engine,
+        "formato": args.format,
+        "compressao": args.compress,
+        "workers": args.workers,
+        "chunk_size": args.chunk_size,
+        "seed": args.seed,
+        "execucoes": execucoes,
+    }
+
+# Módulos pesados com importação adiada, que --help não deve carregar
+MODULOS_ADIADOS = ['pandas', 'pyarrow', 'sqlalchemy', 'pymysql', 'psycopg', 'psycopg2', 'asyncio', 'faker']
+
+# Execuções de cada comando em --benchmark-startup (a mediana é informada)
+REPETICOES_INICIALIZACAO = 5
+
+def ler_importtime(saida):
+    """Lê a saída de python -X importtime: {módulo: (microssegundos acumulados, nível de aninhamento)}"""
+    modulos = {}
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        nome = nome[1:]
+        modulos[nome.strip()] = (int(acumulado), len(nome) - len(nome.lstrip()))
+    return modulos
+
+def benchmark_inicializacao(limite=0.0):
+    """Mede o tempo de inicialização do script em processos novos, para detectar regressões nas importações
+    
+    Informa a mediana de --help e de uma geração de 100 registros, os módulos de nível superior mais lentos
+    e os módulos de MODULOS_ADIADOS que --help carregou. Com limite > 0, a mediana de --help não pode passar dele.
+    """
+    script = os.path.abspath(__file__)
+    comandos = {
+        "--help": ["--help"],
+        "100 registros": ["--num-records", "100", "--engine", "numpy", "--output", os.devnull],
+    }
+    medianas = {}
+    for nome, argumentos in comandos.items():
+        tempos = []
+        for _ in range(REPETICOES_INICIALIZACAO):
+            inicio = time.perf_counter()
+            resultado = subprocess.run([sys.executable, "-X", "importtime", script] + argumentos,
+                                       capture_output=True, text=True)
+            tempos.append(time.perf_counter() - inicio)
+            if nome == "--help":
+                modulos = ler_importtime(resultado.stderr)
+        medianas[nome] = round(sorted(tempos)[len(tempos) // 2], 3)
+    
+    nivel_superior = sorted(((acumulado, nome) for nome, (acumulado, nivel) in modulos.items() if nivel == 0),
+                            reverse=True)
+    adiados_importados = [modulo for modulo in MODULOS_ADIADOS if modulo in modulos]
+    return {
+        "python": platform.python_version(),
+        "repeticoes": REPETICOES_INICIALIZACAO,
+        "mediana_s": medianas,
+        "importacoes_help_s": round(sum(acumulado for acumulado, _ in nivel_superior) / 1e6, 3),
+        "modulos_mais_lentos_ms": {nome: round(acumulado / 1000, 1) for acumulado, nome in nivel_superior[:10]},
+        "modulos_adiados_importados": adiados_importados,
+        "limite_s": limite or None,
+        "aprovado": not adiados_importados and (not limite or medianas["--help"] <= limite),
+    }
+
+# %%
+# Estatísticas em fluxo (--show-stats): acumuladas lote a lote, sem manter o conjunto completo em memória.
+# Os acumuladores de lotes ou fatias diferentes podem ser combinados, qualquer que seja a ordem
+
+# Resolução dos histogramas usados para os quantis de cada coluna
+RESOLUCAO_QUANTIS = {"velocidade": 1, "temperatura": 0.1}
+QUANTIS = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# Precisão do HyperLogLog: 2**14 registradores, erro padrão de cerca de 0,8%
+PRECISAO_HLL = 14
+
+class ResumoNumerico:
+    """Contagem, média e variância (Welford, combinadas pela fórmula de Chan), mínimo e máximo"""
+    
+    def __init__(self, contagem=0, media=0.0, m2=0.0, minimo=None, maximo=None):
+        self.contagem = contagem
+        self.media = media
+        self.m2 = m2
+        self.minimo = minimo
+        self.maximo = maximo
+    
+    @classmethod
+    def de_valores(cls, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        if not len(valores):
+            return cls()
+        media = valores.mean()
+        return cls(len(valores), media, float(((valores - media) ** 2).sum()), valores.min(), valores.max())
+    
+    def combinar(self, outro):
+        if not outro.contagem:
+            return
+        if not self.contagem:
+            self.__dict__.update(outro.__dict__)
+            return
+        contagem = self.contagem + outro.contagem
+        delta = outro.media - self.media
+        self.media += delta * outro.contagem / contagem
+        self.m2 += outro.m2 + delta ** 2 * self.contagem * outro.contagem / contagem
+        self.contagem = contagem
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+    
+    def resultado(self):
+        variancia = self.m2 / (self.contagem - 1) if self.contagem > 1 else 0.0
+        return {
+            "contagem": self.contagem,
+            "media": round(float(self.media), 6),
+            "desvio_padrao": round(float(np.sqrt(variancia)), 6),
+            "minimo": round(float(self.minimo), 6) if self.contagem else None,
+            "maximo": round(float(self.maximo), 6) if self.contagem else None,
+        }
+
+def hash_textos(serie):
+    """Hash de 64 bits de cada texto, vetorizado sobre os bytes em palavras de 8 bytes
     
-    # Generate realistic latitude and longitude for Distrito Federal
-    data.update({
-        "latitude": [round(random.uniform(args.lat_min, args.lat_max), 6) for _ in range(args.num_records)],
-        "longitude": [round(random.uniform(args.long_min, args.long_max), 6) for _ in range(args.num_records)],
-        "id_camera": [random.choice(ids_camera) for _ in range(args.num_records)],
-        "caminho_imagem": [f"/imagens/captura_{i:04d}.jpg" for i in range(args.num_records)],
-        "confianca_ocr": [round(random.uniform(0.70, 1.0), 2) for _ in range(args.num_records)],
+    Palavras nulas (o preenchimento da largura fixa) não alteram o hash, então o mesmo texto tem
+    o mesmo hash em lotes de larguras diferentes. Textos fora do ASCII usam o hash do pandas.
+    """
+    try:
+        textos = serie.to_numpy(dtype=object).astype("S")
+    except UnicodeEncodeError:
+        return pd.util.hash_pandas_object(serie, index=False).to_numpy()
+    largura = textos.itemsize
+    palavras = np.zeros((len(textos), -(-largura // 8) * 8), dtype=np.uint8)
+    palavras[:, :largura] = textos.view(np.uint8).reshape(len(textos), largura)
+    hashes = np.zeros(len(textos), dtype=np.uint64)
+    for indice, palavra in enumerate(palavras.view(np.uint64).T):
+        misturado = misturar_64(hashes ^ (palavra + np.uint64(((indice + 1) * INCREMENTO_SPLITMIX) & MASCARA_64)))
+        hashes = np.where(palavra != 0, misturado, hashes)
+    return hashes
+
+class HyperLogLog:
+    """Estimativa do número de valores distintos com memória fixa (2**precisao bytes)"""
+    
+    def __init__(self, precisao=PRECISAO_HLL):
+        self.precisao = precisao
+        self.registradores = np.zeros(1 << precisao, dtype=np.uint8)
+    
+    def adicionar(self, serie):
+        hashes = hash_textos(serie)
+        bits_restantes = 64 - self.precisao
+        indices = (hashes >> np.uint64(bits_restantes)).astype(np.intp)
+        # Posição do primeiro bit 1 nos bits restantes; frexp é exato para valores abaixo de 2**53
+        restantes = (hashes & np.uint64((1 << bits_restantes) - 1)).astype(np.float64)
+        posicoes = (bits_restantes - np.frexp(restantes)[1] + 1).astype(np.uint8)
+        np.maximum.at(self.registradores, indices, posicoes)
+    
+    def combinar(self, outro):
+        np.maximum(self.registradores, outro.registradores, out=self.registradores)
+    
+    def estimativa(self):
+        m = len(self.registradores)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / np.ldexp(1.0, -self.registradores.astype(np.int64)).sum()
+        vazios = int(np.count_nonzero(self.registradores == 0))
+        if estimativa <= 2.5 * m and vazios:
+            estimativa = m * np.log(m / vazios)  # contagem linear para cardinalidades pequenas
+        return int(round(estimativa))
+
+class HistogramaQuantis:
+    """Contagens por valor arredondado à resolução da coluna, das quais saem os quantis"""
+    
+    def __init__(self, resolucao):
+        self.resolucao = resolucao
+        self.contagens = collections.Counter()
+    
+    def adicionar(self, valores):
+        chaves, contagens = np.unique(np.round(np.asarray(valores, dtype=np.float64) / self.resolucao).astype(np.int64),
+                                      return_counts=True)
+        self.contagens.update(dict(zip(chaves.tolist(), contagens.tolist())))
+    
+    def combinar(self, outro):
+        self.contagens.update(outro.contagens)
+    
+    def quantis(self, probabilidades=QUANTIS):
+        if not self.contagens:
+            return {}
+        chaves = np.array(sorted(self.contagens), dtype=np.int64)
+        acumuladas = np.cumsum([self.contagens[chave] for chave in chaves])
+        posicoes = np.searchsorted(acumuladas, np.ceil(np.array(probabilidades) * acumuladas[-1]).clip(1))
+        casas = max(0, -int(np.floor(np.log10(self.resolucao))))
+        return {f"p{round(p * 100):g}": round(float(chaves[i] * self.resolucao), casas)
+                for p, i in zip(probabilidades, posicoes)}
+
+class EstatisticasFluxo:
+    """Resumo dos dados gerados, atualizado lote a lote
+    
+    Colunas de vocabulário fixo: contagem exata de cada valor. Numéricas: ResumoNumerico e, nas de
+    RESOLUCAO_QUANTIS, quantis. Texto livre (placas, ids, caminhos): distintos aproximados (HyperLogLog).
+    data_hora: primeiro e último instante.
+    """
+    
+    def __init__(self):
+        self.registros = 0
+        self.vocabularios = {}
+        self.numericas = {}
+        self.quantis = {}
+        self.distintos = {}
+        self.periodo = None
+    
+    def atualizar(self, df):
+        self.registros += len(df)
+        for nome in df.columns:
+            serie = df[nome]
+            if nome in VOCABULARIOS:
+                codigos = serie.cat.codes.to_numpy() if isinstance(serie.dtype, pd.CategoricalDtype) and \
+                    list(serie.cat.categories) == VOCABULARIOS[nome] else \
+                    pd.Categorical(serie, categories=VOCABULARIOS[nome]).codes
+                contagens = np.bincount(codigos[codigos >= 0], minlength=len(VOCABULARIOS[nome]))
+                if nome in self.vocabularios:
+                    self.vocabularios[nome] += contagens
+                else:
+                    self.vocabularios[nome] = contagens
+            elif pd.api.types.is_datetime64_any_dtype(serie):
+                if len(serie):
+                    periodo = (serie.min(), serie.max())
+                    self.periodo = periodo if self.periodo is None else \
+                        (min(self.periodo[0], periodo[0]), max(self.periodo[1], periodo[1]))
+            elif pd.api.types.is_numeric_dtype(serie):
+                self.numericas.setdefault(nome, ResumoNumerico()).combinar(ResumoNumerico.de_valores(serie))
+                if nome in RESOLUCAO_QUANTIS:
+                    self.quantis.setdefault(nome, HistogramaQuantis(RESOLUCAO_QUANTIS[nome])).adicionar(serie)
+            else:
+                self.distintos.setdefault(nome, HyperLogLog()).adicionar(serie)
+    
+    def combinar(self, outro):
+        self.registros += outro.registros
+        for nome, contagens in outro.vocabularios.items():
+            self.vocabularios[nome] = self.vocabularios[nome] + contagens if nome in self.vocabularios else contagens.copy()
+        for atributo in ('numericas', 'quantis', 'distintos'):
+            proprios = getattr(self, atributo)
+            for nome, acumulador in getattr(outro, atributo).items():
+                if nome in proprios:
+                    proprios[nome].combinar(acumulador)
+                else:
+                    proprios[nome] = copy.deepcopy(acumulador)
+        if outro.periodo is not None:
+            self.periodo = outro.periodo if self.periodo is None else \
+                (min(self.periodo[0], outro.periodo[0]), max(self.periodo[1], outro.periodo[1]))
+    
+    def resultado(self):
+        numericas = {nome: resumo.resultado() for nome, resumo in self.numericas.items()}
+        for nome, histograma in self.quantis.items():
+            numericas[nome]["quantis"] = histograma.quantis()
+        return {
+            "registros": self.registros,
+            "periodo": {"inicio": str(self.periodo[0]), "fim": str(self.periodo[1])} if self.periodo else None,
+            "numericas": numericas,
+            "categoricas": {nome: {valor: int(contagem) for valor, contagem in zip(VOCABULARIOS[nome], contagens)}
+                            for nome, contagens in self.vocabularios.items()},
+            "distintos_aproximados": {nome: hll.estimativa() for nome, hll in self.distintos.items()},
+        }
+
+# %%
+# Escrita dos dados em CSV e formatos colunares
+
+FORMATOS_SAIDA = ['csv', 'parquet', 'feather', 'arrow-ipc', 'jsonl']
+CODECS_COMPRESSAO = ['none', 'snappy', 'gzip', 'brotli', 'zstd', 'lz4']
+
+# Codec usado quando --compression não é informado
+COMPRESSAO_PADRAO = {'parquet': 'snappy', 'feather': 'lz4', 'arrow-ipc': 'none'}
+
+def dataframe_para_arrow(df):
+    """Converte um lote para Arrow, com as colunas categóricas codificadas em dicionário"""
+    colunas = {}
+    for nome in df.columns:
+        serie = df[nome]
+        if nome in VOCABULARIOS:
+            # O dicionário é sempre o vocabulário completo, para que todos os lotes tenham o mesmo esquema
+            codigos = pd.Categorical(serie, categories=VOCABULARIOS[nome]).codes
+            colunas[nome] = pa.DictionaryArray.from_arrays(
+                pa.array(codigos, mask=codigos < 0), pa.array(VOCABULARIOS[nome]))
+        elif nome == "id_registro" and len(serie) and isinstance(serie.iloc[0], bytes):
+            colunas[nome] = pa.array(serie, type=pa.binary(16))
+        else:
+            colunas[nome] = pa.array(serie)
+    return pa.table(colunas)
+
+def ampliar_float32(df):
+    """Converte colunas float32 em float64 arredondado, para que 0.73 não vire 0.7300000190734863 em texto"""
+    colunas = {nome: np.round(df[nome].to_numpy(np.float64), 6)
+               for nome in df.columns if df[nome].dtype == np.float32}
+    return df.assign(**colunas) if colunas else df
+
+# Codecs de --compress para os sinks de texto
+CODECS_TEXTO = ['gzip', 'zstd']
+
+# Níveis de compressão: os padrões do gzip/pigz e do zstd
+NIVEL_COMPRESSAO = {'gzip': 6, 'zstd': 3}
+
+# Bytes de texto por bloco comprimido; cada bloco é comprimido de forma independente, em paralelo
+TAMANHO_BLOCO_COMPRESSAO = 4 * 2**20
+
+# Com --checkpoint, o bloco parcial só é cortado para registrar uma posição depois de ter ao menos isso,
+# para que lotes pequenos não gerem membros gzip (ou quadros zstd) minúsculos
+TAMANHO_MINIMO_BLOCO_CHECKPOINT = 2**20
+
+# Posição de um sink que, após o lote, não tem um ponto em que a retomada possa continuar
+SEM_PONTO_RETOMADA = object()
+
+def threads_codificacao(args):
+    """Threads de --encode-threads, ou o número de núcleos"""
+    return getattr(args, 'encode_threads', None) or os.cpu_count() or 1
+
+def comprimir_bloco(codec, dados):
+    """Comprime um bloco como um membro gzip ou um quadro zstd completo, devolvendo também o tempo de CPU gasto
+    
+    O membro gzip tem mtime 0, para que a mesma entrada gere sempre os mesmos bytes.
+    """
+    inicio = time.thread_time()
+    if codec == 'gzip':
+        comprimido = gzip.compress(dados, NIVEL_COMPRESSAO['gzip'], mtime=0)
+    else:
+        comprimido = zstandard.ZstdCompressor(level=NIVEL_COMPRESSAO['zstd']).compress(dados)
+    return comprimido, time.thread_time() - inicio
+
+class SaidaComprimida(io.BufferedIOBase):
+    """Fluxo binário que comprime em paralelo o que recebe, em blocos independentes gravados em ordem no destino
+    
+    Como no pigz, os blocos são membros gzip (ou quadros zstd) concatenados, que descompactam como um único
+    arquivo. No máximo duas vezes o número de threads em blocos ficam pendentes, limitando a memória.
+    """
+    
+    def __init__(self, destino, codec, threads, fluxo=False):
+        self.destino = destino
+        self.codec = codec
+        self.threads = threads
+        # Na saída padrão, cada flush entrega o bloco parcial; em arquivos, os blocos mantêm o tamanho cheio
+        self.fluxo = fluxo
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.pendentes = collections.deque()
+        self.bloco = bytearray()
+        self.bytes_entrada = 0
+        self.segundos_compressao = 0.0
+    
+    def writable(self):
+        return True
+    
+    def seekable(self):
+        # Apenas tell(), usado nas posições do checkpoint
+        return self.destino.seekable()
+    
+    def write(self, dados):
+        self.bloco += dados
+        self.bytes_entrada += len(dados)
+        if len(self.bloco) >= TAMANHO_BLOCO_COMPRESSAO:
+            cheios = len(self.bloco) - len(self.bloco) % TAMANHO_BLOCO_COMPRESSAO
+            with memoryview(self.bloco) as visao:
+                for inicio in range(0, cheios, TAMANHO_BLOCO_COMPRESSAO):
+                    self.enviar(bytes(visao[inicio:inicio + TAMANHO_BLOCO_COMPRESSAO]))
+            del self.bloco[:cheios]
+        return len(dados)
+    
+    def enviar(self, dados):
+        """Agenda a compressão de um bloco e grava os já comprimidos, esperando se houver pendentes demais"""
+        self.pendentes.append(self.executor.submit(comprimir_bloco, self.codec, dados))
+        while self.pendentes and (self.pendentes[0].done() or len(self.pendentes) > 2 * self.threads):
+            self.gravar_proximo()
+    
+    def gravar_proximo(self):
+        comprimido, segundos = self.pendentes.popleft().result()
+        self.destino.write(comprimido)
+        self.segundos_compressao += segundos
+    
+    def descarregar(self):
+        """Comprime o bloco parcial e grava todos os blocos pendentes no destino"""
+        if self.bloco:
+            self.enviar(bytes(self.bloco))
+            self.bloco = bytearray()
+        while self.pendentes:
+            self.gravar_proximo()
+        self.destino.flush()
+    
+    def flush(self):
+        if self.fluxo and not self.closed:
+            self.descarregar()
+    
+    def tell(self):
+        self.descarregar()
+        return self.destino.tell()
+    
+    def posicao_retomada(self):
+        """Posição no destino ao fim de um bloco, para o checkpoint, ou SEM_PONTO_RETOMADA
         
-        # Environmental data (adjusted for Distrito Federal's climate)
-        "condicao_clima": [random.choice(condicoes_clima) for _ in range(args.num_records)],
-        # Distrito Federal has a specific climate with dry and wet seasons
-        "temperatura": [round(random.uniform(args.temp_min, args.temp_max), 1) for _ in range(args.num_records)], # Celsius, specific to DF
-        "visibilidade": [random.choice(condicoes_visibilidade) for _ in range(args.num_records)],
-        "condicao_estrada": [random.choice(condicoes_estrada) for _ in range(args.num_records)],
-        "condicao_trafego": [random.choice(condicoes_trafego) for _ in range(args.num_records)],
+        O bloco parcial só é cortado se já tiver TAMANHO_MINIMO_BLOCO_CHECKPOINT bytes; antes disso, o lote
+        fica sem ponto de retomada e o checkpoint espera um lote seguinte.
+        """
+        if 0 < len(self.bloco) < TAMANHO_MINIMO_BLOCO_CHECKPOINT:
+            return SEM_PONTO_RETOMADA
+        self.descarregar()
+        return self.destino.tell()
+    
+    def close(self):
+        if not self.closed:
+            self.descarregar()
+            self.executor.shutdown()
+            if self.destino is not sys.__stdout__.buffer:
+                self.destino.close()
+        super().close()
+
+def abrir_saida_texto(caminho, posicao=None, args=None):
+    """Abre um arquivo de saída de texto; '-' é a saída padrão
+    
+    Com posicao (retomada), o arquivo existente é truncado nela e a escrita continua a partir dali.
+    Com --compress, o texto passa por uma SaidaComprimida antes de chegar ao arquivo.
+    """
+    codec = getattr(args, 'compress', None)
+    if codec:
+        if caminho == '-':
+            sys.__stdout__.flush()
+            destino = sys.__stdout__.buffer
+        elif posicao is None:
+            destino = open(caminho, 'wb')
+        else:
+            destino = open(caminho, 'r+b')
+            destino.seek(posicao)
+            destino.truncate()
+        saida = SaidaComprimida(destino, codec, threads_codificacao(args), fluxo=caminho == '-')
+        return io.TextIOWrapper(saida, encoding='utf-8', newline='', write_through=True)
+    if caminho == '-':
+        return sys.__stdout__
+    if posicao is None:
+        return open(caminho, 'w', newline='', encoding='utf-8')
+    arquivo = open(caminho, 'r+', newline='', encoding='utf-8')
+    arquivo.seek(posicao)
+    arquivo.truncate()
+    return arquivo
+
+# Registros por fatia do codificador CSV; limita a matriz de bytes de cada thread a algumas dezenas de MB
+TAMANHO_FATIA_CSV = 65536
+
+def citar_csv(texto):
+    """Aplica a citação mínima do módulo csv: aspas quando o texto contém vírgula, aspas ou o fim de linha"""
+    if any(c in texto for c in ',"' + os.linesep):
+        return '"' + texto.replace('"', '""') + '"'
+    return texto
+
+@functools.lru_cache(maxsize=None)
+def categorias_csv(categorias):
+    """Bytes já citados de cada categoria, codificados uma única vez por vocabulário"""
+    return textos_csv(np.array([str(c) for c in categorias], dtype=object))
+
+def escrever_digitos(matriz, coluna, valores, casas):
+    """Escreve valores com um número fixo de casas decimais a partir de matriz[:, coluna]"""
+    for k in range(casas):
+        matriz[:, coluna + casas - 1 - k] = 48 + valores // 10 ** k % 10
+
+def datas_csv(serie):
+    """Formata datetime64 como o to_csv (AAAA-MM-DD HH:MM:SS, ou só a data se todos os horários forem meia-noite)
+    
+    O calendário sai dos segundos desde 1970, uma vez por dia distinto. Devolve None se houver NaT, frações de
+    segundo ou anos fora de 1000-9999, casos deixados para o to_csv.
+    """
+    instantes = serie.to_numpy()
+    segundos = instantes.astype("datetime64[s]")
+    if np.isnat(segundos).any() or (segundos != instantes).any():
+        return None
+    segundos = segundos.astype(np.int64)
+    dias = segundos // 86400
+    resto = segundos - dias * 86400
+    primeiro = dias.min()
+    ano, mes, dia = civil_de_dias(np.arange(primeiro, dias.max() + 1))
+    if ((ano < 1000) | (ano > 9999)).any():
+        return None
+    calendario = np.empty((len(ano), 10), np.uint8)
+    escrever_digitos(calendario, 0, ano, 4)
+    escrever_digitos(calendario, 5, mes, 2)
+    escrever_digitos(calendario, 8, dia, 2)
+    calendario[:, [4, 7]] = ord('-')
+    largura = 19 if resto.any() else 10
+    matriz = np.empty((len(segundos), largura), np.uint8)
+    matriz[:, :10] = calendario[dias - primeiro]
+    if largura == 19:
+        matriz[:, [10, 13, 16]] = [ord(' '), ord(':'), ord(':')]
+        escrever_digitos(matriz, 11, resto // 3600, 2)
+        escrever_digitos(matriz, 14, resto // 60 % 60, 2)
+        escrever_digitos(matriz, 17, resto % 60, 2)
+    return matriz.ravel().view(f"S{largura}")
+
+def inteiros_csv(valores):
+    """Formata inteiros em decimal, alinhados à esquerda e com o sinal quando negativos"""
+    valores = valores.astype(np.int64)
+    absoluto = np.abs(valores)
+    negativo = (valores < 0).astype(np.int64)
+    tamanhos = np.ones(len(valores), np.int64) + negativo
+    limite = 10
+    while (absoluto >= limite).any():
+        tamanhos += absoluto >= limite
+        limite *= 10
+    largura = int(tamanhos.max())
+    matriz = np.zeros((len(valores), largura), np.uint8)
+    matriz[:, 0] = np.where(negativo == 1, ord('-'), 0)
+    for k in range(largura):
+        # Dígito da posição k: expoente contado a partir do fim do número
+        expoente = tamanhos - 1 - k
+        digito = 48 + absoluto // 10 ** np.clip(expoente, 0, 18) % 10
+        matriz[:, k] = np.where((expoente >= 0) & (k >= negativo), digito, matriz[:, k])
+    return matriz.ravel().view(f"S{largura}")
+
+def textos_csv(textos):
+    """Codifica textos em UTF-8 de largura fixa, citando os que contêm vírgula, aspas ou o fim de linha
+    
+    Devolve None se algum texto contiver o byte nulo, reservado para o preenchimento.
+    """
+    if any('\x00' in texto for texto in textos):
+        return None
+    try:
+        valores = textos.astype('S')
+    except UnicodeEncodeError:
+        valores = np.array([texto.encode('utf-8') for texto in textos], dtype=bytes)
+    citar = np.zeros(len(valores), bool)
+    for caractere in (',"' + os.linesep).encode():
+        citar |= np.char.find(valores, bytes([caractere])) >= 0
+    if citar.any():
+        valores = valores.astype(object)
+        valores[citar] = [citar_csv(valor.decode('utf-8')).encode('utf-8') for valor in valores[citar]]
+        valores = valores.astype('S')
+    return valores
+
+def campo_csv(serie):
+    """Bytes de uma coluna em largura fixa, completados com bytes nulos, ou None se o codificador não a trata
+    
+    As colunas não tratadas (valores ausentes, tipos de extensão, etc.) ficam para o to_csv.
+    """
+    dtype = serie.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        valores = categorias_csv(tuple(serie.cat.categories))
+        return None if valores is None or (codigos < 0).any() else valores[codigos]
+    if isinstance(dtype, np.dtype) and dtype.kind == 'M':
+        return datas_csv(serie)
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+        return inteiros_csv(serie.to_numpy())
+    if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        # A representação mais curta do numpy é a mesma do repr usado pelo to_csv; como nos textos,
+        # cada valor distinto (temperatura, confiança do OCR) é formatado uma única vez
+        codigos, unicos = pd.factorize(serie.to_numpy())
+        if (codigos < 0).any():
+            return None
+        valores = unicos.astype('S')
+        valores = valores.astype(f"S{max(np.char.str_len(valores).max(), 1)}")
+        return valores[codigos]
+    if isinstance(dtype, pd.StringDtype) or (dtype == object and pd.api.types.infer_dtype(serie, skipna=False) == 'string'):
+        # Colunas de vocabulário repetem poucos textos: cada texto distinto é codificado uma vez e indexado
+        codigos, unicos = pd.factorize(serie)
+        if (codigos < 0).any():
+            return None
+        valores = textos_csv(np.asarray(unicos, dtype=object))
+        return None if valores is None else valores[codigos]
+    return None
+
+def codificar_csv(df, cabecalho=True):
+    """Codifica um lote em bytes CSV idênticos aos do to_csv, montando todas as linhas de uma vez
+    
+    Cada coluna vira uma matriz de bytes de largura fixa; as linhas são a concatenação das colunas com
+    vírgulas, e os bytes nulos de preenchimento são retirados no fim. Colunas não tratadas (e lotes de uma
+    só coluna, em que o to_csv cita valores vazios) recorrem ao próprio to_csv.
+    """
+    campos = [campo_csv(df[nome]) for nome in df.columns] if len(df.columns) > 1 and len(df) else [None]
+    if any(campo is None for campo in campos):
+        return df.to_csv(header=cabecalho, index=False).encode('utf-8')
+    n = len(df)
+    fim = os.linesep.encode()
+    largura = sum(valores.itemsize for valores in campos) + len(campos) - 1 + len(fim)
+    matriz = np.empty((n, largura), np.uint8)
+    p = 0
+    for i, valores in enumerate(campos):
+        w = valores.itemsize
+        matriz[:, p:p + w] = valores.view(np.uint8).reshape(n, w)
+        p += w
+        separador = fim if i == len(campos) - 1 else b','
+        matriz[:, p:p + len(separador)] = np.frombuffer(separador, np.uint8)
+        p += len(separador)
+    corpo = matriz[matriz != 0].tobytes()
+    if cabecalho:
+        corpo = (','.join(citar_csv(str(nome)) for nome in df.columns) + os.linesep).encode('utf-8') + corpo
+    return corpo
+
+def fatias_csv(df, partes):
+    """Divide um lote em fatias contíguas para o codificador, ao menos uma por thread"""
+    tamanho = max(1, min(TAMANHO_FATIA_CSV, -(-len(df) // partes)))
+    return [df.iloc[inicio:inicio + tamanho] for inicio in range(0, len(df), tamanho)] or [df]
+
+class EscritorTexto:
+    """Base dos sinks de texto: o arquivo (ou fluxo) aberto, a posição para o checkpoint e o fechamento"""
+    
+    def __init__(self, arquivo, fluxo):
+        self.arquivo = arquivo
+        # Em fluxos (saída padrão, TCP), cada lote é enviado imediatamente para quem está lendo
+        self.fluxo = fluxo
+    
+    def entregar(self):
+        """Nos fluxos, envia o lote recém-gravado sem esperar o buffer encher"""
+        if self.fluxo:
+            self.arquivo.flush()
+    
+    def posicao(self):
+        """Posição em bytes após o último lote, registrada no checkpoint (None em fluxos)"""
+        if self.fluxo:
+            return None
+        self.arquivo.flush()
+        if isinstance(self.arquivo.buffer, SaidaComprimida):
+            return self.arquivo.buffer.posicao_retomada()
+        return self.arquivo.tell()
+    
+    def fechar(self):
+        if self.arquivo is sys.__stdout__:
+            self.arquivo.flush()
+        else:
+            self.arquivo.close()
+
+class EscritorCSV(EscritorTexto):
+    """Grava os lotes em um único arquivo CSV, escrevendo o cabeçalho apenas no primeiro
+    
+    Cada lote é dividido em fatias codificadas em paralelo por --encode-threads threads; as fatias são
+    gravadas em ordem, direto no buffer binário do arquivo.
+    """
+    
+    def __init__(self, caminho, args, posicao=None):
+        super().__init__(abrir_saida_texto(caminho, posicao, args), fluxo=caminho == '-')
+        self.cabecalho = not posicao
+        self.threads = threads_codificacao(args)
+        self.executor = ThreadPoolExecutor(max_workers=self.threads) if self.threads > 1 else None
+    
+    def escrever(self, df):
+        fatias = fatias_csv(df, self.threads)
+        cabecalhos = [self.cabecalho] + [False] * (len(fatias) - 1)
+        # O map do executor devolve os blocos na ordem das fatias, mesmo que terminem fora de ordem
+        blocos = (self.executor.map if self.executor else map)(codificar_csv, fatias, cabecalhos)
+        self.arquivo.flush()
+        for bloco in blocos:
+            self.arquivo.buffer.write(bloco)
+        self.cabecalho = False
+        self.entregar()
+    
+    def fechar(self):
+        if self.executor:
+            self.executor.shutdown()
+        super().fechar()
+
+def gravar_jsonl(arquivo, df):
+    """Grava um lote em JSON Lines, um objeto por registro"""
+    if not len(df):
+        # JSON Lines não tem cabeçalho; o to_json de um lote vazio gravaria uma linha em branco
+        return
+    ampliar_float32(df).to_json(arquivo, orient='records', lines=True, force_ascii=False,
+                                date_format='iso', date_unit='s')
+
+class EscritorJSONL(EscritorTexto):
+    """Grava os lotes em JSON Lines, um objeto por registro"""
+    
+    def __init__(self, caminho, args, posicao=None):
+        super().__init__(abrir_saida_texto(caminho, posicao, args), fluxo=caminho == '-')
+    
+    def escrever(self, df):
+        gravar_jsonl(self.arquivo, df)
+        self.entregar()
+
+class EscritorTCP(EscritorTexto):
+    """Envia os lotes em JSON Lines por uma conexão TCP (ex.: um consumidor local que simula Kafka ou Redis)"""
+    
+    def __init__(self, endereco, args):
+        host, _, porta = endereco.rpartition(':')
+        self.conexao = socket.create_connection((host or 'localhost', int(porta)))
+        super().__init__(self.conexao.makefile('w', encoding='utf-8', newline=''), fluxo=True)
+    
+    def escrever(self, df):
+        gravar_jsonl(self.arquivo, df)
+        self.entregar()
+    
+    def fechar(self):
+        super().fechar()
+        self.conexao.close()
+
+class EscritorParquet:
+    """Grava os lotes em um arquivo Parquet, com row groups de até --row-group-size registros"""
+    
+    def __init__(self, caminho, args):
+        self.caminho = caminho
+        self.compressao = args.compression or COMPRESSAO_PADRAO['parquet']
+        self.row_group_size = args.row_group_size
+        self.writer = None
+    
+    def escrever(self, df):
+        tabela = dataframe_para_arrow(df)
+        if self.writer is None:
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(self.caminho, tabela.schema, compression=self.compressao)
+        self.writer.write_table(tabela, row_group_size=self.row_group_size)
+    
+    def fechar(self):
+        if self.writer is not None:
+            self.writer.close()
+
+class EscritorArrow:
+    """Grava os lotes em Feather (formato de arquivo IPC) ou Arrow IPC (formato de streaming)"""
+    
+    def __init__(self, caminho, args, formato):
+        self.caminho = caminho
+        self.formato = formato
+        compressao = args.compression or COMPRESSAO_PADRAO[formato]
+        self.opcoes = pa.ipc.IpcWriteOptions(compression=None if compressao == 'none' else compressao)
+        self.row_group_size = args.row_group_size
+        self.writer = None
+    
+    def escrever(self, df):
+        tabela = dataframe_para_arrow(df)
+        if self.writer is None:
+            abrir = pa.ipc.new_file if self.formato == 'feather' else pa.ipc.new_stream
+            self.writer = abrir(self.caminho, tabela.schema, options=self.opcoes)
+        self.writer.write_table(tabela, max_chunksize=self.row_group_size)
+    
+    def fechar(self):
+        if self.writer is not None:
+            self.writer.close()
+
+class EscritorSQLite:
+    """Grava os lotes em uma tabela SQLite tipada, criando os índices ao final da carga"""
+    
+    def __init__(self, caminho, args, posicao=None):
+        import sqlite3
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.tabela = args.table
+        self.if_exists = args.table_if_exists
+        self.colunas = None
+        self.criar_indices = False
+        if posicao is not None:
+            # Retomada: remove as linhas gravadas depois do checkpoint e continua anexando à tabela;
+            # os índices são criados ao final se a execução original criou a tabela
+            with self.conexao:
+                self.conexao.execute(f'DELETE FROM "{self.tabela}" WHERE rowid > ?', (posicao,))
+            self.criar_indices = self.if_exists != 'append'
+            self.if_exists = 'append'
+    
+    def preparar(self, df):
+        existe = self.conexao.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.tabela,)).fetchone() is not None
+        if existe and self.if_exists == 'fail':
+            raise ValueError(f"A tabela '{self.tabela}' já existe")
+        if existe and self.if_exists == 'replace':
+            self.conexao.execute(f'DROP TABLE "{self.tabela}"')
+        if not existe or self.if_exists == 'replace':
+            self.conexao.execute(sql_criar_tabela(df, self.tabela, dialeto='sqlite'))
+            self.criar_indices = True
+        self.colunas = list(df.columns)
+    
+    def escrever(self, df):
+        if self.colunas is None:
+            self.preparar(df)
+        marcadores = ", ".join(["?"] * len(self.colunas))
+        with self.conexao:
+            self.conexao.executemany(f'INSERT INTO "{self.tabela}" VALUES ({marcadores})', valores_sql(df))
+    
+    def posicao(self):
+        """Maior rowid após o último lote, registrado no checkpoint"""
+        return self.conexao.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{self.tabela}"').fetchone()[0]
+    
+    def fechar(self):
+        if self.criar_indices and self.colunas is not None:
+            with self.conexao:
+                for comando in sql_indices_individuais(self.colunas, self.tabela):
+                    self.conexao.execute(comando)
+        self.conexao.close()
+
+class EscritorPostgres:
+    """Grava os lotes em uma tabela PostgreSQL com COPY FROM STDIN (psycopg 3 ou psycopg2)"""
+    
+    def __init__(self, dsn, args):
+        self.psycopg3 = psycopg is not None
+        self.conexao = psycopg.connect(dsn) if self.psycopg3 else psycopg2.connect(dsn)
+        self.tabela = args.table
+        self.if_exists = args.table_if_exists
+        self.colunas = None
+        self.criar_indices = False
+    
+    def preparar(self, df):
+        with self.conexao.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (self.tabela,))
+            existe = cursor.fetchone()[0]
+            if existe and self.if_exists == 'fail':
+                raise ValueError(f"A tabela '{self.tabela}' já existe")
+            if existe and self.if_exists == 'replace':
+                cursor.execute(f'DROP TABLE "{self.tabela}"')
+            if not existe or self.if_exists == 'replace':
+                cursor.execute(sql_criar_tabela(df, self.tabela, dialeto='postgres'))
+                self.criar_indices = True
+        self.conexao.commit()
+        self.colunas = list(df.columns)
+    
+    def escrever(self, df):
+        if self.colunas is None:
+            self.preparar(df)
+        if len(df) and "id_registro" in df and isinstance(df["id_registro"].iloc[0], bytes):
+            # bytea no formato hexadecimal aceito pelo COPY
+            df = df.assign(id_registro=["\\x" + valor.hex() for valor in df["id_registro"]])
+        texto = ampliar_float32(df).to_csv(header=False, index=False, date_format="%Y-%m-%d %H:%M:%S")
+        lista_colunas = ", ".join(f'"{coluna}"' for coluna in self.colunas)
+        comando = f'COPY "{self.tabela}" ({lista_colunas}) FROM STDIN WITH (FORMAT csv)'
+        with self.conexao.cursor() as cursor:
+            if self.psycopg3:
+                with cursor.copy(comando) as copia:
+                    copia.write(texto)
+            else:
+                cursor.copy_expert(comando, io.StringIO(texto))
+        self.conexao.commit()
+    
+    def fechar(self):
+        if self.criar_indices and self.colunas is not None:
+            with self.conexao.cursor() as cursor:
+                for comando in sql_indices_individuais(self.colunas, self.tabela, dialeto='postgres'):
+                    cursor.execute(comando)
+            self.conexao.commit()
+        self.conexao.close()
+
+# %%
+# Sinks: cada destino recebe os mesmos lotes, em paralelo, por uma fila limitada
+
+TIPOS_SINK = ['csv', 'parquet', 'feather', 'arrow-ipc', 'jsonl', 'stdout', 'tcp', 'sqlite', 'postgres', 'mysql']
+
+# Sinks de texto, que não aceitam --uuid-binary
+SINKS_TEXTO = {'csv', 'jsonl', 'stdout', 'tcp'}
+
+# Sinks de texto que aceitam --compress
+SINKS_COMPRIMIDOS = {'csv', 'jsonl', 'stdout'}
+
+# Sinks que requerem pyarrow
+SINKS_ARROW = {'parquet', 'feather', 'arrow-ipc'}
+
+def especificacoes_sinks(args):
+    """Lista as especificações TIPO:DESTINO dos sinks a partir de --sink, ou de --format/--output"""
+    especificacoes = list(args.sink) if args.sink else [f"{args.format}:{args.output}"]
+    if hasattr(args, 'mysql') and args.mysql and 'mysql' not in especificacoes:
+        especificacoes.append('mysql')
+    return especificacoes
+
+def criar_sink(especificacao, args, retomada=None):
+    """Cria o sink de uma especificação TIPO:DESTINO (ex.: parquet:dados.parquet, sqlite:dados.db)"""
+    tipo, _, destino = especificacao.partition(':')
+    posicao = retomada.get(especificacao) if retomada else None
+    if tipo == 'csv':
+        return EscritorCSV(destino, args, posicao)
+    if tipo == 'jsonl':
+        return EscritorJSONL(destino or '-', args, posicao)
+    if tipo == 'stdout':
+        return EscritorJSONL('-', args) if destino == 'jsonl' else EscritorCSV('-', args)
+    if tipo == 'parquet':
+        return EscritorParquet(destino, args)
+    if tipo in ('feather', 'arrow-ipc'):
+        return EscritorArrow(destino, args, tipo)
+    if tipo == 'sqlite':
+        return EscritorSQLite(destino, args, posicao)
+    if tipo == 'postgres':
+        return EscritorPostgres(destino, args)
+    if tipo == 'tcp':
+        return EscritorTCP(destino, args)
+    if tipo == 'mysql':
+        return EscritorToSQL(args) if args.mysql_method == 'to_sql' else EscritorMySQL(args)
+    raise ValueError(f"Tipo de sink desconhecido: {tipo} (opções: {', '.join(TIPOS_SINK)})")
+
+FIM_DOS_LOTES = None
+
+class DistribuidorLotes:
+    """Entrega cada lote a todos os sinks, cada um consumindo sua própria fila em uma thread
+    
+    As filas têm tamanho limitado: um sink lento (ex.: banco de dados) acumula no máximo
+    --sink-queue-size lotes antes de o gerador esperar por ele, sem atrasar os demais sinks
+    lote a lote e sem crescer a memória. Um sink que falha é descartado sem travar os demais.
+    """
+    
+    def __init__(self, sinks, tamanho_fila, checkpoint=None):
+        self.checkpoint = checkpoint
+        self.erros = {}
+        self.filas = []
+        self.threads = []
+        for nome, sink in sinks:
+            fila = queue.Queue(maxsize=tamanho_fila)
+            thread = threading.Thread(target=self.consumir, args=(nome, sink, fila), daemon=True)
+            thread.start()
+            self.filas.append(fila)
+            self.threads.append(thread)
+    
+    def consumir(self, nome, sink, fila):
+        while True:
+            lote = fila.get()
+            if lote is FIM_DOS_LOTES:
+                break
+            if nome in self.erros:
+                continue  # continua esvaziando a fila para não bloquear o gerador
+            try:
+                sink.escrever(lote)
+                if self.checkpoint:
+                    self.checkpoint.registrar(nome, len(lote), sink.posicao() if hasattr(sink, 'posicao') else None)
+            except Exception as e:
+                self.erros[nome] = e
+        try:
+            sink.fechar()
+        except Exception as e:
+            self.erros.setdefault(nome, e)
+    
+    def enviar(self, lote):
+        for fila in self.filas:
+            fila.put(lote)
+    
+    def finalizar(self):
+        for fila in self.filas:
+            fila.put(FIM_DOS_LOTES)
+        for thread in self.threads:
+            thread.join()
+        return self.erros
+
+def distribuir_lotes(lotes, sinks, args, checkpoint=None):
+    """Envia os lotes a todos os sinks e retorna (total de registros, erros por sink)"""
+    distribuidor = DistribuidorLotes(sinks, args.sink_queue_size, checkpoint)
+    total = 0
+    try:
+        for lote in lotes:
+            distribuidor.enviar(lote)
+            total += len(lote)
+    finally:
+        erros = distribuidor.finalizar()
+    return total, erros
+
+def ritmar_lotes(lotes, args):
+    """Entrega os registros no ritmo de --rate (eventos por segundo) ou --replay-speed (tempo dos eventos N vezes mais rápido)
+    
+    Cada lote é dividido em fatias pelo instante em que devem sair; fatias já atrasadas são entregues juntas.
+    """
+    if not (args.rate or args.replay_speed):
+        yield from lotes
+        return
+    
+    inicio = time.monotonic()
+    emitidos = 0
+    primeiro_evento = None
+    for lote in lotes:
+        if not len(lote):
+            # Lote vazio de uma geração sem registros: só o esquema, sem nada a ritmar
+            yield lote
+            continue
+        if args.replay_speed:
+            # Os registros de um mesmo segundo de evento saem juntos
+            instantes = lote["data_hora"].to_numpy().astype("datetime64[s]").astype(np.int64)
+            if primeiro_evento is None:
+                primeiro_evento = instantes[0]
+            inicios = np.concatenate([[0], np.flatnonzero(np.diff(instantes)) + 1])
+            alvos = (instantes[inicios] - primeiro_evento) / args.replay_speed
+        else:
+            inicios = np.arange(0, len(lote), max(1, int(args.rate // 50)))
+            alvos = (emitidos + inicios) / args.rate
         
-        # Additional fields
-        "velocidade": [random.randint(args.velocidade_min, args.velocidade_max) for _ in range(args.num_records)], # km/h
-        "direcao_deslocamento": [random.choice(direcoes) for _ in range(args.num_records)],
-    })
-    
-    # Gerar dados de infração
-    infracoes = []
-    for i in range(args.num_records):
-        local = locais_gerados[i]
-        limite_velocidade = limites_velocidade.get(local, 60)  # Padrão 60 km/h se não especificado
+        pendente = 0
+        for posicao, alvo in zip(inicios, alvos):
+            espera = inicio + alvo - time.monotonic()
+            if espera > 0:
+                if posicao > pendente:
+                    yield lote.iloc[pendente:posicao]
+                    pendente = posicao
+                time.sleep(espera)
+        if pendente < len(lote):
+            yield lote.iloc[pendente:]
+        emitidos += len(lote)
+
+# Versão do formato dos checkpoints; checkpoints de outra versão não são retomados
+VERSAO_CHECKPOINT = 1
+
+# Opções que não definem os dados gerados e por isso não são restauradas por --resume
+OPCOES_FORA_CHECKPOINT = {'config', 'save_config', 'checkpoint', 'resume', 'start_index', 'num_records', 'range',
+                          'mysql_password', 'workers', 'sink_queue_size', 'rate', 'replay_speed', 'serve',
+                          'serve_max_records', 'show_sample', 'show_stats', 'show_memory', 'benchmark',
+                          'benchmark_output', 'benchmark_workers', 'benchmark_startup', 'no_cache', 'cache_size',
+                          'encode_threads'}
+
+class Checkpoint:
+    """Registra em JSON o progresso de uma geração em lotes, para que --resume continue de onde parou
+    
+    O checkpoint só avança quando todos os sinks gravaram o lote (os bancos confirmam cada lote com commit).
+    Além do próximo índice e do bloco em que ele cai, guarda a seed, o instante de referência e as opções:
+    os geradores de cada bloco derivam apenas de (seed, bloco), então isso basta para reproduzir o restante.
+    Para arquivos de texto e SQLite, guarda também a posição de cada sink nesse ponto.
+    """
+    
+    def __init__(self, caminho, args, agora, especificacoes, inicio):
+        self.caminho = caminho
+        self.base = args.start_index
+        self.dados = {
+            "versao": VERSAO_CHECKPOINT,
+            "seed": args.seed,
+            "inicio": inicio,
+            "fim": args.start_index + args.num_records,
+            "proximo_indice": args.start_index,
+            "proximo_bloco": args.start_index // TAMANHO_BLOCO,
+            "agora": str(agora),
+            "concluido": False,
+            "posicoes": {},
+            "opcoes": {chave: valor for chave, valor in vars(args).items() if chave not in OPCOES_FORA_CHECKPOINT},
+        }
+        self.gravados = {especificacao: 0 for especificacao in especificacoes}
+        self.pendentes = {especificacao: collections.deque() for especificacao in especificacoes}
+        self.trava = threading.Lock()
+    
+    def registrar(self, especificacao, registros, posicao):
+        """Chamado pela thread de cada sink após gravar um lote; salva o checkpoint quando todos gravaram
         
-        infracao = determinar_infracao(
-            data["velocidade"][i], 
-            limite_velocidade, 
-            data["condicao_estrada"][i], 
-            data["condicao_clima"][i],
-            data["tipo_veiculo"][i],
-            data["ano_veiculo"][i]
-        )
-        infracoes.append(infracao)
+        Um lote após o qual algum sink não tem ponto de retomada (SEM_PONTO_RETOMADA, ex.: bloco comprimido
+        ainda pequeno) não é registrado; o checkpoint avança no próximo lote em que todos têm.
+        """
+        with self.trava:
+            self.gravados[especificacao] += registros
+            self.pendentes[especificacao].append((self.gravados[especificacao], posicao))
+            confirmados = min(self.gravados.values())
+            sem_ponto = {gravados for pendentes in self.pendentes.values()
+                         for gravados, posicao in pendentes if posicao is SEM_PONTO_RETOMADA}
+            ponto = max((gravados for gravados, _ in self.pendentes[especificacao]
+                         if gravados <= confirmados and gravados not in sem_ponto), default=None)
+            if ponto is None or self.base + ponto == self.dados["proximo_indice"]:
+                return
+            
+            # Posição de cada sink exatamente após o último lote gravado por todos
+            for nome, pendentes in self.pendentes.items():
+                while pendentes and pendentes[0][0] < ponto:
+                    pendentes.popleft()
+                if pendentes and pendentes[0][0] == ponto and pendentes[0][1] is not None:
+                    self.dados["posicoes"][nome] = pendentes[0][1]
+            self.dados["proximo_indice"] = self.base + ponto
+            self.dados["proximo_bloco"] = (self.base + ponto) // TAMANHO_BLOCO
+            self.salvar()
+    
+    def concluir(self):
+        with self.trava:
+            self.dados["concluido"] = True
+            self.salvar()
+    
+    def salvar(self):
+        # Escrita atômica: uma interrupção durante a gravação não corrompe o checkpoint anterior
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.dados, f, indent=4, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+
+def carregar_checkpoint(args):
+    """Restaura em args a execução registrada no checkpoint de --resume; retorna (checkpoint, mensagem de erro)"""
+    try:
+        with open(args.resume, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        return None, f"Não foi possível ler o checkpoint {args.resume}: {e}"
+    if checkpoint.get("versao") != VERSAO_CHECKPOINT:
+        return None, f"O checkpoint {args.resume} tem uma versão não suportada."
+    if checkpoint["concluido"]:
+        return None, f"A execução registrada em {args.resume} já foi concluída."
+    
+    for chave, valor in checkpoint["opcoes"].items():
+        setattr(args, chave, valor)
+    args.start_index = checkpoint["proximo_indice"]
+    args.num_records = checkpoint["fim"] - checkpoint["proximo_indice"]
+    args.checkpoint = args.checkpoint or args.resume
+    return checkpoint, None
+
+# Versão do formato do cache de dados gerados; alterar invalida as entradas existentes
+VERSAO_CACHE_DADOS = 1
+
+DIRETORIO_CACHE_DADOS = os.path.join(DIRETORIO_CACHE, "dados")
+
+# Opções que não alteram os dados gerados e por isso ficam fora da chave do cache (além das mysql_*)
+OPCOES_FORA_CACHE = {'config', 'save_config', 'output', 'format', 'compression', 'row_group_size', 'chunk_size',
+                     'workers', 'sink', 'sink_queue_size', 'table', 'table_if_exists', 'checkpoint', 'resume', 'range',
+                     'rate', 'replay_speed', 'serve', 'serve_max_records', 'locale', 'show_sample', 'show_stats',
+                     'show_memory', 'benchmark', 'benchmark_output', 'benchmark_workers', 'benchmark_startup',
+                     'no_cache', 'cache_size', 'encode_threads', 'compress'}
+
+# Entradas temporárias mais antigas que isso são de execuções interrompidas e podem ser removidas
+IDADE_MAXIMA_TEMPORARIO_S = 86400
+
+@functools.lru_cache(maxsize=None)
+def hash_codigo():
+    """Hash do código deste script, para que uma mudança no gerador invalide o cache"""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def usar_cache(args):
+    """O cache só vale quando os dados são determinísticos (--reference-date) e a execução é completa"""
+    return bool(args.reference_date and not args.no_cache and PYARROW_AVAILABLE
+                and not args.checkpoint and not args.resume)
+
+def chave_cache(args):
+    """Hash da configuração normalizada (as opções gravadas por save_config que definem os dados) e do gerador"""
+    opcoes = {nome: valor for nome, valor in vars(args).items()
+              if nome not in OPCOES_FORA_CACHE and not nome.startswith('mysql')}
+    conteudo = json.dumps({"versao": VERSAO_CACHE_DADOS, "gerador": hash_codigo(), "opcoes": opcoes},
+                          sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def lotes_cache(caminho, tamanho_lote=None):
+    """Lê uma entrada do cache em lotes de tamanho_lote registros (ou inteira, sem tamanho_lote)"""
+    with pa.memory_map(caminho) as origem:
+        leitor = pa.ipc.open_file(origem)
+        if not tamanho_lote:
+            yield leitor.read_all().to_pandas()
+            return
+        pendentes, acumulados, lidos = [], 0, 0
+        for indice in range(leitor.num_record_batches):
+            lote = leitor.get_batch(indice)
+            pendentes.append(lote)
+            acumulados += lote.num_rows
+            while acumulados >= tamanho_lote:
+                tabela = pa.Table.from_batches(pendentes)
+                yield tabela.slice(0, tamanho_lote).to_pandas()
+                pendentes = tabela.slice(tamanho_lote).to_batches()
+                acumulados -= tamanho_lote
+                lidos += tamanho_lote
+        if acumulados or not lidos:
+            # Uma entrada sem registros ainda produz um lote vazio, com o esquema, como na geração
+            yield pa.Table.from_batches(pendentes, schema=leitor.schema).to_pandas()
+
+def gravar_cache(lotes, caminho, limite_mb):
+    """Repassa os lotes e grava-os em uma nova entrada do cache, publicada só se todos forem gerados
     
-    # Adicionar a coluna de infrações ao dicionário de dados
-    data["infracao"] = infracoes
-    data["limite_velocidade"] = [limites_velocidade.get(local, 60) for local in locais_gerados]
+    Uma falha de escrita no cache (ex.: disco cheio) apenas desliga o cache, sem interromper a geração.
+    """
+    try:
+        os.makedirs(DIRETORIO_CACHE_DADOS, exist_ok=True)
+        temporario = tempfile.NamedTemporaryFile(dir=DIRETORIO_CACHE_DADOS, suffix=".tmp", delete=False)
+    except OSError as e:
+        print(f"  Cache: desativado nesta execução ({e})")
+        yield from lotes
+        return
+    escritor = None
+    try:
+        for lote in lotes:
+            if temporario:
+                try:
+                    tabela = dataframe_para_arrow(lote)
+                    if escritor is None:
+                        escritor = pa.ipc.new_file(temporario, tabela.schema,
+                                                   options=pa.ipc.IpcWriteOptions(compression='lz4'))
+                    escritor.write_table(tabela, max_chunksize=TAMANHO_BLOCO)
+                except OSError as e:
+                    print(f"  Cache: desativado nesta execução ({e})")
+                    temporario.close()
+                    os.remove(temporario.name)
+                    temporario = None
+            yield lote
+        if temporario and escritor:
+            escritor.close()
+            temporario.close()
+            os.replace(temporario.name, caminho)
+            temporario = None
+            limpar_cache(limite_mb)
+    finally:
+        if temporario:
+            temporario.close()
+            os.remove(temporario.name)
+
+def limpar_cache(limite_mb):
+    """Remove as entradas usadas há mais tempo até o cache caber em limite_mb (LRU pela data de modificação)"""
+    agora = time.time()
+    entradas = []
+    for nome in os.listdir(DIRETORIO_CACHE_DADOS):
+        caminho = os.path.join(DIRETORIO_CACHE_DADOS, nome)
+        try:
+            estado = os.stat(caminho)
+        except OSError:
+            continue
+        if nome.endswith(".tmp"):
+            if agora - estado.st_mtime > IDADE_MAXIMA_TEMPORARIO_S:
+                with contextlib.suppress(OSError):
+                    os.remove(caminho)
+        elif nome.endswith(".arrow"):
+            entradas.append((estado.st_mtime, estado.st_size, caminho))
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    for _, tamanho, caminho in sorted(entradas):
+        if total <= limite_mb * 1024 * 1024:
+            break
+        with contextlib.suppress(OSError):
+            os.remove(caminho)
+            total -= tamanho
+
+def lotes_com_cache(args, gerar_lotes, tamanho_lote=None):
+    """Lotes da configuração: lidos do cache se ela já foi gerada, ou gerados por gerar_lotes() e gravados nele"""
+    if not usar_cache(args):
+        return gerar_lotes()
+    caminho = os.path.join(DIRETORIO_CACHE_DADOS, f"{chave_cache(args)}.arrow")
+    if os.path.exists(caminho):
+        os.utime(caminho)  # marca a entrada como usada agora, para o LRU
+        print(f"  Cache: reutilizando {caminho}")
+        return lotes_cache(caminho, tamanho_lote)
+    print(f"  Cache: gravando {caminho}")
+    return gravar_cache(gerar_lotes(), caminho, args.cache_size)
+
+def validar_sinks(args, especificacoes):
+    """Retorna uma mensagem de erro se algum sink for incompatível com as opções, ou None"""
+    for especificacao in especificacoes:
+        tipo, _, destino = especificacao.partition(':')
+        if tipo not in TIPOS_SINK:
+            return f"Tipo de sink desconhecido: {tipo} (opções: {', '.join(TIPOS_SINK)})"
+        if tipo == 'mysql' and not MYSQL_AVAILABLE:
+            return "O sink mysql requer as bibliotecas pymysql e sqlalchemy. Execute: pip install pymysql sqlalchemy"
+        if tipo == 'postgres' and not POSTGRES_AVAILABLE:
+            return "O sink postgres requer a biblioteca psycopg. Execute: pip install psycopg"
+        if tipo in SINKS_ARROW and not PYARROW_AVAILABLE:
+            return f"O formato {tipo} requer a biblioteca pyarrow. Execute: pip install pyarrow"
+        if tipo in SINKS_TEXTO and args.uuid_binary:
+            return "--uuid-binary requer sinks binários (parquet, feather, arrow-ipc, sqlite, postgres ou mysql)."
+        if tipo in ('feather', 'arrow-ipc') and args.compression not in (None, 'none', 'lz4', 'zstd'):
+            return f"O formato {tipo} aceita apenas as compressões lz4, zstd ou none."
+        if tipo in ('csv', 'parquet', 'feather', 'arrow-ipc', 'tcp', 'sqlite', 'postgres') and not destino:
+            return f"O sink {tipo} requer um destino (ex.: {tipo}:{'localhost:9000' if tipo == 'tcp' else 'caminho'})."
+        if tipo == 'tcp' and not destino.rpartition(':')[2].isdigit():
+            return "O sink tcp requer um endereço no formato tcp:HOST:PORTA."
+        if tipo in SINKS_ARROW and args.checkpoint:
+            return f"--checkpoint não suporta o sink {tipo}: o arquivo só fica válido ao ser fechado e não pode ser continuado."
+        if tipo in ('postgres', 'mysql') and args.checkpoint:
+            return (f"--checkpoint não suporta o sink {tipo}: a tabela não tem uma posição em que a retomada possa "
+                    "descartar as linhas gravadas depois do checkpoint (use sqlite, csv ou jsonl).")
+    tipos = {especificacao.partition(':')[0] for especificacao in especificacoes}
+    if args.compress and not tipos & SINKS_COMPRIMIDOS:
+        return "--compress requer um sink csv, jsonl ou stdout (os formatos colunares usam --compression)."
+    if args.compress == 'zstd' and not ZSTD_AVAILABLE:
+        return "--compress zstd requer a biblioteca zstandard. Execute: pip install zstandard"
+    return None
+
+def criar_sinks(args, especificacoes, retomada=None):
+    """Cria os sinks, retornando pares (especificação, sink)
     
-    # Convert to DataFrame
-    df = pd.DataFrame(data)
+    Na retomada (--resume), retomada tem a posição de cada sink no checkpoint: arquivos de texto e tabelas
+    SQLite descartam o que foi gravado depois dela e continuam a partir dali.
+    """
+    sinks = []
+    try:
+        for especificacao in especificacoes:
+            sinks.append((especificacao, criar_sink(especificacao, args, retomada)))
+    except BaseException:
+        # Um destino que não abre não deixa os anteriores abertos (arquivos, conexões e threads)
+        for _, sink in sinks:
+            with contextlib.suppress(Exception):
+                sink.fechar()
+        raise
+    return sinks
+
+def informar_erros_sinks(erros):
+    for nome, erro in erros.items():
+        print(f"Erro ao gravar em {nome}: {erro}")
+
+def validar_opcoes(args):
+    """Verifica as combinações de opções de geração, devolvendo a mensagem de erro ou None
     
-    # Add derived fields
-    df["data_hora"] = pd.to_datetime(df["data_hora"])
-    df["dia_semana"] = df["data_hora"].dt.day_name().map({
-        'Monday': 'Segunda-feira',
-        'Tuesday': 'Terça-feira',
-        'Wednesday': 'Quarta-feira',
-        'Thursday': 'Quinta-feira',
-        'Friday': 'Sexta-feira',
-        'Saturday': 'Sábado',
-        'Sunday': 'Domingo'
-    })
-    df["hora_dia"] = df["data_hora"].dt.hour
-    df["semana"] = df["data_hora"].dt.isocalendar().week
-    df["mes"] = df["data_hora"].dt.month
-    df["ano"] = df["data_hora"].dt.year
-    
-    # Convert back to string for CSV output
-    df["data_hora"] = df["data_hora"].dt.strftime("%Y-%m-%d %H:%M:%S")
-    
-    return df
+    Também carrega --pesos (texto JSON ou arquivo) e pré-compila as tabelas de sorteio.
+    """
+    if args.engine != 'numpy' and (args.chunk_size or args.workers > 1 or args.benchmark_workers or args.uuid_binary
+                                   or args.unique_plates or args.fleet_size or args.spatiotemporal or args.event_order
+                                   or args.start_index or args.checkpoint or args.counter_rng):
+        return ("As opções --chunk-size, --workers, --benchmark-workers, --uuid-binary, --unique-plates, --fleet-size, "
+                "--spatiotemporal, --event-order, --start-index, --range, --checkpoint e --counter-rng requerem --engine numpy.")
+    
+    if args.start_index < 0:
+        return "--start-index não pode ser negativo."
+    
+    if args.num_records < 0:
+        return "--num-records não pode ser negativo."
+    
+    if args.chunk_size is not None and args.chunk_size <= 0:
+        return "--chunk-size deve ser maior que zero."
+    
+    if args.workers < 1:
+        return "--workers deve ser ao menos 1."
+    if args.serve_max_records < 1:
+        return "--serve-max-records deve ser ao menos 1."
+    
+    try:
+        instante_referencia(args)
+    except ValueError:
+        return f"--reference-date inválida: {args.reference_date} (use AAAA-MM-DD ou AAAA-MM-DDTHH:MM:SS)."
+    
+    if args.checkpoint and not args.chunk_size:
+        return "--checkpoint requer --chunk-size (o progresso é registrado a cada lote)."
+    
+    # Os instantes em ordem de evento são sorteados para os registros 0 a FIM-1: um trecho que começa depois
+    # de 0 teria outro FIM e não reproduziria a execução completa. A retomada mantém o FIM do checkpoint.
+    if args.counter_rng and args.event_order:
+        return ("--counter-rng não pode ser usado com --event-order: os instantes em ordem de evento dependem do total "
+                "de registros, e não apenas de (seed, índice, coluna).")
+    
+    if args.event_order and args.start_index and not args.resume:
+        return "--event-order não pode ser usado com --start-index ou --range (os instantes dependem do total de registros)."
+    
+    if args.replay_speed and not args.event_order:
+        return "--replay-speed requer --event-order (os registros precisam estar em ordem de evento)."
+    
+    if args.rate and args.replay_speed:
+        return "Use apenas uma das opções --rate e --replay-speed."
+    
+    if (args.rate is not None and args.rate <= 0) or (args.replay_speed is not None and args.replay_speed <= 0):
+        return "--rate e --replay-speed devem ser maiores que zero."
+    
+    if args.encode_threads is not None and args.encode_threads <= 0:
+        return "--encode-threads deve ser maior que zero."
+    
+    args.columns = lista_colunas(args.columns)
+    if args.columns is not None:
+        desconhecidas = [coluna for coluna in args.columns if coluna not in COLUNAS]
+        if desconhecidas:
+            return f"Colunas desconhecidas em --columns: {', '.join(desconhecidas)}. Disponíveis: {', '.join(COLUNAS)}."
+        if not args.columns or len(set(args.columns)) != len(args.columns):
+            return "--columns deve listar ao menos uma coluna, sem repetições."
+        if args.replay_speed and "data_hora" not in args.columns:
+            return "--replay-speed requer a coluna data_hora em --columns."
+    
+    if args.unique_plates and args.fleet_size:
+        return "--unique-plates e --fleet-size não podem ser usados juntos (na frota, cada veículo já tem placa única)."
+    
+    if args.unique_plates and args.start_index + args.num_records > TOTAL_PLACAS:
+        return f"--unique-plates permite no máximo {TOTAL_PLACAS} registros (total de placas possíveis)."
+    
+    if args.fleet_size is not None and not 0 < args.fleet_size <= TOTAL_PLACAS:
+        return f"--fleet-size deve estar entre 1 e {TOTAL_PLACAS}."
+    
+    try:
+        args.pesos = carregar_pesos(args.pesos)
+    except (OSError, ValueError) as e:
+        return f"Não foi possível ler --pesos: {e}"
+    erro = validar_pesos(args.pesos)
+    if erro is None:
+        try:
+            tabelas_pesos(args)
+        except ValueError as e:
+            erro = f"Pesos inválidos: {e}."
+    return erro
 
 def main():
     # Processar argumentos da linha de comando
     args = parse_args()
     
+    # Na retomada, as opções e os sinks vêm do checkpoint
+    retomado = None
+    if args.resume:
+        retomado, erro = carregar_checkpoint(args)
+        if erro:
+            print(f"ERRO: {erro}")
+            sys.exit(1)
+    especificacoes = especificacoes_sinks(args)
+    
+    # Com um sink na saída padrão, as mensagens informativas vão para a saída de erro
+    if any(especificacao.partition(':')[0] == 'stdout' or especificacao.endswith(':-')
+           for especificacao in especificacoes):
+        sys.stdout = sys.stderr
+    
     # Configurar seeds para reprodutibilidade
     np.random.seed(args.seed)
     random.seed(args.seed)
-    fake = Faker(args.locale)
-    Faker.seed(args.seed)
     
     print(f"Configurações:")
     print(f"  Seed: {args.seed}")
     print(f"  Registros: {args.num_records}")
-    print(f"  Arquivo de saída: {args.output}")
+    if args.start_index:
+        print(f"  Primeiro índice: {args.start_index}")
+    print(f"  Destinos: {', '.join(especificacoes)}")
+    print(f"  Motor de geração: {args.engine}")
+    
+    erro = validar_sinks(args, especificacoes)
+    if erro:
+        print(f"ERRO: {erro}")
+        sys.exit(1)
+    
+    erro = validar_opcoes(args)
+    if erro:
+        print(f"ERRO: {erro}")
+        sys.exit(1)
+    
+    if args.serve:
+        servir(args)
+        return
+    
+    if args.workers > 1:
+        print(f"  Processos: {args.workers}")
+    if args.compress:
+        print(f"  Compressão: {args.compress} ({threads_codificacao(args)} threads)")
+    
+    if args.benchmark_startup is not None:
+        resultado = benchmark_inicializacao(args.benchmark_startup)
+        print(json.dumps(resultado, indent=4, ensure_ascii=False))
+        if args.benchmark_output:
+            with open(args.benchmark_output, 'w', encoding='utf-8') as f:
+                json.dump(resultado, f, indent=4, ensure_ascii=False)
+        if not resultado["aprovado"]:
+            print("ERRO: Inicialização acima do limite ou com módulos de importação adiada carregados por --help.")
+            sys.exit(1)
+        return
+    
+    if args.benchmark_workers:
+        lista_workers = [int(valor) for valor in args.benchmark_workers.split(',')]
+        print(json.dumps(benchmark_workers(args, lista_workers), indent=4))
+        return
+    
+    if args.benchmark:
+        tamanhos = [int(valor) for valor in args.benchmark.split(',')]
+        resultado = benchmark(args, tamanhos)
+        print(json.dumps(resultado, indent=4, ensure_ascii=False))
+        if args.benchmark_output:
+            with open(args.benchmark_output, 'w', encoding='utf-8') as f:
+                json.dump(resultado, f, indent=4, ensure_ascii=False)
+        return
+    
+    try:
+        sinks = criar_sinks(args, especificacoes, retomado["posicoes"] if retomado else None)
+    except Exception as e:
+        print(f"ERRO: Não foi possível abrir os destinos: {e}")
+        sys.exit(1)
     
-    # Gerar os dados
-    dados_placas = generate_plate_data(args)
+    if args.chunk_size:
+        agora = np.datetime64(retomado["agora"], "s") if retomado else instante_referencia(args)
+        checkpoint = None
+        if args.checkpoint:
+            checkpoint = Checkpoint(args.checkpoint, args, agora, especificacoes,
+                                    retomado["inicio"] if retomado else args.start_index)
+        gerar_em_lotes(args, sinks, agora, checkpoint)
+        return
     
-    # Salvar para CSV
-    dados_placas.to_csv(args.output, index=False)
+    # Gerar os dados (ou lê-los do cache, com --reference-date)
+    gerar = generate_plate_data_numpy if args.engine == 'numpy' else generate_plate_data
+    dados_placas = list(lotes_com_cache(args, lambda: [gerar(args)]))[0]
     
-    print(f"Gerados {len(dados_placas)} registros de placas para o Distrito Federal e salvos em {args.output}")
+    # Gravar em todos os destinos em paralelo
+    total, erros = distribuir_lotes(ritmar_lotes([dados_placas], args), sinks, args)
+    informar_erros_sinks(erros)
     
-    # Salvar no MySQL se solicitado
-    mysql_option_exists = hasattr(args, 'mysql') and args.mysql
-    if MYSQL_AVAILABLE and mysql_option_exists:
-        save_to_mysql(dados_placas, args)
+    print(f"Gerados {total} registros de placas para o Distrito Federal e salvos em {', '.join(especificacoes)}")
     
     # Mostrar amostra dos dados se solicitado
     if args.show_sample:
@@ -694,11 +3641,336 @@ def main():
     
     # Mostrar estatísticas se solicitado
     if args.show_stats:
+        estatisticas = EstatisticasFluxo()
+        estatisticas.atualizar(dados_placas)
         print("\nEstatísticas dos dados:")
-        print(dados_placas.describe(include='all').T)
+        print(json.dumps(estatisticas.resultado(), indent=4, ensure_ascii=False))
+    
+    # Mostrar uso de memória se solicitado
+    if args.show_memory:
+        print("\nUso de memória dos dados:")
+        print(json.dumps(relatorio_memoria(dados_placas), indent=4))
 
-if __name__ == "__main__":
-    main()
+def gerar_em_lotes(args, sinks, agora=None, checkpoint=None):
+    """Gera e grava os dados lote a lote, com uso de memória constante em relação a --num-records"""
+    print(f"  Tamanho do lote: {args.chunk_size}")
+    estatisticas = EstatisticasFluxo() if args.show_stats else None
+    
+    def lotes():
+        gerados = lotes_com_cache(args, lambda: iter_plate_batches(args, args.chunk_size, agora), args.chunk_size)
+        for numero_lote, lote in enumerate(gerados):
+            if estatisticas:
+                with etapa("estatisticas"):
+                    estatisticas.atualizar(lote)
+            if numero_lote == 0 and args.show_sample:
+                print("\nAmostra de dados:")
+                print(lote.head())
+            if numero_lote == 0 and args.show_memory:
+                print("\nUso de memória do primeiro lote:")
+                print(json.dumps(relatorio_memoria(lote), indent=4))
+            yield lote
+    
+    total, erros = distribuir_lotes(ritmar_lotes(lotes(), args), sinks, args, checkpoint)
+    informar_erros_sinks(erros)
+    if checkpoint and not erros:
+        checkpoint.concluir()
+    
+    print(f"Gerados {total} registros de placas para o Distrito Federal e salvos em {', '.join(nome for nome, _ in sinks)}")
+    if checkpoint and erros:
+        print(f"Progresso registrado em {checkpoint.caminho}; continue com --resume {checkpoint.caminho}")
+    
+    if estatisticas:
+        print("\nEstatísticas dos dados:")
+        print(json.dumps(estatisticas.resultado(), indent=4, ensure_ascii=False))
+
+# %%
+# Servidor HTTP (--serve): as requisições são atendidas por um processo já aquecido, sem pagar a cada vez
+# a inicialização do interpretador, as importações e a compilação dos catálogos
+
+# Formatos das respostas do servidor e seus tipos de conteúdo
+TIPOS_CONTEUDO_SERVIDOR = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'arrow-ipc': 'application/vnd.apache.arrow.stream',
+}
+
+# Opções que não se aplicam a uma requisição (destinos, arquivos locais, benchmark e exibição) ou que
+# definem os recursos do servidor (processos, ritmo e limites), e por isso valem apenas como as do servidor
+OPCOES_PROIBIDAS_SERVIDOR = {'config', 'save_config', 'serve', 'serve_max_records', 'output', 'sink',
+                             'sink_queue_size', 'table', 'table_if_exists', 'checkpoint', 'resume', 'benchmark',
+                             'benchmark_output', 'benchmark_workers', 'benchmark_startup', 'show_sample',
+                             'show_stats', 'show_memory', 'no_cache', 'cache_size', 'encode_threads', 'compress',
+                             'workers', 'rate', 'replay_speed'}
+
+# Registros por lote enviado quando a requisição não informa chunk_size
+TAMANHO_LOTE_SERVIDOR = 10000
+
+# Tamanho máximo do corpo JSON de uma requisição
+TAMANHO_MAXIMO_CORPO = 1 << 20
+
+# O motor python usa o estado global de random e np.random; suas requisições são geradas uma de cada vez
+TRAVA_MOTOR_PYTHON = threading.Lock()
+
+# Registros por requisição no motor python, que gera tudo de uma vez segurando TRAVA_MOTOR_PYTHON
+# (cerca de 0,7 s por núcleo com o limite); pedidos maiores devem usar o motor numpy
+MAXIMO_REGISTROS_MOTOR_PYTHON = 10000
+
+def args_requisicao(args_servidor, parametros):
+    """Monta as opções de uma requisição: as do servidor, sobrepostas pelos parâmetros recebidos
+    
+    Os parâmetros têm os nomes das opções de linha de comando ou do arquivo de configuração (num_records
+    ou num-records) e passam pelas mesmas conversões e validações do argparse.
+    """
+    parser = criar_parser()
+    parser.set_defaults(**vars(args_servidor))
+    
+    def erro(mensagem):
+        raise ValueError(mensagem)
+    parser.error = erro
+    
+    argumentos, diretos = [], {}
+    for chave, valor in parametros.items():
+        nome = chave.replace('-', '_')
+        if nome not in vars(args_servidor):
+            raise ValueError(f"Parâmetro desconhecido: {chave}")
+        if nome in OPCOES_PROIBIDAS_SERVIDOR or nome.startswith('mysql'):
+            raise ValueError(f"O parâmetro {chave} não é aceito pelo servidor")
+        if nome == 'pesos' and isinstance(valor, str) and not valor.lstrip().startswith('{'):
+            raise ValueError("No servidor, pesos deve ser um objeto JSON (caminhos de arquivo não são aceitos)")
+        if nome == 'format' and valor == 'arrow':
+            valor = 'arrow-ipc'
+        
+        if valor is None:
+            diretos[nome] = None
+        elif isinstance(getattr(args_servidor, nome), bool):
+            # Na query string, ?event_order sem valor também liga a opção
+            diretos[nome] = valor if isinstance(valor, bool) else str(valor).lower() in ('', '1', 'true', 'sim', 'yes')
+        else:
+            texto = (json.dumps(valor) if isinstance(valor, dict)
+                     else ','.join(map(str, valor)) if isinstance(valor, list) else str(valor))
+            argumentos.append(f"--{nome.replace('_', '-')}={texto}")
+    
+    args = parser.parse_args(argumentos)
+    for nome, valor in diretos.items():
+        setattr(args, nome, valor)
+    aplicar_intervalo(args)
+    return args
+
+def validar_requisicao(args):
+    """Verifica as opções de uma requisição, devolvendo a mensagem de erro ou None"""
+    if args.format not in TIPOS_CONTEUDO_SERVIDOR:
+        return f"O servidor responde apenas nos formatos {', '.join(TIPOS_CONTEUDO_SERVIDOR)}."
+    if args.format == 'arrow-ipc' and not PYARROW_AVAILABLE:
+        return "O formato arrow-ipc requer a biblioteca pyarrow."
+    if args.uuid_binary and args.format != 'arrow-ipc':
+        return "--uuid-binary requer o formato arrow-ipc."
+    if args.num_records > args.serve_max_records:
+        return f"O servidor gera no máximo {args.serve_max_records} registros por requisição."
+    if args.engine == 'python' and args.num_records > MAXIMO_REGISTROS_MOTOR_PYTHON:
+        return (f"O motor python gera no máximo {MAXIMO_REGISTROS_MOTOR_PYTHON} registros por requisição no "
+                "servidor (use engine=numpy).")
+    return validar_opcoes(args)
+
+class CodificadorResposta:
+    """Converte os lotes de uma requisição nos bytes do formato pedido (CSV, JSON Lines ou Arrow IPC)"""
+    
+    def __init__(self, args):
+        self.formato = args.format
+        self.cabecalho = True
+        if self.formato == 'arrow-ipc':
+            self.buffer = io.BytesIO()
+            self.escritor = EscritorArrow(self.buffer, args, 'arrow-ipc')
+    
+    def codificar(self, df):
+        if self.formato == 'csv':
+            dados = codificar_csv(df, self.cabecalho)
+            self.cabecalho = False
+            return dados
+        if self.formato == 'jsonl':
+            return ampliar_float32(df).to_json(orient='records', lines=True, force_ascii=False,
+                                               date_format='iso', date_unit='s').encode('utf-8')
+        self.escritor.escrever(df)
+        return self.esvaziar()
+    
+    def finalizar(self):
+        if self.formato != 'arrow-ipc':
+            return b''
+        self.escritor.fechar()
+        return self.esvaziar()
+    
+    def esvaziar(self):
+        dados = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return dados
+
+def lotes_requisicao(args):
+    """Gera os lotes de uma requisição, no ritmo de --rate ou --replay-speed se pedido"""
+    tamanho = args.chunk_size or TAMANHO_LOTE_SERVIDOR
+    if args.engine == 'numpy':
+        return ritmar_lotes(iter_plate_batches(args, tamanho), args)
+    
+    with TRAVA_MOTOR_PYTHON:
+        np.random.seed(args.seed)
+        random.seed(args.seed)
+        df = generate_plate_data(args)
+    return ritmar_lotes((df.iloc[inicio:inicio + tamanho] for inicio in range(0, len(df), tamanho)), args)
+
+def proximo_pedaco(lotes, codificador):
+    """Gera e codifica o próximo lote; devolve (bytes, terminou)"""
+    for lote in lotes:
+        return codificador.codificar(lote), False
+    return codificador.finalizar(), True
+
+def cabecalho_http(status, cabecalhos):
+    """Linha de status e cabeçalhos de uma resposta HTTP/1.1"""
+    linhas = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    linhas += [f"{nome}: {valor}" for nome, valor in cabecalhos.items()]
+    return ("\r\n".join(linhas) + "\r\n\r\n").encode('latin-1')
 
+async def enviar_json(escritor, status, conteudo, manter):
+    """Envia uma resposta JSON completa; devolve se a conexão pode continuar aberta"""
+    corpo = json.dumps(conteudo, ensure_ascii=False).encode('utf-8')
+    escritor.write(cabecalho_http(status, {
+        'Content-Type': 'application/json; charset=utf-8',
+        'Content-Length': len(corpo),
+        'Connection': 'keep-alive' if manter else 'close',
+    }) + corpo)
+    await escritor.drain()
+    return manter
 
+async def responder_geracao(escritor, args, manter):
+    """Gera os dados da requisição em threads e os envia lote a lote com Transfer-Encoding: chunked
+    
+    Cada lote é enviado assim que fica pronto; o próximo só é gerado depois que o cliente recebe o
+    anterior (drain), então clientes lentos não acumulam dados em memória no servidor.
+    """
+    loop = asyncio.get_running_loop()
+    lotes = None
+    try:
+        # A preparação e o primeiro pedaço vêm antes da linha de status, para que uma falha ainda vire uma resposta de erro
+        codificador = CodificadorResposta(args)
+        lotes = await loop.run_in_executor(None, lotes_requisicao, args)
+        dados, terminou = await loop.run_in_executor(None, proximo_pedaco, lotes, codificador)
+    except Exception as e:
+        print(f"ERRO: Falha ao preparar a resposta: {e}", file=sys.stderr)
+        if lotes is not None:
+            await loop.run_in_executor(None, lotes.close)
+        status = 400 if isinstance(e, ValueError) else 500
+        return await enviar_json(escritor, status, {'erro': f"Falha ao gerar os dados: {e}"}, manter)
+    try:
+        escritor.write(cabecalho_http(200, {
+            'Content-Type': TIPOS_CONTEUDO_SERVIDOR[args.format],
+            'Transfer-Encoding': 'chunked',
+            'Connection': 'keep-alive' if manter else 'close',
+        }))
+        while True:
+            if dados:
+                escritor.write(b"%x\r\n%b\r\n" % (len(dados), dados))
+                await escritor.drain()
+            if terminou:
+                break
+            dados, terminou = await loop.run_in_executor(None, proximo_pedaco, lotes, codificador)
+        escritor.write(b"0\r\n\r\n")
+        await escritor.drain()
+        return manter
+    except ConnectionError:
+        return False
+    except Exception as e:
+        # O status já foi enviado: a conexão é fechada sem o pedaço final, e o cliente vê a resposta incompleta
+        print(f"ERRO: Falha ao gerar a resposta: {e}", file=sys.stderr)
+        return False
+    finally:
+        await loop.run_in_executor(None, lotes.close)
 
+async def tratar_requisicao(escritor, args_servidor, metodo, alvo, corpo, manter):
+    """Responde a uma requisição; devolve se a conexão pode continuar aberta"""
+    url = urllib.parse.urlsplit(alvo)
+    if url.path == '/health':
+        return await enviar_json(escritor, 200, {'status': 'ok'}, manter)
+    if url.path != '/generate':
+        return await enviar_json(escritor, 404, {'erro': f"Caminho não encontrado: {url.path}"}, manter)
+    if metodo not in ('GET', 'POST'):
+        return await enviar_json(escritor, 405, {'erro': "Use GET ou POST em /generate"}, manter)
+    
+    # Parâmetros da query string, sobrepostos pelos do corpo JSON (mesmo formato do arquivo de configuração)
+    loop = asyncio.get_running_loop()
+    try:
+        parametros = dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+        if corpo:
+            conteudo = json.loads(corpo)
+            if not isinstance(conteudo, dict):
+                raise ValueError("O corpo da requisição deve ser um objeto JSON")
+            parametros.update(conteudo)
+        args = args_requisicao(args_servidor, parametros)
+        erro = await loop.run_in_executor(None, validar_requisicao, args)
+    except ValueError as e:
+        erro = str(e)
+    if erro:
+        return await enviar_json(escritor, 400, {'erro': erro}, manter)
+    return await responder_geracao(escritor, args, manter)
+
+async def atender_conexao(leitor, escritor, args_servidor):
+    """Atende as requisições HTTP/1.1 de uma conexão, que fica aberta entre elas (keep-alive)"""
+    try:
+        while True:
+            try:
+                cabecalho = await leitor.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            
+            linhas = cabecalho.decode('latin-1').split("\r\n")
+            partes = linhas[0].split(" ")
+            cabecalhos = {}
+            for linha in linhas[1:]:
+                nome, _, valor = linha.partition(":")
+                if nome:
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+            tamanho_corpo = cabecalhos.get('content-length', '0')
+            if len(partes) != 3 or not tamanho_corpo.isdigit():
+                await enviar_json(escritor, 400, {'erro': "Requisição HTTP inválida"}, False)
+                return
+            if int(tamanho_corpo) > TAMANHO_MAXIMO_CORPO:
+                await enviar_json(escritor, 413, {'erro': "Corpo da requisição muito grande"}, False)
+                return
+            
+            metodo, alvo, versao = partes
+            corpo = await leitor.readexactly(int(tamanho_corpo))
+            manter = versao == 'HTTP/1.1' and cabecalhos.get('connection', '').lower() != 'close'
+            if not await tratar_requisicao(escritor, args_servidor, metodo, alvo, corpo, manter):
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return
+    finally:
+        escritor.close()
+
+def servir(args):
+    """Inicia o servidor HTTP de --serve e atende às requisições até ser interrompido (Ctrl+C)
+    
+    As opções da linha de comando são o padrão de todas as requisições. Catálogos, tabelas de pesos e
+    frotas ficam em cache no processo, e as requisições são geradas em threads, várias ao mesmo tempo.
+    """
+    host, _, porta = args.serve.rpartition(':')
+    host = host or '127.0.0.1'
+    if not porta.isdigit():
+        print("ERRO: --serve requer uma porta, no formato [HOST:]PORTA.")
+        sys.exit(1)
+    
+    # Aquece os caches antes da primeira requisição
+    carregar_catalogo_veiculos()
+    tabelas_pesos(args)
+    
+    async def executar():
+        servidor = await asyncio.start_server(
+            functools.partial(atender_conexao, args_servidor=args), host, int(porta))
+        print(f"Servidor ouvindo em http://{host}:{porta} (GET/POST /generate, GET /health)")
+        async with servidor:
+            await servidor.serve_forever()
+    
+    try:
+        asyncio.run(executar())
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.")
+
+if __name__ == "__main__":
+    main()
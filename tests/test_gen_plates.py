@@ -0,0 +1,184 @@
+"""Testes de regressão do gen-plates.py: codificação CSV, determinismo entre execuções e retomada
+
+Execute na raiz do repositório com: python -m pytest -q
+"""
+import gzip
+import importlib.util
+import sqlite3
+import zlib
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "gen-plates.py"
+
+# O data_hora segue o relógio sem --reference-date; o cache devolveria a execução anterior
+OPCOES_BASE = ['--engine', 'numpy', '--reference-date', '2024-05-01', '--no-cache']
+
+def carregar_script():
+    """Importa o gen-plates.py (o hífen impede o import direto)"""
+    spec = importlib.util.spec_from_file_location("gen_plates", SCRIPT)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+gp = carregar_script()
+
+def opcoes(*extras):
+    """Opções como as da linha de comando, já validadas, sem arquivo de configuração"""
+    args = gp.criar_parser().parse_args([*OPCOES_BASE, *extras])
+    gp.aplicar_intervalo(args)
+    assert gp.validar_opcoes(args) is None
+    return args
+
+def executar(diretorio, *extras):
+    """Executa o script em um processo novo, como na linha de comando"""
+    subprocess.run([sys.executable, str(SCRIPT), *OPCOES_BASE, *extras], cwd=diretorio, check=True,
+                   capture_output=True)
+
+def executar_main(monkeypatch, diretorio, *extras):
+    """Executa main() neste processo, para que a geração possa ser interrompida em um lote escolhido"""
+    monkeypatch.chdir(diretorio)
+    monkeypatch.setattr(sys, 'argv', ['gen-plates.py', *OPCOES_BASE, *extras])
+    gp.main()
+
+def interromper_apos(monkeypatch, lotes):
+    """Faz a geração levantar KeyboardInterrupt depois de `lotes` lotes, como um Ctrl+C"""
+    original = gp.iter_plate_batches
+
+    def interrompido(*args, **kwargs):
+        for numero, lote in enumerate(original(*args, **kwargs)):
+            if numero == lotes:
+                raise KeyboardInterrupt
+            yield lote
+    monkeypatch.setattr(gp, 'iter_plate_batches', interrompido)
+    return original
+
+# %%
+# Codificação CSV
+
+@pytest.mark.parametrize("extras", [
+    ['--num-records', '3000'],
+    ['--num-records', '3000', '--spatiotemporal', '--event-order'],
+    ['--num-records', '3000', '--fleet-size', '200', '--uuid-legacy'],
+    ['--num-records', '3000', '--columns', 'numero_placa,velocidade,data_hora'],
+    ['--engine', 'python', '--num-records', '300'],
+])
+def test_codificar_csv_igual_ao_to_csv(extras):
+    args = opcoes(*extras)
+    np.random.seed(args.seed)
+    gp.random.seed(args.seed)
+    df = gp.generate_plate_data_numpy(args) if args.engine == 'numpy' else gp.generate_plate_data(args)
+
+    assert gp.codificar_csv(df) == df.to_csv(index=False).encode('utf-8')
+    assert gp.codificar_csv(df, cabecalho=False) == df.to_csv(index=False, header=False).encode('utf-8')
+
+def test_codificar_csv_casos_extremos():
+    df = pd.DataFrame({
+        'inteiro': [1, -20, 0, 123456789012],
+        'texto': ['x,y', 'q"z', '', 'ç'],
+        'real': [0.1, 1e20, -3.5, 1e-7],
+        'instante': pd.to_datetime(['2024-01-01 00:00:00', '1999-12-31 23:59:59', '2000-02-29 12:00:00',
+                                    '2024-03-01 00:00:01']).astype('datetime64[s]'),
+        'real32': np.array([1.5, 2.25, 0.73, 3], np.float32),
+    })
+    assert gp.codificar_csv(df) == df.to_csv(index=False).encode('utf-8')
+
+    df['texto'] = df['texto'].astype('category')
+    df.loc[1, 'real'] = np.nan
+    assert gp.codificar_csv(df) == df.to_csv(index=False).encode('utf-8')
+
+# %%
+# Determinismo da linha de comando
+
+def test_saida_independe_de_workers_e_chunk_size(tmp_path):
+    executar(tmp_path, '--num-records', '150000', '--output', 'um.csv')
+    executar(tmp_path, '--num-records', '150000', '--workers', '2', '--chunk-size', '7000', '--output', 'dois.csv')
+
+    assert (tmp_path / 'um.csv').read_bytes() == (tmp_path / 'dois.csv').read_bytes()
+
+def test_range_igual_as_mesmas_linhas_da_execucao_completa(tmp_path):
+    executar(tmp_path, '--num-records', '140000', '--output', 'completo.csv')
+    executar(tmp_path, '--range', '65530:131080', '--chunk-size', '20000', '--output', 'parte.csv')
+
+    completo = (tmp_path / 'completo.csv').read_bytes().splitlines(keepends=True)
+    parte = (tmp_path / 'parte.csv').read_bytes().splitlines(keepends=True)
+    assert parte == completo[:1] + completo[1 + 65530:1 + 131080]
+
+# %%
+# Checkpoint e retomada
+
+def test_retomada_igual_a_execucao_sem_interrupcao(tmp_path, monkeypatch):
+    comuns = ['--num-records', '50000', '--chunk-size', '4000']
+    executar_main(monkeypatch, tmp_path, *comuns, '--sink', 'csv:completo.csv', '--sink', 'jsonl:completo.jsonl')
+
+    original = interromper_apos(monkeypatch, 5)
+    with pytest.raises(KeyboardInterrupt):
+        executar_main(monkeypatch, tmp_path, *comuns, '--sink', 'csv:parcial.csv', '--sink', 'jsonl:parcial.jsonl',
+                      '--checkpoint', 'progresso.json')
+    monkeypatch.setattr(gp, 'iter_plate_batches', original)
+
+    # Linhas gravadas depois do checkpoint devem ser descartadas na retomada
+    for nome in ['parcial.csv', 'parcial.jsonl']:
+        with open(tmp_path / nome, 'ab') as f:
+            f.write(b'linha incompleta')
+
+    executar_main(monkeypatch, tmp_path, '--resume', 'progresso.json')
+
+    assert (tmp_path / 'parcial.csv').read_bytes() == (tmp_path / 'completo.csv').read_bytes()
+    assert (tmp_path / 'parcial.jsonl').read_bytes() == (tmp_path / 'completo.jsonl').read_bytes()
+
+def membros_gzip(dados):
+    """Número de membros gzip concatenados em um arquivo"""
+    membros = 0
+    while dados:
+        descompressor = zlib.decompressobj(31)
+        descompressor.decompress(dados)
+        dados = descompressor.unused_data
+        membros += 1
+    return membros
+
+def test_retomada_comprimida_sem_membros_por_lote(tmp_path, monkeypatch):
+    comuns = ['--num-records', '40000', '--chunk-size', '500']
+    executar_main(monkeypatch, tmp_path, *comuns, '--output', 'completo.csv')
+
+    original = interromper_apos(monkeypatch, 50)
+    with pytest.raises(KeyboardInterrupt):
+        executar_main(monkeypatch, tmp_path, *comuns, '--compress', 'gzip', '--output', 'parcial.csv.gz',
+                      '--checkpoint', 'progresso.json')
+    monkeypatch.setattr(gp, 'iter_plate_batches', original)
+    executar_main(monkeypatch, tmp_path, '--resume', 'progresso.json')
+
+    comprimido = (tmp_path / 'parcial.csv.gz').read_bytes()
+    assert gzip.decompress(comprimido) == (tmp_path / 'completo.csv').read_bytes()
+    # Os 80 lotes não cortam um membro cada: os blocos só são cortados com ao menos 1 MiB de texto
+    assert membros_gzip(comprimido) < 20
+
+def test_retomada_sqlite_conta_linhas_e_cria_indices(tmp_path, monkeypatch):
+    comuns = ['--num-records', '30000', '--chunk-size', '3000']
+    executar_main(monkeypatch, tmp_path, *comuns, '--sink', 'sqlite:completo.db')
+
+    original = interromper_apos(monkeypatch, 4)
+    with pytest.raises(KeyboardInterrupt):
+        executar_main(monkeypatch, tmp_path, *comuns, '--sink', 'sqlite:parcial.db', '--checkpoint', 'progresso.json')
+    monkeypatch.setattr(gp, 'iter_plate_batches', original)
+
+    # Simula um processo encerrado à força: sem os índices do fim da carga e com linhas após o checkpoint
+    with sqlite3.connect(tmp_path / 'parcial.db') as conexao:
+        for (nome,) in conexao.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall():
+            conexao.execute(f'DROP INDEX "{nome}"')
+        conexao.execute('INSERT INTO dados_placas SELECT * FROM dados_placas LIMIT 100')
+
+    executar_main(monkeypatch, tmp_path, '--resume', 'progresso.json')
+
+    consulta_indices = "SELECT name FROM sqlite_master WHERE type = 'index' ORDER BY name"
+    with sqlite3.connect(tmp_path / 'completo.db') as completo, sqlite3.connect(tmp_path / 'parcial.db') as parcial:
+        assert parcial.execute('SELECT COUNT(*) FROM dados_placas').fetchone()[0] == 30000
+        indices = parcial.execute(consulta_indices).fetchall()
+        assert indices and indices == completo.execute(consulta_indices).fetchall()
+        linhas = 'SELECT * FROM dados_placas ORDER BY rowid'
+        assert parcial.execute(linhas).fetchall() == completo.execute(linhas).fetchall()